@@ -0,0 +1,150 @@
+import random
+from typing import Iterator
+
+from bson import ObjectId
+
+# Tipos de resultado de um mercado, usados em ordem nos outcomes gerados
+OUTCOME_TYPES = ['home', 'draw', 'away', 'over', 'under', 'yes', 'no']
+
+
+def _outcomes(rng: random.Random, count: int) -> list:
+    """
+    Gera as odds de uma casa para um mercado.
+
+    :param rng: random.Random - Gerador de números aleatórios.
+    :param count: int - Quantidade de outcomes.
+    :return: list - Outcomes com odds nos formatos decimal, americano e fracionário.
+    """
+    outcomes = []
+    for index in range(count):
+        decimal = round(rng.uniform(1.01, 15.0), 2)
+        american = (
+            f'+{round((decimal - 1) * 100)}'
+            if decimal >= 2
+            else f'-{round(100 / (decimal - 1))}'
+        )
+        outcomes.append(
+            {
+                'type': OUTCOME_TYPES[index % len(OUTCOME_TYPES)],
+                'odds_decimal': f'{decimal:.2f}',
+                'odds_american': american,
+                'odds_fraction': f'{round((decimal - 1) * 100)}/100',
+                'open_odds_decimal': f'{decimal * rng.uniform(0.9, 1.1):.2f}',
+                'removed': rng.random() < 0.05,
+            }
+        )
+    return outcomes
+
+
+def _books(rng: random.Random, books: int, outcomes: int) -> list:
+    """
+    Gera as casas de um mercado, cada uma com as próprias odds.
+
+    :param rng: random.Random - Gerador de números aleatórios.
+    :param books: int - Quantidade de casas.
+    :param outcomes: int - Outcomes por casa.
+    :return: list - Casas com os outcomes aninhados.
+    """
+    return [
+        {
+            'id': f'sr:book:{book}',
+            'name': f'Book {book}',
+            'removed': False,
+            'outcomes': _outcomes(rng, outcomes),
+        }
+        for book in range(books)
+    ]
+
+
+def generate_markets_documents(
+    events: int,
+    markets: int = 10,
+    books: int = 8,
+    outcomes: int = 3,
+    seed: int = 0,
+) -> Iterator[dict]:
+    """
+    Gera documentos no formato da coleção "sport_event_markets".
+
+    Cada evento gera `markets` x `books` x `outcomes` linhas na tabela de outcomes.
+
+    :param events: int - Quantidade de documentos (eventos).
+    :param markets: int - Mercados por evento.
+    :param books: int - Casas por mercado.
+    :param outcomes: int - Outcomes por casa.
+    :param seed: int - Semente, para gerar sempre os mesmos documentos.
+    :return: Iterator[dict] - Gerador de documentos.
+    """
+    rng = random.Random(seed)
+    for event in range(events):
+        yield {
+            '_id': ObjectId(),
+            'sport_event': {
+                'id': f'sr:sport_event:{event}',
+                'start_time': f'2025-01-{event % 28 + 1:02d}T18:00:00+00:00',
+                'competitors': [
+                    {'id': f'sr:competitor:{event * 2}', 'qualifier': 'home'},
+                    {'id': f'sr:competitor:{event * 2 + 1}', 'qualifier': 'away'},
+                ],
+            },
+            'markets': [
+                {
+                    'id': f'sr:market:{market}',
+                    'name': f'Market {market}',
+                    'books': _books(rng, books, outcomes),
+                }
+                for market in range(markets)
+            ],
+        }
+
+
+def generate_player_props_documents(
+    events: int,
+    players: int = 20,
+    markets: int = 4,
+    books: int = 5,
+    outcomes: int = 2,
+    seed: int = 0,
+) -> Iterator[dict]:
+    """
+    Gera documentos no formato da coleção "sport_event_player_props".
+
+    Cada evento gera `players` x `markets` x `books` linhas na tabela de casas
+    das player props, cada uma com `outcomes` odds.
+
+    :param events: int - Quantidade de documentos (eventos).
+    :param players: int - Jogadores por evento.
+    :param markets: int - Mercados por jogador.
+    :param books: int - Casas por mercado.
+    :param outcomes: int - Outcomes por casa.
+    :param seed: int - Semente, para gerar sempre os mesmos documentos.
+    :return: Iterator[dict] - Gerador de documentos.
+    """
+    rng = random.Random(seed)
+    for event in range(events):
+        yield {
+            '_id': ObjectId(),
+            'sport_event_players_props': {
+                'sport_event': {
+                    'id': f'sr:sport_event:{event}',
+                    'start_time': f'2025-01-{event % 28 + 1:02d}T18:00:00+00:00',
+                },
+                'players_props': [
+                    {
+                        'player': {
+                            'id': f'sr:player:{event * players + player}',
+                            'name': f'Player {player}',
+                        },
+                        'markets': [
+                            {
+                                'id': f'sr:market:{market}',
+                                'name': f'Player market {market}',
+                                'books': _books(rng, books, outcomes),
+                            }
+                            for market in range(markets)
+                        ],
+                    }
+                    for player in range(players)
+                ],
+            },
+        }
@@ -0,0 +1,301 @@
+"""
+Benchmark da pipeline com documentos sintéticos.
+
+Gera documentos de odds com fan-out configurável, grava-os num MongoDB em
+memória (mongomock) e mede `parsing_json`, `transform_to_df` e
+`load_to_destination` contra SQLite ou um Postgres local. O relatório em JSON
+traz o commit atual, para comparar execuções entre commits:
+
+    python -m benchmarks.run --events 500 --output atual.json
+    python -m benchmarks.run --events 500 --baseline atual.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+
+from benchmarks.generator import (
+    generate_markets_documents,
+    generate_player_props_documents,
+)
+from src.utils.etl import ETLProcess
+from src.utils.metrics import peak_rss_bytes
+from src.utils.specs import destination_table
+
+# Cenários: coleção de origem, gerador de documentos e coleções lógicas medidas
+SCENARIOS = {
+    'markets': (
+        'sport_event_markets',
+        generate_markets_documents,
+        {'sport_event_markets': 'markets', 'outcomes': 'markets'},
+    ),
+    'player_props': (
+        'sport_event_player_props',
+        generate_player_props_documents,
+        {'player_props_books': 'books'},
+    ),
+}
+
+DATABASE_NAME = 'odds'
+
+
+def _mongo_client():
+    """
+    Cria o MongoDB em memória usado no benchmark.
+
+    :return: mongomock.MongoClient - Cliente em memória.
+    """
+    try:
+        import mongomock
+    except ImportError as e:
+        raise ImportError(
+            'O benchmark requer o pacote "mongomock" (pip install mongomock).'
+        ) from e
+    return mongomock.MongoClient()
+
+
+def _git_commit() -> str:
+    """
+    Retorna o commit atual do repositório, ou None fora de um repositório git.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _measure(
+    results: List[dict],
+    collection_name: str,
+    stage: str,
+    function: Callable,
+    count: Callable = len,
+):
+    """
+    Executa uma etapa e registra tempo, linhas, linhas/s e pico de memória.
+
+    Com tracemalloc ativo, o pico é o do heap Python durante a etapa; sem ele,
+    é o pico de RSS do processo até o fim da etapa.
+    """
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+
+    rows = count(result)
+    results.append(
+        {
+            'collection': collection_name,
+            'stage': stage,
+            'seconds': seconds,
+            'rows': rows,
+            'rows_per_second': rows / seconds if seconds else 0.0,
+            'peak_bytes': (
+                tracemalloc.get_traced_memory()[1]
+                if tracemalloc.is_tracing()
+                else peak_rss_bytes()
+            ),
+        }
+    )
+    return result
+
+
+def run_benchmark(
+    events: int,
+    scenarios: List[str],
+    database_url: str = 'sqlite://',
+    load_method: str = 'insert',
+    trace_memory: bool = False,
+    fanout: Dict[str, int] = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Gera os documentos, executa as etapas da pipeline e monta o relatório.
+
+    :param events: int - Documentos (eventos) gerados por cenário.
+    :param scenarios: List[str] - Cenários executados (chaves de SCENARIOS).
+    :param database_url: str - URL SQLAlchemy do banco de destino.
+    :param load_method: str - Método de carga ("insert" ou "copy", apenas Postgres).
+    :param trace_memory: bool - Mede o pico do heap Python por etapa com
+        tracemalloc (mais preciso, porém mais lento).
+    :param fanout: dict - Quantidades repassadas aos geradores, ex.: {"markets": 10}.
+    :param seed: int - Semente dos geradores.
+    :return: dict - Parâmetros, commit, medições por etapa e métricas da pipeline.
+    """
+    fanout = fanout or {}
+    client = _mongo_client()
+    engine = create_engine(database_url)
+
+    pipeline = ETLProcess(
+        uri='mongodb://localhost:27017/?connect=false', load_method=load_method
+    )
+    pipeline.client.close()
+    pipeline.client = client
+
+    results = []
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        for scenario in scenarios:
+            source, generate, targets = SCENARIOS[scenario]
+            documents = list(generate(events, seed=seed, **fanout.get(scenario, {})))
+            client[DATABASE_NAME][source].insert_many(documents)
+            del documents
+
+            for collection_name, key_collection in targets.items():
+                table = destination_table(collection_name, key_collection)
+                rows = _measure(
+                    results,
+                    collection_name,
+                    'parsing_json',
+                    lambda: pipeline.parsing_json(
+                        DATABASE_NAME, collection_name, key_collection
+                    ),
+                )
+                df = _measure(
+                    results,
+                    collection_name,
+                    'transform_to_df',
+                    lambda: pipeline.transform_to_df(rows, collection_name),
+                )
+                del rows
+                _measure(
+                    results,
+                    collection_name,
+                    'load_to_destination',
+                    lambda: pipeline.load_to_destination(engine, df, table),
+                    count=lambda _: len(df),
+                )
+                del df
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        engine.dispose()
+
+    return {
+        'commit': _git_commit(),
+        'events': events,
+        'scenarios': scenarios,
+        'fanout': fanout,
+        'database': engine.dialect.name,
+        'load_method': load_method,
+        'memory': 'tracemalloc' if trace_memory else 'rss',
+        'stages': results,
+        'pipeline_metrics': pipeline.metrics.report()['stages'],
+    }
+
+
+def format_report(report: dict, baseline: dict = None) -> str:
+    """
+    Formata as medições como tabela, com a variação de linhas/s sobre o baseline.
+
+    :param report: dict - Relatório de `run_benchmark`.
+    :param baseline: dict - Relatório de uma execução anterior (opcional).
+    :return: str - Tabela em texto.
+    """
+    previous = {}
+    if baseline:
+        previous = {
+            (entry['collection'], entry['stage']): entry['rows_per_second']
+            for entry in baseline['stages']
+        }
+
+    lines = [
+        f"commit {report['commit']} | {report['events']} eventos | "
+        f"{report['database']} ({report['load_method']}) | memória: {report['memory']}",
+        f"{'coleção':<28}{'etapa':<22}{'linhas':>10}{'s':>9}"
+        f"{'linhas/s':>12}{'pico MiB':>10}{'vs base':>9}",
+    ]
+    for entry in report['stages']:
+        change = ''
+        base = previous.get((entry['collection'], entry['stage']))
+        if base:
+            change = f"{(entry['rows_per_second'] / base - 1) * 100:+.1f}%"
+        lines.append(
+            f"{entry['collection']:<28}{entry['stage']:<22}{entry['rows']:>10}"
+            f"{entry['seconds']:>9.3f}{entry['rows_per_second']:>12.0f}"
+            f"{entry['peak_bytes'] / 2**20:>10.1f}{change:>9}"
+        )
+    return '\n'.join(lines)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """
+    Lê os argumentos da linha de comando.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument(
+        '--scenario',
+        action='append',
+        choices=sorted(SCENARIOS),
+        help='Cenário executado; pode ser repetido (padrão: todos).',
+    )
+    parser.add_argument('--markets', type=int, default=10)
+    parser.add_argument('--books', type=int, default=8)
+    parser.add_argument('--outcomes', type=int, default=3)
+    parser.add_argument('--players', type=int, default=20)
+    parser.add_argument(
+        '--database-url',
+        default='sqlite://',
+        help='URL SQLAlchemy do destino, ex.: postgresql+psycopg2://... (padrão: SQLite em memória).',
+    )
+    parser.add_argument('--load-method', choices=['insert', 'copy'], default='insert')
+    parser.add_argument('--trace-memory', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Grava o relatório em JSON neste caminho.')
+    parser.add_argument('--baseline', help='Relatório JSON de comparação.')
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+    fanout = {
+        'markets': {
+            'markets': args.markets,
+            'books': args.books,
+            'outcomes': args.outcomes,
+        },
+        'player_props': {'players': args.players, 'books': args.books},
+    }
+
+    report = run_benchmark(
+        events=args.events,
+        scenarios=args.scenario or list(SCENARIOS),
+        database_url=args.database_url,
+        load_method=args.load_method,
+        trace_memory=args.trace_memory,
+        fanout=fanout,
+        seed=args.seed,
+    )
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    print(format_report(report, baseline))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,11 +3,76 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
 import logging
+import signal
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from threading import Event
+from typing import Dict, List, Tuple, Union
 
 from dotenv import load_dotenv
+from sqlalchemy import Engine
+
+from src.utils.etl import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_FLUSH_INTERVAL,
+    DEFAULT_FLUSH_SIZE,
+    ETLProcess,
+)
+from src.utils.specs import destination_table
+from src.utils.staging import StagingArea
+
+# Colunas que identificam uma linha em cada tabela, usadas no modo "upsert".
+# Precisam ser únicas depois que as listas são explodidas pelo transform_to_df.
+UPSERT_KEYS = {
+    'sport_event_markets': ('sport_event_id', 'id', 'books_id'),
+    'sport_event_markets_outcomes': (
+        'sport_event_id',
+        'market_id',
+        'books_id',
+        'type',
+    ),
+    'sport_event_player_props_books_outcomes': (
+        'sport_event_id',
+        'player_id',
+        'market_id',
+        'id',
+        'outcomes_type',
+    ),
+}
 
-from src.utils.etl import ETLProcess
+# Chaves do modo normalizado (ETL_NORMALIZE=1), que substituem as de UPSERT_KEYS:
+# as listas vão para tabelas filhas e não multiplicam as linhas do pai. Outcomes
+# não têm id e são identificados pelo tipo dentro da casa.
+NORMALIZED_UPSERT_KEYS = {
+    'sport_event_markets': ('sport_event_id', 'id'),
+    'sport_event_players_props': ('sport_event_id', 'player_id'),
+    'sport_event_markets_books': ('sport_event_id', 'market_id', 'id'),
+    'sport_event_markets_books_outcomes': (
+        'sport_event_id',
+        'market_id',
+        'book_id',
+        'type',
+    ),
+    'sport_event_players_props_markets': ('sport_event_id', 'player_id', 'id'),
+    'sport_event_players_props_markets_books': (
+        'sport_event_id',
+        'player_id',
+        'market_id',
+        'id',
+    ),
+    'sport_event_players_props_markets_books_outcomes': (
+        'sport_event_id',
+        'player_id',
+        'market_id',
+        'book_id',
+        'type',
+    ),
+}
 
 # Configuração do logging
 logging.basicConfig(
@@ -15,22 +80,556 @@ logging.basicConfig(
 )
 
 
-def main():
+def run_collection(
+    pipeline: ETLProcess,
+    engine: Engine,
+    collection_name: str,
+    key_collection: str,
+    chunk_size: int = 0,
+    watermark_field: str = None,
+    resume: bool = False,
+) -> int:
+    """
+    Executa extração, transformação e carga de uma coleção.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :param engine: Engine - Engine do Postgres de destino.
+    :param collection_name: str - Nome da coleção.
+    :param key_collection: str - Chave do documento que contém os dados.
+    :param chunk_size: int - Documentos por bloco (0 carrega tudo de uma vez).
+    :param watermark_field: str - Campo da carga incremental (None para carga completa).
+    :param resume: bool - Na carga em blocos, retoma do último checkpoint salvo.
+    :return: int - Quantidade de linhas carregadas.
+    """
+    logging.info(f'Iniciando Collection: {collection_name}, Key: {key_collection}')
+    table = destination_table(collection_name, key_collection)
+
+    if watermark_field:
+        logging.info(
+            f'[{collection_name}] Carga incremental pelo campo {watermark_field}'
+        )
+        return pipeline.load_incremental(
+            engine=engine,
+            database_name='odds',
+            collection_name=collection_name,
+            key_collection=key_collection,
+            table=table,
+            watermark_field=watermark_field,
+            chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+        )
+
+    if chunk_size:
+        logging.info(
+            f'[{collection_name}] Carregando dados no Postgres em blocos de {chunk_size} documentos'
+        )
+        return pipeline.load_resumable(
+            engine=engine,
+            database_name='odds',
+            collection_name=collection_name,
+            key_collection=key_collection,
+            table=table,
+            chunk_size=chunk_size,
+            resume=resume,
+        )
+
+    # Faixas de _id lidas em threads: sobrepõem a espera de rede, não a CPU
+    partitions = int(os.getenv('MONGO_READ_PARTITIONS', 1))
+
+    if os.getenv('ETL_ENGINE') == 'arrow':
+        logging.info(f'[{collection_name}] Carregando dados pelo caminho Arrow')
+        return pipeline.load_arrow(
+            engine=engine,
+            database_name='odds',
+            collection_name=collection_name,
+            key_collection=key_collection,
+            table=table,
+            partitions=partitions,
+        )
+
+    logging.info(f'[{collection_name}] Coletando dados do Mongo e tratando-os')
+    json_to_list = pipeline.parsing_json(
+        database_name='odds',
+        collection_name=collection_name,
+        key_collection=key_collection,
+        partitions=partitions,
+    )
+
+    if not json_to_list:
+        return 0
+
+    logging.info(f'[{collection_name}] Transformando dados em DF')
+    frames = pipeline.transform_tables(
+        json_to_list, collection_name, key_collection, table
+    )
+
+    logging.info(f'[{collection_name}] Carregando dados no Postgres')
+    for target, df in frames.items():
+        pipeline.load_to_destination(engine=engine, df=df, table=target)
+    return sum(len(df) for df in frames.values())
+
+
+def create_pipeline() -> ETLProcess:
+    """
+    Cria a pipeline com as configurações das variáveis de ambiente.
+
+    :return: ETLProcess - Instância da pipeline.
+    """
+    normalize = os.getenv('ETL_NORMALIZE') == '1'
+    return ETLProcess(
+        uri=os.getenv('MONGOURI'),
+        write_mode=os.getenv('ETL_WRITE_MODE', 'replace'),
+        batch_size=int(os.getenv('MONGO_BATCH_SIZE', 1000)),
+        load_method=os.getenv('POSTGRES_LOAD_METHOD', 'insert'),
+        upsert_keys=(
+            {**UPSERT_KEYS, **NORMALIZED_UPSERT_KEYS} if normalize else UPSERT_KEYS
+        ),
+        pushdown=os.getenv('MONGO_PUSHDOWN', 'none'),
+        unlogged=os.getenv('POSTGRES_UNLOGGED') == '1',
+        # Blocos em espera entre leitura, transformação e carga (0 desativa)
+        pipeline_depth=int(os.getenv('ETL_PIPELINE_DEPTH', 0)),
+        # Listas aninhadas em tabelas filhas em vez de explodidas
+        normalize=normalize,
+    )
+
+
+def create_destination_engine(pipeline: ETLProcess) -> Engine:
+    """
+    Cria a engine do Postgres de destino com as variáveis de ambiente.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :return: Engine - Engine do Postgres de destino.
+    """
+    return pipeline.postgres_engine(
+        user=os.getenv('POSTGRES_USER'),
+        password=os.getenv('POSTGRES_PASSWORD'),
+        host=os.getenv('POSTGRES_HOST'),
+        port=os.getenv('POSTGRES_PORT'),
+        database=os.getenv('POSTGRES_DB'),
+    )
+
+
+def run_source_group(
+    pipeline: ETLProcess,
+    engine: Engine,
+    targets: Dict[str, str],
+    chunk_size: int = 0,
+) -> Dict[str, int]:
+    """
+    Executa coleções que compartilham a mesma coleção de origem com uma única leitura.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :param engine: Engine - Engine do Postgres de destino.
+    :param targets: dict - Coleções e suas chaves, todas com a mesma origem.
+    :param chunk_size: int - Documentos por bloco (0 carrega tudo de uma vez).
+    :return: dict - Quantidade de linhas carregadas por coleção.
+    """
+    logging.info(f'Iniciando leitura única para as collections: {list(targets)}')
+    tables = {
+        collection_name: destination_table(collection_name, key_collection)
+        for collection_name, key_collection in targets.items()
+    }
+
+    if chunk_size:
+        return pipeline.load_chunked_fanout(
+            engine=engine,
+            database_name='odds',
+            targets={
+                collection_name: (key_collection, tables[collection_name])
+                for collection_name, key_collection in targets.items()
+            },
+            chunk_size=chunk_size,
+        )
+
+    rows = pipeline.parsing_json_fanout(database_name='odds', targets=targets)
+
+    loaded_rows = {}
+    for collection_name in targets:
+        json_to_list = rows.pop(collection_name)
+        if not json_to_list:
+            loaded_rows[collection_name] = 0
+            continue
+
+        logging.info(f'[{collection_name}] Transformando dados em DF')
+        frames = pipeline.transform_tables(
+            json_to_list,
+            collection_name,
+            targets[collection_name],
+            tables[collection_name],
+        )
+
+        logging.info(f'[{collection_name}] Carregando dados no Postgres')
+        for target, df in frames.items():
+            pipeline.load_to_destination(engine=engine, df=df, table=target)
+        loaded_rows[collection_name] = sum(len(df) for df in frames.values())
+
+    return loaded_rows
+
+
+def run_staged(
+    pipeline: ETLProcess,
+    engine: Engine,
+    targets: Dict[str, str],
+    staging: StagingArea,
+    chunk_size: int = 0,
+    step: str = 'all',
+) -> Dict[str, int]:
+    """
+    Executa coleções passando pela área de staging em disco.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :param engine: Engine - Engine do Postgres de destino.
+    :param targets: dict - Coleções e suas chaves.
+    :param staging: StagingArea - Área de staging.
+    :param chunk_size: int - Documentos por parte (0 usa DEFAULT_CHUNK_SIZE).
+    :param step: str - "extract" (Mongo -> disco), "load" (disco -> Postgres) ou "all".
+    :return: dict - Linhas gravadas (extract) ou carregadas por coleção.
+    """
+    if step not in ('all', 'extract', 'load'):
+        raise ValueError(f'Etapa de staging inválida: {step}')
+
+    tables = {
+        collection_name: destination_table(collection_name, key_collection)
+        for collection_name, key_collection in targets.items()
+    }
+    rows = {}
+
+    if step in ('all', 'extract'):
+        logging.info(f'Gravando no staging as collections: {list(targets)}')
+        rows = pipeline.stage_chunks(
+            database_name='odds',
+            targets={
+                collection_name: (key_collection, tables[collection_name])
+                for collection_name, key_collection in targets.items()
+            },
+            staging=staging,
+            chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+        )
+
+    if step in ('all', 'load'):
+        for collection_name, table in tables.items():
+            logging.info(f'[{collection_name}] Carregando do staging no Postgres')
+            rows[collection_name] = sum(
+                pipeline.load_staged(engine, output, staging)
+                for output in pipeline.output_tables(
+                    collection_name, targets[collection_name], table
+                )
+            )
+
+    return rows
+
+
+def run_sync(
+    pipeline: ETLProcess,
+    engine: Engine,
+    dict_collection_key: Dict[str, str],
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    flush_size: int = DEFAULT_FLUSH_SIZE,
+    stop: Event = None,
+) -> Dict[str, int]:
+    """
+    Mantém as coleções sincronizadas pelo change stream do MongoDB até ser interrompida.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :param engine: Engine - Engine do Postgres de destino.
+    :param dict_collection_key: dict - Coleções e suas chaves.
+    :param flush_interval: float - Segundos máximos entre duas descargas.
+    :param flush_size: int - Documentos acumulados que forçam uma descarga.
+    :param stop: Event - Encerra a sincronização (padrão: definido por SIGINT/SIGTERM).
+    :return: dict - Linhas mescladas por coleção.
+    """
+    if stop is None:
+        stop = Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+    logging.info(
+        f'Sincronizando continuamente as collections: {list(dict_collection_key)}'
+    )
+    return pipeline.sync_changes(
+        engine=engine,
+        database_name='odds',
+        targets={
+            collection_name: (
+                key_collection,
+                destination_table(collection_name, key_collection),
+            )
+            for collection_name, key_collection in dict_collection_key.items()
+        },
+        flush_interval=flush_interval,
+        flush_size=flush_size,
+        stop=stop,
+    )
+
+
+def run_targets(
+    pipeline: ETLProcess,
+    engine: Engine,
+    targets: Dict[str, str],
+    chunk_size: int = 0,
+    watermark_field: str = None,
+    resume: bool = False,
+) -> Dict[str, int]:
+    """
+    Executa uma unidade de trabalho: uma coleção, ou um grupo com a mesma origem.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :param engine: Engine - Engine do Postgres de destino.
+    :param targets: dict - Coleções e suas chaves.
+    :param chunk_size: int - Documentos por bloco (0 carrega tudo de uma vez).
+    :param watermark_field: str - Campo da carga incremental (None para carga completa).
+    :param resume: bool - Na carga em blocos, retoma do último checkpoint salvo.
+    :return: dict - Quantidade de linhas carregadas por coleção.
+    """
+    # Com ETL_STAGING_DIR a extração e a carga passam por arquivos em disco
+    staging_dir = os.getenv('ETL_STAGING_DIR')
+    if staging_dir:
+        return run_staged(
+            pipeline,
+            engine,
+            targets,
+            StagingArea(staging_dir, os.getenv('ETL_STAGING_FORMAT', 'parquet')),
+            chunk_size,
+            step=os.getenv('ETL_STAGING_STEP', 'all'),
+        )
+
+    if len(targets) > 1:
+        return run_source_group(pipeline, engine, targets, chunk_size)
+
+    (collection_name, key_collection), = targets.items()
+    return {
+        collection_name: run_collection(
+            pipeline=pipeline,
+            engine=engine,
+            collection_name=collection_name,
+            key_collection=key_collection,
+            chunk_size=chunk_size,
+            watermark_field=watermark_field,
+            resume=resume,
+        )
+    }
+
+
+def _run_targets_in_process(
+    targets: Dict[str, str],
+    chunk_size: int,
+    watermark_field: str,
+    resume: bool = False,
+) -> Tuple[Dict[str, int], List[dict]]:
+    """
+    Executa uma unidade de trabalho num processo filho, com cliente MongoDB e engine próprios.
+
+    Conexões não podem ser compartilhadas entre processos, então cada processo
+    abre as suas a partir das variáveis de ambiente. As medições do processo
+    filho são devolvidas para serem somadas às da execução principal.
+    """
+    load_dotenv()
+    pipeline = create_pipeline()
+    engine = create_destination_engine(pipeline)
+    try:
+        rows = run_targets(
+            pipeline, engine, targets, chunk_size, watermark_field, resume
+        )
+        return rows, pipeline.metrics.report()['stages']
+    finally:
+        pipeline.close_client()
+        pipeline.close_engine(engine=engine)
+
+
+def group_by_source(
+    pipeline: ETLProcess, dict_collection_key: Dict[str, str]
+) -> List[Dict[str, str]]:
+    """
+    Agrupa as coleções pela coleção de origem de onde são lidas.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :param dict_collection_key: dict - Coleções e suas chaves.
+    :return: list - Grupos {coleção: chave}, na ordem da primeira coleção de cada um.
+    """
+    groups = {}
+    for collection_name, key_collection in dict_collection_key.items():
+        source = pipeline._source_collection(collection_name)
+        groups.setdefault(source, {})[collection_name] = key_collection
+    return list(groups.values())
+
+
+def run_collections(
+    pipeline: ETLProcess,
+    engine: Engine,
+    dict_collection_key: Dict[str, str],
+    chunk_size: int = 0,
+    watermark_field: str = None,
+    max_workers: int = 1,
+    executor: str = 'thread',
+    fanout: bool = False,
+    resume: bool = False,
+) -> Dict[str, Union[int, Exception]]:
+    """
+    Executa várias coleções, opcionalmente em paralelo, sem abortar na primeira falha.
+
+    Com `executor="thread"` as threads compartilham o `MongoClient` e o pool de
+    conexões da engine, ambos thread-safe. Com `executor="process"` cada
+    processo cria as próprias conexões. Com `fanout`, coleções com a mesma
+    origem são extraídas juntas numa única leitura (exceto na carga
+    incremental, em que cada coleção tem a própria marca d'água).
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    :param engine: Engine - Engine do Postgres de destino.
+    :param dict_collection_key: dict - Coleções e suas chaves.
+    :param chunk_size: int - Documentos por bloco (0 carrega tudo de uma vez).
+    :param watermark_field: str - Campo da carga incremental (None para carga completa).
+    :param max_workers: int - Quantidade de unidades executadas ao mesmo tempo.
+    :param executor: str - Tipo de paralelismo ("thread" ou "process").
+    :param fanout: bool - Agrupa as coleções que têm a mesma origem.
+    :param resume: bool - Na carga em blocos, retoma do último checkpoint salvo.
+    :return: dict - Linhas carregadas por coleção, ou a exceção que a interrompeu.
+    """
+    if fanout and not watermark_field:
+        units = group_by_source(pipeline, dict_collection_key)
+    else:
+        units = [
+            {collection_name: key_collection}
+            for collection_name, key_collection in dict_collection_key.items()
+        ]
+
+    results = {}
+
+    if max_workers <= 1:
+        for targets in units:
+            try:
+                results.update(
+                    run_targets(
+                        pipeline,
+                        engine,
+                        targets,
+                        chunk_size,
+                        watermark_field,
+                        resume,
+                    )
+                )
+            except Exception as e:
+                results.update(dict.fromkeys(targets, e))
+        return {name: results[name] for name in dict_collection_key}
+
+    if executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+    elif executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        raise ValueError(f'Executor inválido: {executor}')
+
+    with pool:
+        futures = {}
+        for targets in units:
+            if executor == 'thread':
+                future = pool.submit(
+                    run_targets,
+                    pipeline,
+                    engine,
+                    targets,
+                    chunk_size,
+                    watermark_field,
+                    resume,
+                )
+            else:
+                future = pool.submit(
+                    _run_targets_in_process,
+                    targets,
+                    chunk_size,
+                    watermark_field,
+                    resume,
+                )
+            futures[future] = targets
+
+        for future in as_completed(futures):
+            try:
+                if executor == 'process':
+                    rows, stages = future.result()
+                    pipeline.metrics.merge(stages)
+                else:
+                    rows = future.result()
+                results.update(rows)
+            except Exception as e:
+                results.update(dict.fromkeys(futures[future], e))
+
+    return {name: results[name] for name in dict_collection_key}
+
+
+def export_metrics(pipeline: ETLProcess) -> None:
+    """
+    Registra o resumo das etapas e exporta as medições da execução.
+
+    ETL_METRICS_JSON e ETL_METRICS_PROMETHEUS recebem caminhos de arquivo para o
+    relatório em JSON e para as métricas no formato do Prometheus.
+
+    :param pipeline: ETLProcess - Instância da pipeline.
+    """
+    report = pipeline.metrics.report()
+    for entry in report['stages']:
+        logging.info(
+            f"[{entry['target']}] {entry['stage']}: {entry['seconds']:.2f}s, "
+            f"{entry['documents']} documentos, {entry['rows']} linhas, "
+            f"{entry['rows_per_second']:.0f} linhas/s, "
+            f"RSS {entry['rss_bytes'] / 2**20:.0f} MiB "
+            f"(+{entry['rss_growth_bytes'] / 2**20:.0f} MiB na etapa)"
+        )
+    logging.info(f"Pico de RSS do processo: {report['peak_rss_bytes'] / 2**20:.0f} MiB")
+
+    json_path = os.getenv('ETL_METRICS_JSON')
+    if json_path:
+        pipeline.metrics.write_json(json_path)
+
+    prometheus_path = os.getenv('ETL_METRICS_PROMETHEUS')
+    if prometheus_path:
+        pipeline.metrics.write_prometheus(prometheus_path)
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """
+    Lê os argumentos da linha de comando.
+    """
+    parser = argparse.ArgumentParser(description='Pipeline MongoDB -> PostgreSQL.')
+    parser.add_argument(
+        '--sync',
+        action='store_true',
+        help='Sincroniza continuamente pelo change stream do MongoDB, em vez de '
+        'executar uma carga única (equivale a ETL_SYNC=1).',
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Retoma as cargas em blocos interrompidas a partir do último '
+        'checkpoint (equivale a ETL_RESUME=1).',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
 
     load_dotenv()
 
     logging.info('Iniciando Pipeline')
     try:
-        pipeline = ETLProcess(uri=os.getenv('MONGOURI'), write_mode='replace')
+        pipeline = create_pipeline()
+
+        # Com ETL_METRICS_PORT as métricas ficam disponíveis durante a execução
+        metrics_port = os.getenv('ETL_METRICS_PORT')
+        if metrics_port:
+            pipeline.metrics.serve_prometheus(int(metrics_port))
 
         logging.info('Criando Engine Postgres')
-        destination_engine = pipeline.postgres_engine(
-            user=os.getenv('POSTGRES_USER'),
-            password=os.getenv('POSTGRES_PASSWORD'),
-            host=os.getenv('POSTGRES_HOST'),
-            port=os.getenv('POSTGRES_PORT'),
-            database=os.getenv('POSTGRES_DB'),
-        )
+        destination_engine = create_destination_engine(pipeline)
+
+        # 0 desativa o modo em blocos e carrega a coleção inteira de uma vez
+        chunk_size = int(os.getenv('ETL_CHUNK_SIZE', 0))
+
+        # Com ETL_INCREMENTAL=1 só os documentos novos desde a última execução são lidos
+        watermark_field = None
+        if os.getenv('ETL_INCREMENTAL') == '1':
+            watermark_field = os.getenv('ETL_WATERMARK_FIELD', '_id')
+
+        # Com --resume (ou ETL_RESUME=1) as cargas em blocos continuam do checkpoint
+        resume = args.resume or os.getenv('ETL_RESUME') == '1'
 
         dict_collection_key = {
             # 'sports': 'sports',
@@ -42,54 +641,54 @@ def main():
            #'outcomes' : 'markets'
         }
 
-        for collection_name, key_collection in dict_collection_key.items():
-            logging.info(
-                f'Iniciando Collection: {collection_name}, Key: {key_collection}'
-            )
-
-            logging.info('Coletando dados do Mongo e tratando-os')
-            json_to_list = pipeline.parsing_json(
-                database_name='odds',
-                collection_name=collection_name,
-                key_collection=key_collection,
+        # Com --sync (ou ETL_SYNC=1) as alterações são mescladas assim que ocorrem
+        if args.sync or os.getenv('ETL_SYNC') == '1':
+            run_sync(
+                pipeline=pipeline,
+                engine=destination_engine,
+                dict_collection_key=dict_collection_key,
+                flush_interval=float(
+                    os.getenv('ETL_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+                ),
+                flush_size=int(os.getenv('ETL_FLUSH_SIZE', DEFAULT_FLUSH_SIZE)),
             )
+            export_metrics(pipeline)
+            pipeline.close_client()
+            pipeline.close_engine(engine=destination_engine)
+            logging.info('Fim da sincronização contínua')
+            return
 
-            if not json_to_list:
-                logging.warning(
-                    'Nenhum dado foi extraído do MongoDB. Pipeline encerrada.'
-                )
-                continue
-
-            logging.info('Transformando dados em DF')
-            df = pipeline.transform_to_df(json_to_list, collection_name)
+        results = run_collections(
+            pipeline=pipeline,
+            engine=destination_engine,
+            dict_collection_key=dict_collection_key,
+            chunk_size=chunk_size,
+            watermark_field=watermark_field,
+            max_workers=int(os.getenv('ETL_WORKERS', 1)),
+            executor=os.getenv('ETL_EXECUTOR', 'thread'),
+            fanout=os.getenv('ETL_FANOUT') == '1',
+            resume=resume,
+        )
 
-            logging.info('Carregando dados no Postgres')
+        export_metrics(pipeline)
 
-            if collection_name == 'sport_event_markets':
+        for collection_name, result in results.items():
+            key_collection = dict_collection_key[collection_name]
 
-                pipeline.load_to_destination(
-                    engine=destination_engine, df=df, table=f'sport_event_{key_collection}'
+            if isinstance(result, Exception):
+                logging.error(
+                    f'Collection: {collection_name}, Key: {key_collection} falhou: {result}',
+                    exc_info=result,
                 )
-            
-            elif collection_name == 'outcomes': 
-                pipeline.load_to_destination(
-                    engine=destination_engine, df=df, table=f'sport_event_{key_collection}_outcomes'
-                )
-
-            elif collection_name == 'player_props_books': 
-                pipeline.load_to_destination(
-                    engine=destination_engine, df=df, table=f'sport_event_player_props_{key_collection}_outcomes'
+            elif not result:
+                logging.warning(
+                    f'Nenhum dado foi extraído do MongoDB para a collection {collection_name}.'
                 )
-
             else:
-                pipeline.load_to_destination(
-                    engine=destination_engine, df=df, table=key_collection
+                logging.info(
+                    f'Collection: {collection_name}, Key: {key_collection} finalizada com sucesso'
                 )
 
-            logging.info(
-                f'Collection: {collection_name}, Key: {key_collection} finalizada com sucesso'
-            )
-
         pipeline.close_client()
 
         pipeline.close_engine(engine=destination_engine)
@@ -0,0 +1,121 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Coluna das tabelas de destino que guarda o hash do conteúdo de cada linha
+HASH_COLUMN = '_row_hash'
+
+
+def _canonical(value: Any) -> Any:
+    """
+    Converte um valor para a forma usada no hash, independente do dtype da coluna.
+
+    Números inteiros guardados como float (1.0, quando a coluna tem nulos num
+    bloco) viram int; demais valores não JSON viram texto.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return int(value) if float(value).is_integer() else float(value)
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Calcula um hash estável do conteúdo de cada linha do DataFrame.
+
+    O hash é o de uma forma canônica da linha: só os campos não nulos, em
+    ordem alfabética e com os valores normalizados por `_canonical`. Assim ele
+    não depende da ordem das colunas, de colunas que outras linhas do mesmo
+    bloco trouxeram nem do dtype inferido em cada bloco. A coluna HASH_COLUMN
+    é ignorada.
+
+    :param df: pd.DataFrame - Linhas já convertidas para os tipos do esquema.
+    :return: pd.Series - Hash de 64 bits (com sinal, como o BIGINT) de cada linha.
+    """
+    columns = sorted(column for column in df.columns if column != HASH_COLUMN)
+    values = [df[column].tolist() for column in columns]
+
+    hashes = []
+    for row in zip(*values):
+        fields = {
+            column: _canonical(value)
+            for column, value in zip(columns, row)
+            if not (pd.api.types.is_scalar(value) and pd.isna(value))
+        }
+        payload = json.dumps(fields, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.blake2b(payload.encode(), digest_size=8).digest()
+        hashes.append(int.from_bytes(digest, 'big', signed=True))
+
+    return pd.Series(np.array(hashes, dtype='int64'), index=df.index)
+
+
+class RowHashIndex:
+    """
+    Classe responsável por comparar as linhas de uma carga com as já gravadas no destino.
+
+    Guarda em memória a chave e o hash de cada linha da tabela de destino.
+    A cada bloco, devolve só as linhas novas ou alteradas e registra as chaves
+    vistas; ao fim de uma leitura completa da origem, as chaves não vistas são
+    as linhas removidas.
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        hashes: Dict[tuple, int],
+        stored_keys: Dict[tuple, tuple] = None,
+    ):
+        """
+        Inicializa o índice com as linhas já gravadas.
+
+        :param keys: Sequence[str] - Colunas que identificam unicamente uma linha.
+        :param hashes: dict - {valores da chave: hash gravado}; o hash é None
+            para linhas gravadas antes da detecção de alterações.
+        :param stored_keys: dict - {valores da chave: valores como lidos do
+            banco}, quando diferem dos tipos das linhas da carga (opcional).
+        """
+        self.keys = list(keys)
+        self.hashes = hashes
+        self.stored_keys = stored_keys or {}
+        self.seen = set()
+
+    def changed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Filtra as linhas novas ou alteradas, acrescentando a coluna de hash.
+
+        :param df: pd.DataFrame - Linhas do bloco, já convertidas pelo esquema.
+        :return: pd.DataFrame - Linhas que precisam ser gravadas, com HASH_COLUMN.
+        """
+        df = df.assign(**{HASH_COLUMN: row_hashes(df)})
+        key_values = list(zip(*(df[key].tolist() for key in self.keys)))
+        changed = np.fromiter(
+            (
+                self.hashes.get(key) != value
+                for key, value in zip(key_values, df[HASH_COLUMN].tolist())
+            ),
+            dtype=bool,
+            count=len(df),
+        )
+        self.seen.update(key_values)
+        return df[changed]
+
+    def deleted(self) -> List[tuple]:
+        """
+        Retorna as chaves gravadas no destino que não apareceram na carga.
+
+        :return: List[tuple] - Valores da chave das linhas removidas na origem,
+            como lidos do banco.
+        """
+        return [
+            self.stored_keys.get(key, key)
+            for key in self.hashes
+            if key not in self.seen
+        ]
@@ -1,4 +1,21 @@
-from sqlalchemy import Engine, create_engine
+import csv
+import io
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Iterable, List, Sequence
+
+import pandas as pd
+from sqlalchemy import (
+    Connection,
+    DateTime,
+    Engine,
+    bindparam,
+    create_engine,
+    inspect,
+    text,
+)
+
+# Sufixo da tabela de sombra usada nas cargas em "replace"
+SHADOW_SUFFIX = '__shadow'
 
 
 class DbEngine:
@@ -64,3 +81,904 @@ class DbEngine:
             Objeto SQLAlchemy `Engine` a ser fechado.
         """
         return engine.dispose()
+
+    @staticmethod
+    def copy_insert(pd_table, conn, keys: List[str], data_iter: Iterable) -> int:
+        """
+        Método de inserção para `DataFrame.to_sql` baseado em `COPY ... FROM STDIN`.
+
+        As linhas são serializadas em CSV num buffer em memória e enviadas ao
+        PostgreSQL pelo cursor psycopg2 da conexão, sem arquivos temporários.
+        A criação/remoção da tabela continua a cargo do `to_sql`, então os
+        modos "replace" e "append" se mantêm.
+
+        Parâmetros:
+        ----------
+        pd_table : pandas.io.sql.SQLTable
+            Tabela de destino montada pelo pandas.
+        conn : sqlalchemy.engine.Connection
+            Conexão SQLAlchemy aberta pelo `to_sql`.
+        keys : List[str]
+            Nomes das colunas, na ordem dos valores de `data_iter`.
+        data_iter : Iterable
+            Linhas a serem inseridas.
+
+        Retorno:
+        -------
+        int
+            Quantidade de linhas copiadas.
+        """
+        buffer = io.StringIO()
+        # None sai sem aspas (NULL no COPY); strings vazias saem como ""
+        csv.writer(buffer, quoting=csv.QUOTE_NOTNULL).writerows(data_iter)
+        buffer.seek(0)
+
+        quote = conn.dialect.identifier_preparer.quote
+        table_name = quote(pd_table.name)
+        if pd_table.schema:
+            table_name = f'{quote(pd_table.schema)}.{table_name}'
+        columns = ', '.join(quote(key) for key in keys)
+
+        with conn.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer,
+            )
+            return cursor.rowcount
+
+    def copy_arrow(
+        self,
+        engine: Engine,
+        arrow_table,
+        table: str,
+        write_mode: str = 'replace',
+        dtype: dict = None,
+    ) -> int:
+        """
+        Carrega uma tabela Arrow com `COPY ... FROM STDIN`, sem passar pelo pandas.
+
+        O CSV é gerado pelo escritor nativo do Arrow num buffer em memória. A
+        tabela de destino é criada/substituída pelo `to_sql` de um DataFrame
+        vazio com o mesmo esquema, na mesma transação do COPY.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        arrow_table : pyarrow.Table
+            Tabela a ser carregada, sem colunas aninhadas.
+        table : str
+            Nome da tabela de destino.
+        write_mode : str
+            "replace" ou "append".
+        dtype : dict
+            Tipos SQLAlchemy das colunas, usados na criação da tabela (opcional).
+
+        Retorno:
+        -------
+        int
+            Quantidade de linhas copiadas.
+        """
+        import pyarrow.csv
+
+        buffer = io.BytesIO()
+        # Nulos saem sem aspas (NULL no COPY); strings vazias saem como ""
+        pyarrow.csv.write_csv(arrow_table, buffer)
+        buffer.seek(0)
+
+        quote = engine.dialect.identifier_preparer.quote
+        columns = ', '.join(quote(column) for column in arrow_table.column_names)
+
+        with engine.begin() as connection:
+            arrow_table.schema.empty_table().to_pandas().to_sql(
+                name=table,
+                con=connection,
+                if_exists=write_mode,
+                index=False,
+                dtype=dtype,
+            )
+            with connection.connection.cursor() as cursor:
+                cursor.copy_expert(
+                    f'COPY {quote(table)} ({columns}) FROM STDIN '
+                    'WITH (FORMAT csv, HEADER true)',
+                    buffer,
+                )
+                return cursor.rowcount
+
+    @staticmethod
+    def _transaction(bind) -> ContextManager[Connection]:
+        """
+        Abre uma transação na engine ou reaproveita a de uma conexão já aberta.
+
+        Permite que vários passos de carga (e o checkpoint que os registra)
+        sejam confirmados juntos, num único COMMIT do chamador.
+
+        Parâmetros:
+        ----------
+        bind : Engine | Connection
+            Engine do banco de destino, ou conexão com uma transação em andamento.
+
+        Retorno:
+        -------
+        ContextManager[Connection]
+            Contexto que fornece a conexão da transação.
+        """
+        if isinstance(bind, Connection):
+            return nullcontext(bind)
+        return bind.begin()
+
+    @staticmethod
+    def _sql_type(series: pd.Series) -> str:
+        """
+        Retorna o tipo PostgreSQL equivalente ao dtype de uma coluna do DataFrame.
+
+        Parâmetros:
+        ----------
+        series : pd.Series
+            Coluna do DataFrame.
+
+        Retorno:
+        -------
+        str
+            Tipo SQL usado na criação da coluna.
+        """
+        if pd.api.types.is_bool_dtype(series):
+            return 'BOOLEAN'
+        if pd.api.types.is_integer_dtype(series):
+            return 'BIGINT'
+        if series.dtype == 'float32':
+            return 'REAL'
+        if pd.api.types.is_float_dtype(series):
+            return 'DOUBLE PRECISION'
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            return 'TIMESTAMP WITH TIME ZONE'
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return 'TIMESTAMP'
+        return 'TEXT'
+
+    def add_missing_columns(
+        self, engine: Engine, df: pd.DataFrame, table: str
+    ) -> List[str]:
+        """
+        Adiciona à tabela as colunas do DataFrame que ainda não existem nela.
+
+        Usado nas cargas em `append`, quando um lote posterior traz colunas que
+        não apareceram no lote que criou a tabela.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        df : pd.DataFrame
+            DataFrame que será carregado.
+        table : str
+            Nome da tabela de destino.
+
+        Retorno:
+        -------
+        List[str]
+            Colunas adicionadas à tabela.
+        """
+        with self._transaction(engine) as connection:
+            return self._add_missing_columns(connection, df, table)
+
+    def _add_missing_columns(
+        self, connection: Connection, df: pd.DataFrame, table: str
+    ) -> List[str]:
+        """
+        Implementação de `add_missing_columns` dentro de uma transação já aberta.
+        """
+        inspector = inspect(connection)
+        if not inspector.has_table(table):
+            return []
+
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        missing = [column for column in df.columns if column not in existing]
+
+        quote = connection.dialect.identifier_preparer.quote
+        for column in missing:
+            connection.execute(
+                text(
+                    f'ALTER TABLE {quote(table)} ADD COLUMN '
+                    f'{quote(column)} {self._sql_type(df[column])}'
+                )
+            )
+
+        return missing
+
+    def upsert_dataframe(
+        self,
+        engine: Engine,
+        df: pd.DataFrame,
+        table: str,
+        keys: Sequence[str],
+        method: Callable = None,
+        dtype: dict = None,
+    ) -> int:
+        """
+        Insere ou atualiza as linhas do DataFrame na tabela, pela chave informada.
+
+        As linhas são carregadas numa tabela de staging e mescladas na tabela de
+        destino com um único `INSERT ... SELECT ... ON CONFLICT DO UPDATE`, tudo
+        na mesma transação: leitores nunca veem a tabela vazia ou parcial. A
+        chave precisa ser única no DataFrame: chaves repetidas rejeitam a carga
+        em vez de descartar linhas em silêncio. Caso
+        a tabela não exista, ela é criada com a estrutura da staging e recebe o
+        índice único exigido pelo `ON CONFLICT`.
+
+        Índices únicos tratam NULLs como distintos, então uma linha com parte
+        da chave nula (ex.: mercado sem casas após a explosão) nunca entraria
+        em conflito e seria inserida de novo a cada carga. Para essas linhas, a
+        versão gravada com a mesma chave (NULL igual a NULL) é apagada antes
+        da inserção, na mesma transação.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        df : pd.DataFrame
+            DataFrame a ser carregado.
+        table : str
+            Nome da tabela de destino.
+        keys : Sequence[str]
+            Colunas que identificam unicamente uma linha.
+        method : Callable
+            Método de inserção repassado ao `to_sql` da staging (opcional).
+        dtype : dict
+            Tipos SQLAlchemy das colunas da staging, herdados pela tabela de
+            destino quando ela é criada (opcional).
+
+        Retorno:
+        -------
+        int
+            Quantidade de linhas enviadas para a mescla.
+        """
+        keys = list(keys)
+        missing_keys = [key for key in keys if key not in df.columns]
+        if missing_keys:
+            raise ValueError(
+                f"Colunas de chave ausentes para a tabela '{table}': {missing_keys}"
+            )
+
+        # ON CONFLICT não aceita a mesma chave duas vezes no mesmo comando, e
+        # descartar as repetidas perderia linhas de uma chave mal declarada
+        repeated = int(df.duplicated(subset=keys).sum())
+        if repeated:
+            raise ValueError(
+                f"{repeated} linhas com chave repetida na carga da tabela "
+                f"'{table}': a chave {keys} não identifica unicamente uma linha."
+            )
+
+        staging = f'{table}_staging'
+        quote = engine.dialect.identifier_preparer.quote
+        columns = ', '.join(quote(column) for column in df.columns)
+        key_columns = ', '.join(quote(key) for key in keys)
+        updates = ', '.join(
+            f'{quote(column)} = EXCLUDED.{quote(column)}'
+            for column in df.columns
+            if column not in keys
+        )
+        conflict_action = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+        null_keys = bool(df[keys].isna().any(axis=None))
+
+        with self._transaction(engine) as connection:
+            df.to_sql(
+                name=staging,
+                con=connection,
+                if_exists='replace',
+                index=False,
+                method=method,
+                dtype=dtype,
+            )
+
+            if inspect(connection).has_table(table):
+                self._add_missing_columns(connection, df, table)
+            else:
+                connection.execute(
+                    text(
+                        f'CREATE TABLE {quote(table)} AS '
+                        f'SELECT * FROM {quote(staging)} WHERE false'
+                    )
+                )
+
+            connection.execute(
+                text(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS '
+                    f'{quote(f"{table}_upsert_key")} '
+                    f'ON {quote(table)} ({key_columns})'
+                )
+            )
+            if null_keys:
+                not_distinct = (
+                    'IS NOT DISTINCT FROM'
+                    if connection.dialect.name == 'postgresql'
+                    else 'IS'
+                )
+                same_key = ' AND '.join(
+                    f'{quote(table)}.{quote(key)} {not_distinct} '
+                    f'{quote(staging)}.{quote(key)}'
+                    for key in keys
+                )
+                any_null = ' OR '.join(
+                    f'{quote(table)}.{quote(key)} IS NULL' for key in keys
+                )
+                connection.execute(
+                    text(
+                        f'DELETE FROM {quote(table)} WHERE ({any_null}) AND '
+                        f'EXISTS (SELECT 1 FROM {quote(staging)} WHERE {same_key})'
+                    )
+                )
+            # "WHERE true" evita a ambiguidade entre ON CONFLICT e um JOIN
+            connection.execute(
+                text(
+                    f'INSERT INTO {quote(table)} ({columns}) '
+                    f'SELECT {columns} FROM {quote(staging)} WHERE true '
+                    f'ON CONFLICT ({key_columns}) {conflict_action}'
+                )
+            )
+            connection.execute(text(f'DROP TABLE {quote(staging)}'))
+
+        return len(df)
+
+    def read_row_hashes(
+        self, engine: Engine, table: str, keys: Sequence[str], hash_column: str
+    ) -> dict:
+        """
+        Lê a chave e o hash de conteúdo de cada linha da tabela.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela.
+        keys : Sequence[str]
+            Colunas que identificam unicamente uma linha.
+        hash_column : str
+            Coluna com o hash do conteúdo.
+
+        Retorno:
+        -------
+        dict
+            {valores da chave: hash}, vazio se a tabela não existir. O hash é
+            None quando a tabela ainda não tem a coluna de hash.
+        """
+        quote = engine.dialect.identifier_preparer.quote
+
+        with self._transaction(engine) as connection:
+            inspector = inspect(connection)
+            if not inspector.has_table(table):
+                return {}
+
+            columns = {column['name'] for column in inspector.get_columns(table)}
+            hash_expression = quote(hash_column) if hash_column in columns else 'NULL'
+            result = connection.execute(
+                text(
+                    f'SELECT {", ".join(quote(key) for key in keys)}, '
+                    f'{hash_expression} FROM {quote(table)}'
+                )
+            )
+            return {tuple(row[:-1]): row[-1] for row in result}
+
+    def delete_rows(
+        self,
+        engine: Engine,
+        table: str,
+        keys: Sequence[str],
+        values: Sequence[tuple],
+    ) -> int:
+        """
+        Apaga da tabela as linhas com as chaves informadas.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela.
+        keys : Sequence[str]
+            Colunas que identificam unicamente uma linha.
+        values : Sequence[tuple]
+            Valores da chave de cada linha a ser apagada.
+
+        Retorno:
+        -------
+        int
+            Quantidade de chaves enviadas para exclusão.
+        """
+        if not values:
+            return 0
+
+        quote = engine.dialect.identifier_preparer.quote
+        condition = ' AND '.join(
+            f'{quote(key)} = :key_{position}' for position, key in enumerate(keys)
+        )
+
+        with self._transaction(engine) as connection:
+            connection.execute(
+                text(f'DELETE FROM {quote(table)} WHERE {condition}'),
+                [
+                    {f'key_{position}': value for position, value in enumerate(row)}
+                    for row in values
+                ],
+            )
+
+        return len(values)
+
+    @staticmethod
+    def shadow_table(table: str) -> str:
+        """
+        Retorna o nome da tabela de sombra de uma tabela de destino.
+
+        Parâmetros:
+        ----------
+        table : str
+            Nome da tabela de destino.
+
+        Retorno:
+        -------
+        str
+            Nome da tabela de sombra.
+        """
+        return f'{table}{SHADOW_SUFFIX}'
+
+    def create_shadow_table(
+        self,
+        engine: Engine,
+        df: pd.DataFrame,
+        table: str,
+        dtype: dict = None,
+        unlogged: bool = False,
+    ) -> str:
+        """
+        Cria, vazia, a tabela de sombra que recebe a carga de uma tabela em "replace".
+
+        Uma sombra que tenha sobrado de uma execução interrompida é descartada.
+        A tabela viva não é tocada até `swap_shadow_table`.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        df : pd.DataFrame
+            DataFrame com as colunas da tabela.
+        table : str
+            Nome da tabela de destino.
+        dtype : dict
+            Tipos SQLAlchemy das colunas (opcional).
+        unlogged : bool
+            Cria a sombra como UNLOGGED (apenas PostgreSQL), sem escrita no WAL
+            durante a carga.
+
+        Retorno:
+        -------
+        str
+            Nome da tabela de sombra.
+        """
+        shadow = self.shadow_table(table)
+        quote = engine.dialect.identifier_preparer.quote
+
+        with self._transaction(engine) as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {quote(shadow)}'))
+            df.head(0).to_sql(
+                name=shadow, con=connection, index=False, dtype=dtype
+            )
+            if unlogged and engine.dialect.name == 'postgresql':
+                connection.execute(
+                    text(f'ALTER TABLE {quote(shadow)} SET UNLOGGED')
+                )
+
+        return shadow
+
+    def create_indexes(
+        self, engine: Engine, table: str, indexes: Sequence[dict]
+    ) -> None:
+        """
+        Cria na tabela os índices que ainda não existem.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela.
+        indexes : Sequence[dict]
+            Índices no formato do `Inspector.get_indexes`:
+            {"name", "column_names", "unique"}.
+        """
+        if not indexes:
+            return
+
+        with self._transaction(engine) as connection:
+            for index in self._applicable_indexes(connection, table, indexes):
+                connection.execute(
+                    self._create_index_sql(connection, table, index, index['name'])
+                )
+
+    def analyze_table(self, engine: Engine, table: str) -> None:
+        """
+        Atualiza as estatísticas da tabela usadas pelo planejador de consultas.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela.
+        """
+        quote = engine.dialect.identifier_preparer.quote
+        with self._transaction(engine) as connection:
+            connection.execute(text(f'ANALYZE {quote(table)}'))
+
+    @staticmethod
+    def _applicable_indexes(
+        connection: Connection, table: str, indexes: Sequence[dict]
+    ) -> List[dict]:
+        """
+        Filtra os índices cujas colunas existem todas na tabela.
+        """
+        columns = {column['name'] for column in inspect(connection).get_columns(table)}
+        return [
+            index
+            for index in indexes
+            if set(index['column_names']) <= columns
+        ]
+
+    @staticmethod
+    def _create_index_sql(
+        connection: Connection, table: str, index: dict, name: str
+    ):
+        """
+        Monta o `CREATE INDEX IF NOT EXISTS` de um índice.
+        """
+        quote = connection.dialect.identifier_preparer.quote
+        unique = 'UNIQUE ' if index.get('unique') else ''
+        columns = ', '.join(quote(column) for column in index['column_names'])
+        return text(
+            f'CREATE {unique}INDEX IF NOT EXISTS {quote(name)} '
+            f'ON {quote(table)} ({columns})'
+        )
+
+    def swap_shadow_table(
+        self,
+        engine: Engine,
+        table: str,
+        unlogged: bool = False,
+        indexes: Sequence[dict] = (),
+    ) -> None:
+        """
+        Substitui a tabela de destino pela sua tabela de sombra já carregada.
+
+        Os índices da tabela viva e os índices declarados em `indexes` são
+        criados na sombra antes da troca, fora da transação da troca. A troca
+        (DROP da tabela viva, RENAME da sombra e dos índices) é uma única
+        transação: leitores veem a tabela antiga até o COMMIT e a nova logo
+        depois, nunca uma tabela vazia ou parcial.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela de destino.
+        unlogged : bool
+            A sombra foi criada como UNLOGGED e volta a ser LOGGED antes da troca.
+        indexes : Sequence[dict]
+            Índices declarados para a tabela, no formato do `Inspector.get_indexes`.
+        """
+        shadow = self.shadow_table(table)
+        quote = engine.dialect.identifier_preparer.quote
+
+        with engine.begin() as connection:
+            if unlogged and engine.dialect.name == 'postgresql':
+                connection.execute(text(f'ALTER TABLE {quote(shadow)} SET LOGGED'))
+
+            live_indexes = []
+            if inspect(connection).has_table(table):
+                live_indexes = [
+                    index
+                    for index in inspect(connection).get_indexes(table)
+                    if None not in index['column_names']
+                ]
+            # Os declarados prevalecem sobre índices vivos de mesmo nome
+            shadow_indexes = {
+                index['name']: index
+                for index in self._applicable_indexes(
+                    connection, shadow, [*live_indexes, *indexes]
+                )
+            }
+            # Sem ALTER INDEX ... RENAME (ex.: SQLite), os índices são criados
+            # com o nome final depois da troca
+            rename_indexes = engine.dialect.name == 'postgresql'
+            if rename_indexes:
+                for name, index in shadow_indexes.items():
+                    connection.execute(
+                        self._create_index_sql(
+                            connection, shadow, index, name + SHADOW_SUFFIX
+                        )
+                    )
+
+        with engine.begin() as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {quote(table)}'))
+            connection.execute(
+                text(f'ALTER TABLE {quote(shadow)} RENAME TO {quote(table)}')
+            )
+            for name, index in shadow_indexes.items():
+                if rename_indexes:
+                    connection.execute(
+                        text(
+                            f'ALTER INDEX {quote(name + SHADOW_SUFFIX)} '
+                            f'RENAME TO {quote(name)}'
+                        )
+                    )
+                else:
+                    connection.execute(
+                        self._create_index_sql(connection, table, index, name)
+                    )
+
+    def create_partitioned_table(
+        self,
+        engine: Engine,
+        df: pd.DataFrame,
+        table: str,
+        column: str,
+        dtype: dict = None,
+    ) -> None:
+        """
+        Cria, se ainda não existir, a tabela particionada por faixa de `column`.
+
+        No PostgreSQL a tabela é criada com PARTITION BY RANGE e não guarda
+        linhas: elas ficam nas partições anexadas por `swap_partition`. Nos
+        demais bancos, sem particionamento declarativo, é uma tabela comum.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        df : pd.DataFrame
+            DataFrame com as colunas da tabela.
+        table : str
+            Nome da tabela de destino.
+        column : str
+            Coluna de partição, do tipo TIMESTAMP WITH TIME ZONE.
+        dtype : dict
+            Tipos SQLAlchemy das colunas (opcional).
+        """
+        quote = engine.dialect.identifier_preparer.quote
+        postgresql = engine.dialect.name == 'postgresql'
+
+        with self._transaction(engine) as connection:
+            if inspect(connection).has_table(table):
+                if postgresql and not connection.execute(
+                    text(
+                        'SELECT 1 FROM pg_partitioned_table '
+                        'WHERE partrelid = to_regclass(:table)'
+                    ),
+                    {'table': quote(table)},
+                ).first():
+                    raise RuntimeError(
+                        f"A tabela '{table}' já existe e não é particionada. "
+                        'Remova-a antes da primeira carga em "partition".'
+                    )
+                return
+
+            if postgresql:
+                ddl = pd.io.sql.get_schema(
+                    df.head(0), table, con=connection, dtype=dtype
+                )
+                connection.execute(
+                    text(f'{ddl.strip()} PARTITION BY RANGE ({quote(column)})')
+                )
+            else:
+                df.head(0).to_sql(
+                    name=table, con=connection, index=False, dtype=dtype
+                )
+
+    def partition_shadows(self, engine: Engine, table: str) -> List[str]:
+        """
+        Lista as partições com tabela de sombra em carga, ainda não trocadas.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela particionada.
+
+        Retorno:
+        -------
+        List[str]
+            Nomes das partições (sem o sufixo da sombra), em ordem.
+        """
+        prefix = f'{table}_p'
+        partitions = []
+        for name in inspect(engine).get_table_names():
+            if not (name.startswith(prefix) and name.endswith(SHADOW_SUFFIX)):
+                continue
+            partition = name[: -len(SHADOW_SUFFIX)]
+            if partition[len(prefix):].isdigit():
+                partitions.append(partition)
+        return sorted(partitions)
+
+    def create_partition_shadow(
+        self, engine: Engine, table: str, partition: str, unlogged: bool = False
+    ) -> str:
+        """
+        Cria, vazia e com as colunas da tabela particionada, a sombra de uma partição.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela particionada.
+        partition : str
+            Nome da partição.
+        unlogged : bool
+            Cria a sombra como UNLOGGED (apenas PostgreSQL).
+
+        Retorno:
+        -------
+        str
+            Nome da tabela de sombra.
+        """
+        shadow = self.shadow_table(partition)
+        quote = engine.dialect.identifier_preparer.quote
+
+        with self._transaction(engine) as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {quote(shadow)}'))
+            if engine.dialect.name == 'postgresql':
+                persistence = 'UNLOGGED ' if unlogged else ''
+                connection.execute(
+                    text(
+                        f'CREATE {persistence}TABLE {quote(shadow)} '
+                        f'(LIKE {quote(table)} INCLUDING DEFAULTS)'
+                    )
+                )
+            else:
+                connection.execute(
+                    text(
+                        f'CREATE TABLE {quote(shadow)} AS '
+                        f'SELECT * FROM {quote(table)} WHERE 1 = 0'
+                    )
+                )
+
+        return shadow
+
+    def drop_partition_shadows(self, engine: Engine, table: str) -> None:
+        """
+        Descarta as sombras de partição que sobraram de uma carga interrompida.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela particionada.
+        """
+        quote = engine.dialect.identifier_preparer.quote
+        with self._transaction(engine) as connection:
+            for partition in self.partition_shadows(connection, table):
+                connection.execute(
+                    text(f'DROP TABLE {quote(self.shadow_table(partition))}')
+                )
+
+    def swap_partition(
+        self,
+        engine: Engine,
+        table: str,
+        partition: str,
+        column: str,
+        start,
+        end,
+        unlogged: bool = False,
+        indexes: Sequence[dict] = (),
+    ) -> None:
+        """
+        Substitui uma partição pela sua tabela de sombra já carregada.
+
+        No PostgreSQL a sombra recebe, fora da transação da troca, uma CHECK
+        com a faixa da partição (o ATTACH não precisa reler as linhas) e os
+        índices declarados. A troca (DETACH e DROP da partição antiga, RENAME
+        e ATTACH da sombra) é uma única transação e não toca as demais
+        partições. Nos outros bancos, as linhas da faixa são apagadas e
+        copiadas da sombra numa única transação.
+
+        Parâmetros:
+        ----------
+        engine : Engine
+            Objeto SQLAlchemy `Engine` do banco de destino.
+        table : str
+            Nome da tabela particionada.
+        partition : str
+            Nome da partição.
+        column : str
+            Coluna de partição.
+        start : datetime
+            Início inclusivo da faixa da partição.
+        end : datetime
+            Fim exclusivo da faixa da partição.
+        unlogged : bool
+            A sombra foi criada como UNLOGGED e volta a ser LOGGED antes da troca.
+        indexes : Sequence[dict]
+            Índices declarados para a tabela, no formato do `Inspector.get_indexes`.
+        """
+        shadow = self.shadow_table(partition)
+        quote = engine.dialect.identifier_preparer.quote
+
+        if engine.dialect.name != 'postgresql':
+            with engine.begin() as connection:
+                columns = ', '.join(
+                    quote(shadow_column['name'])
+                    for shadow_column in inspect(connection).get_columns(shadow)
+                )
+                connection.execute(
+                    text(
+                        f'DELETE FROM {quote(table)} '
+                        f'WHERE {quote(column)} >= :start AND {quote(column)} < :end'
+                    ).bindparams(
+                        bindparam('start', type_=DateTime(timezone=True)),
+                        bindparam('end', type_=DateTime(timezone=True)),
+                    ),
+                    {'start': start, 'end': end},
+                )
+                connection.execute(
+                    text(
+                        f'INSERT INTO {quote(table)} ({columns}) '
+                        f'SELECT {columns} FROM {quote(shadow)}'
+                    )
+                )
+                connection.execute(text(f'DROP TABLE {quote(shadow)}'))
+            return
+
+        start, end = f"'{start.isoformat()}'", f"'{end.isoformat()}'"
+        # Índices da partição: nome do índice declarado + sufixo da partição
+        suffix = partition[len(table):]
+
+        with engine.begin() as connection:
+            if unlogged:
+                connection.execute(text(f'ALTER TABLE {quote(shadow)} SET LOGGED'))
+            connection.execute(
+                text(
+                    f'ALTER TABLE {quote(shadow)} '
+                    f'ADD CONSTRAINT {quote(partition + "_range")} '
+                    f'CHECK ({quote(column)} IS NOT NULL '
+                    f'AND {quote(column)} >= {start} AND {quote(column)} < {end})'
+                )
+            )
+            shadow_indexes = {
+                index['name'] + suffix: index
+                for index in self._applicable_indexes(connection, shadow, indexes)
+            }
+            for name, index in shadow_indexes.items():
+                connection.execute(
+                    self._create_index_sql(
+                        connection, shadow, index, name + SHADOW_SUFFIX
+                    )
+                )
+
+        with engine.begin() as connection:
+            if inspect(connection).has_table(partition):
+                connection.execute(
+                    text(
+                        f'ALTER TABLE {quote(table)} '
+                        f'DETACH PARTITION {quote(partition)}'
+                    )
+                )
+                connection.execute(text(f'DROP TABLE {quote(partition)}'))
+            connection.execute(
+                text(f'ALTER TABLE {quote(shadow)} RENAME TO {quote(partition)}')
+            )
+            for name in shadow_indexes:
+                connection.execute(
+                    text(
+                        f'ALTER INDEX {quote(name + SHADOW_SUFFIX)} '
+                        f'RENAME TO {quote(name)}'
+                    )
+                )
+            connection.execute(
+                text(
+                    f'ALTER TABLE {quote(table)} ATTACH PARTITION '
+                    f'{quote(partition)} FOR VALUES FROM ({start}) TO ({end})'
+                )
+            )
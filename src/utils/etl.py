@@ -1,18 +1,156 @@
 import os
 import sys
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import Engine
+from bson import encode as encode_bson
+from sqlalchemy import Connection, Engine, inspect
 from sqlalchemy.exc import SQLAlchemyError
 
 sys.path.append(
     os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 )
 
+from src.utils.changes import HASH_COLUMN, RowHashIndex
 from src.utils.destination import DbEngine
-from src.utils.source import MongoDBProcess
+from src.utils.metrics import RunMetrics
+from src.utils.source import DEFAULT_BATCH_SIZE, MongoDBProcess
+from src.utils.schemas import (
+    TABLE_INDEXES,
+    TABLE_PARTITIONS,
+    TABLE_SCHEMAS,
+    apply_schema,
+    get_indexes,
+    get_partitioning,
+    get_schema,
+    partition_name,
+    partition_range,
+    partition_starts,
+    sql_types,
+)
+from src.utils.specs import (
+    FLATTEN_SPECS,
+    build_pipeline,
+    build_projection,
+    child_tables,
+    compile_children,
+    compile_spec,
+    get_spec,
+    spec_fields,
+)
+from src.utils.staging import StagingArea
+from src.utils.state import CheckpointStore, SyncStateStore
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
+from queue import Full, Queue
+from threading import Event, Thread
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Sincronização contínua: intervalo (s) e quantidade de documentos por descarga
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_FLUSH_SIZE = 1000
+
+# Campo do SyncStateStore onde fica o resume token do change stream
+RESUME_TOKEN_FIELD = 'resume_token'
+
+# Listas aninhadas descartadas ao explodir cada coleção, para não multiplicar as linhas
+DROPPED_NESTED_COLUMNS = {
+    'sport_event_markets': ['books_outcomes'],
+    'sport_event_player_props': ['markets_books'],
+}
+
+
+def _require_pyarrow():
+    """
+    Importa o pyarrow, dependência opcional usada apenas no caminho Arrow.
+
+    :return: module - Módulo `pyarrow`, com `pyarrow.compute` carregado.
+    """
+    try:
+        import pyarrow
+        import pyarrow.compute
+    except ImportError as e:
+        raise ImportError(
+            'O caminho Arrow requer o pacote opcional "pyarrow" '
+            '(pip install pyarrow pymongoarrow).'
+        ) from e
+    return pyarrow
+
+
+# Marca o fim dos itens de uma etapa em `_pipelined`
+_END = object()
+
+
+def _bson_size(document: dict) -> int:
+    """
+    Calcula o tamanho em BSON de um documento lido do MongoDB.
+
+    O driver não expõe o tamanho dos documentos já decodificados, então o
+    documento é codificado de novo; o custo fica fora do tempo da extração.
+
+    :param document: dict - Documento lido.
+    :return: int - Bytes do documento em BSON.
+    """
+    return len(encode_bson(document))
+
+
+def _pipelined(iterable, depth: int, name: str = 'etl-stage') -> Iterator:
+    """
+    Consome o iterável numa thread própria, repassando os itens por uma fila limitada.
+
+    A thread produz até `depth` itens à frente de quem consome e então espera
+    (backpressure), o que limita a memória. Exceções da thread são relançadas
+    no consumidor; se o consumidor parar antes do fim, a thread é encerrada.
+
+    :param iterable: Iterable - Itens produzidos pela etapa anterior.
+    :param depth: int - Itens que podem aguardar na fila.
+    :param name: str - Nome da thread.
+    :return: Iterator - Os mesmos itens de `iterable`.
+    """
+    items = Queue(maxsize=depth)
+    stop = Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+            put((_END, None))
+        except BaseException as e:
+            put((_END, e))
+        finally:
+            # Encerra etapas encadeadas quando o consumidor desiste antes do fim
+            if hasattr(iterator, 'close'):
+                iterator.close()
 
-from typing import List
+    thread = Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
 
 
 class ETLProcess(MongoDBProcess, DbEngine):
@@ -20,223 +158,2001 @@ class ETLProcess(MongoDBProcess, DbEngine):
     Classe responsável por extrair dados de um banco MongoDB e carregá-los em um banco PostgreSQL.
     """
 
-    def __init__(self, uri: str, write_mode: str = 'replace'):
+    def __init__(
+        self,
+        uri: str,
+        write_mode: str = 'replace',
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        load_method: str = 'insert',
+        upsert_keys: Dict[str, Sequence[str]] = None,
+        flatten_specs: Dict[str, dict] = None,
+        pushdown: str = 'none',
+        table_schemas: Dict[str, dict] = None,
+        unlogged: bool = False,
+        table_indexes: Dict[str, dict] = None,
+        metrics: RunMetrics = None,
+        pipeline_depth: int = 0,
+        normalize: bool = False,
+        table_partitions: Dict[str, dict] = None,
+    ):
         """
         Inicializa a conexão com o MongoDB e configura a estratégia de escrita no PostgreSQL.
 
         :param uri: str - URI de conexão do MongoDB.
-        :param write_mode: str - Modo de escrita no PostgreSQL ("append" ou "replace").
+        :param write_mode: str - Modo de escrita no PostgreSQL ("append", "replace",
+            "upsert", "diff", que grava só as linhas inseridas, alteradas ou
+            removidas desde a última carga, ou "partition", que reconstrói só
+            as partições com linhas na carga).
+        :param batch_size: int - Quantidade de documentos por lote do cursor do MongoDB.
+        :param load_method: str - Método de carga no PostgreSQL ("insert" ou "copy").
+        :param upsert_keys: dict - Colunas de chave de cada tabela, usadas no modo "upsert".
+        :param flatten_specs: dict - Especificações de achatamento adicionais ou que
+            substituem as de FLATTEN_SPECS.
+        :param pushdown: str - Trabalho delegado ao MongoDB: "none" (documentos
+            completos), "projection" (apenas os campos usados no achatamento) ou
+            "aggregate" (achatamento no servidor via $unwind, só em
+            `iter_parsing_json`; as cargas em blocos e com várias coleções por
+            leitura o recusam).
+        :param table_schemas: dict - Esquemas de tabela adicionais ou que
+            substituem os de TABLE_SCHEMAS.
+        :param unlogged: bool - Carrega as tabelas de sombra do modo "replace"
+            como UNLOGGED, sem WAL durante a carga.
+        :param table_indexes: dict - Índices de tabela adicionais ou que
+            substituem os de TABLE_INDEXES.
+        :param metrics: RunMetrics - Medições das etapas (padrão: uma nova execução).
+        :param pipeline_depth: int - Nas cargas em blocos, executa extração,
+            transformação e carga em threads ligadas por filas com até
+            `pipeline_depth` blocos cada (0 executa as etapas em sequência).
+        :param normalize: bool - Grava as listas declaradas em "children" nas
+            especificações como tabelas filhas, com as chaves do pai, em vez
+            de explodi-las na tabela principal.
+        :param table_partitions: dict - Particionamentos de tabela adicionais
+            ou que substituem os de TABLE_PARTITIONS.
         """
         super().__init__(uri)
         self.write_mode = write_mode
+        self.batch_size = batch_size
+        self.load_method = load_method
+        self.upsert_keys = upsert_keys or {}
+        self.flatten_specs = {**FLATTEN_SPECS, **(flatten_specs or {})}
+        self._flatteners = {}
+        self.pushdown = pushdown
+        self.table_schemas = {**TABLE_SCHEMAS, **(table_schemas or {})}
+        self.unlogged = unlogged
+        self.table_indexes = {**TABLE_INDEXES, **(table_indexes or {})}
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.pipeline_depth = pipeline_depth
+        self.normalize = normalize
+        self.table_partitions = {**TABLE_PARTITIONS, **(table_partitions or {})}
         self.engine = None  # Engine do PostgreSQL será inicializada depois
 
-    def parsing_json(
+    def iter_parsing_json(
         self,
         database_name: str,
         collection_name: str,
         key_collection: str,
         query: dict = None,
-    ) -> list:
+        batch_size: int = None,
+    ) -> Iterator[dict]:
         """
-        Extrai documentos do MongoDB e transforma em uma lista de dicionários.
+        Extrai documentos do MongoDB via cursor e gera as linhas achatadas uma a uma.
+
+        Nenhuma lista intermediária é montada: cada documento é achatado assim que
+        chega do cursor, então o pico de memória depende do `batch_size`, e não do
+        tamanho da coleção. Com `pushdown="aggregate"` o achatamento é feito pelo
+        próprio MongoDB e as linhas já chegam prontas.
 
         :param database_name: str - Nome do banco de dados.
         :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
         :param query: dict - Critério de consulta (padrão: consulta vazia).
-        :return: list - Lista de documentos processados.
+        :param batch_size: int - Documentos por lote do cursor (padrão: o da instância).
+        :return: Iterator[dict] - Gerador de linhas processadas.
         """
-        if query is None:
-            query = {}
+        if batch_size is None:
+            batch_size = self.batch_size
 
-        if collection_name == 'outcomes':
-            list_document = self.read_nosql(database_name, 'sport_event_markets', query)
-        elif collection_name == 'player_props_books':
-            list_document = self.read_nosql(database_name, 'sport_event_player_props', query)
-        else:
-            list_document = self.read_nosql(database_name, collection_name, query)
-        list_to_append = []
+        source = self._source_collection(collection_name)
+
+        if self.pushdown == 'aggregate':
+            pipeline = build_pipeline(
+                get_spec(collection_name, self.flatten_specs),
+                key_collection,
+                query,
+            )
+            yield from self.metrics.iter_timed(
+                collection_name,
+                'extract',
+                self.iter_aggregate(database_name, source, pipeline, batch_size),
+                count='rows',
+                size=_bson_size,
+            )
+            return
+
+        documents = self.metrics.iter_timed(
+            collection_name,
+            'extract',
+            self.iter_nosql(
+                database_name,
+                source,
+                query,
+                batch_size,
+                projection=self._projection({collection_name: key_collection}),
+            ),
+            size=_bson_size,
+        )
+
+        flatten_seconds = 0.0
+        flattened_rows = 0
+        try:
+            for document in documents:
+                start = perf_counter()
+                rows = self._flatten_document(
+                    document, collection_name, key_collection
+                )
+                flatten_seconds += perf_counter() - start
+                flattened_rows += len(rows)
+                yield from rows
+        finally:
+            self.metrics.record(
+                collection_name,
+                'flatten',
+                seconds=flatten_seconds,
+                rows=flattened_rows,
+            )
+
+    def iter_chunks(
+        self,
+        database_name: str,
+        collection_name: str,
+        key_collection: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        query: dict = None,
+        sort: List[tuple] = None,
+    ) -> Iterator[Tuple[List[dict], dict]]:
+        """
+        Gera as linhas achatadas agrupadas por blocos de `chunk_size` documentos de origem.
+
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param chunk_size: int - Quantidade de documentos de origem por bloco.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param sort: List[tuple] - Ordenação do cursor (opcional).
+        :return: Iterator[Tuple[List[dict], dict]] - Gerador de pares
+            (linhas do bloco, último documento lido no bloco).
+        """
+        for rows, last_document in self.iter_chunks_fanout(
+            database_name,
+            {collection_name: key_collection},
+            chunk_size,
+            query,
+            sort,
+        ):
+            yield rows[collection_name], last_document
+
+    def iter_chunks_fanout(
+        self,
+        database_name: str,
+        targets: Dict[str, str],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        query: dict = None,
+        sort: List[tuple] = None,
+    ) -> Iterator[Tuple[Dict[str, List[dict]], dict]]:
+        """
+        Alimenta várias coleções lógicas com uma única leitura da coleção de origem.
+
+        Cada documento lido é passado para o achatamento de todas as coleções de
+        `targets`, que precisam compartilhar a mesma coleção de origem (ex.:
+        "sport_event_markets" e "outcomes").
+
+        :param database_name: str - Nome do banco de dados.
+        :param targets: dict - Coleções lógicas e suas chaves {coleção: chave}.
+        :param chunk_size: int - Quantidade de documentos de origem por bloco.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param sort: List[tuple] - Ordenação do cursor (opcional).
+        :return: Iterator - Gerador de pares ({coleção: linhas do bloco},
+            último documento lido no bloco).
+        """
+        flatteners = {
+            collection_name: self._flattener(collection_name, key_collection)
+            for collection_name, key_collection in targets.items()
+        }
+        source = self._shared_source(targets)
+        documents = self.metrics.iter_timed(
+            source,
+            'extract',
+            self.iter_nosql(
+                database_name,
+                source,
+                query,
+                self.batch_size,
+                sort,
+                projection=self._projection(
+                    targets, extra_fields=[field for field, _ in sort or []]
+                ),
+            ),
+            size=_bson_size,
+        )
+
+        while True:
+            rows = {collection_name: [] for collection_name in targets}
+            last_document = None
+            flatten_seconds = 0.0
+            for document in islice(documents, chunk_size):
+                last_document = document
+                start = perf_counter()
+                for collection_name, flatten in flatteners.items():
+                    rows[collection_name].extend(flatten(document))
+                flatten_seconds += perf_counter() - start
+            # Uma leitura alimenta todas as coleções: o tempo é dividido igualmente
+            for collection_name, chunk in rows.items():
+                self.metrics.record(
+                    collection_name,
+                    'flatten',
+                    seconds=flatten_seconds / len(rows),
+                    rows=len(chunk),
+                )
+            if last_document is None:
+                return
+            yield rows, last_document
+
+    def load_chunked(
+        self,
+        engine: Engine,
+        database_name: str,
+        collection_name: str,
+        key_collection: str,
+        table: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        query: dict = None,
+        sort: List[tuple] = None,
+        write_mode: str = None,
+        on_chunk: Callable[[int, dict, Connection], None] = None,
+    ) -> int:
+        """
+        Executa extração, transformação e carga a cada bloco de `chunk_size` documentos.
+
+        O primeiro bloco carregado usa `write_mode` (padrão: o da instância) e,
+        no modo "replace", os seguintes usam "append". Colunas que só aparecem
+        em blocos posteriores são adicionadas à tabela antes da carga do bloco.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param table: str - Nome da tabela de destino.
+        :param chunk_size: int - Quantidade de documentos de origem por bloco.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param sort: List[tuple] - Ordenação do cursor (opcional).
+        :param write_mode: str - Modo de escrita do primeiro bloco (opcional).
+        :param on_chunk: Callable - Chamado após cada bloco com a quantidade de
+            linhas carregadas, o último documento lido e a conexão da transação
+            do bloco, antes do COMMIT (opcional).
+        :return: int - Total de linhas carregadas.
+        """
+        loaded = self.load_chunked_fanout(
+            engine,
+            database_name,
+            {collection_name: (key_collection, table)},
+            chunk_size=chunk_size,
+            query=query,
+            sort=sort,
+            write_mode=write_mode,
+            on_chunk=on_chunk,
+        )
+        return loaded[collection_name]
 
-        for document in list_document:
+    def load_chunked_fanout(
+        self,
+        engine: Engine,
+        database_name: str,
+        targets: Dict[str, Tuple[str, str]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        query: dict = None,
+        sort: List[tuple] = None,
+        write_mode: str = None,
+        on_chunk: Callable[[int, dict, Connection], None] = None,
+        shadow: bool = None,
+    ) -> Dict[str, int]:
+        """
+        Carrega em blocos várias tabelas derivadas de uma única leitura da origem.
+
+        Cada tabela é transformada e carregada de forma independente, com as
+        mesmas regras de `load_chunked`; com `normalize`, as tabelas filhas de
+        cada coleção também. Cada bloco (todas as tabelas e o
+        `on_chunk`) é confirmado numa única transação. Com `pipeline_depth`, a
+        leitura do próximo bloco e a transformação ocorrem enquanto o bloco
+        anterior é gravado, e o tempo total tende ao da etapa mais lenta. No
+        modo "diff" as linhas removidas na origem só são apagadas quando a
+        leitura cobre a coleção inteira (sem `query`).
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param database_name: str - Nome do banco de dados.
+        :param targets: dict - {coleção: (chave da coleção, tabela de destino)}.
+        :param chunk_size: int - Quantidade de documentos de origem por bloco.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param sort: List[tuple] - Ordenação do cursor (opcional).
+        :param write_mode: str - Modo de escrita do primeiro bloco (opcional).
+        :param on_chunk: Callable - Chamado após cada bloco com a quantidade de
+            linhas carregadas, o último documento lido e a conexão da transação
+            do bloco, antes do COMMIT (opcional).
+        :param shadow: bool - Carrega na tabela de sombra, trocada no fim (padrão:
+            apenas no modo "replace"). Permite retomar em "append" uma sombra
+            já iniciada; no modo "partition", continua as sombras de partição
+            já iniciadas em vez de descartá-las.
+        :return: dict - Total de linhas carregadas por coleção (somando as
+            tabelas filhas).
+        """
+        self._require_document_scan()
+        if write_mode is None:
+            write_mode = self.write_mode
+        # No modo "replace" os blocos vão para a tabela de sombra, trocada no fim
+        if shadow is None:
+            shadow = write_mode == 'replace'
+        tables = [
+            output
+            for collection_name, (key_collection, table) in targets.items()
+            for output in self.output_tables(
+                collection_name, key_collection, table
+            )
+        ]
+        write_modes = {table: write_mode for table in tables}
+        table_rows = {table: 0 for table in tables}
+        total_rows = {collection_name: 0 for collection_name in targets}
+        changes = {}
+        if write_mode == 'diff':
+            changes = {
+                table: self.row_hash_index(engine, table) for table in tables
+            }
+        partitioned = write_mode == 'partition'
+        if partitioned and not shadow:
+            for table in tables:
+                self.drop_partition_shadows(engine, table)
+
+        chunks = self.iter_chunks_fanout(
+            database_name,
+            {name: key for name, (key, _) in targets.items()},
+            chunk_size,
+            query,
+            sort,
+        )
+        if self.pipeline_depth:
+            chunks = _pipelined(chunks, self.pipeline_depth, 'etl-extract')
+        frames = (
+            (
+                {
+                    collection_name: self.transform_tables(
+                        rows[collection_name],
+                        collection_name,
+                        key_collection,
+                        table,
+                    )
+                    for collection_name, (key_collection, table) in targets.items()
+                },
+                last_document,
+            )
+            for rows, last_document in chunks
+        )
+        if self.pipeline_depth:
+            frames = _pipelined(frames, self.pipeline_depth, 'etl-transform')
+
+        # Fecha as threads das etapas mesmo se a carga falhar no meio
+        with closing(frames):
+            for dfs, last_document in frames:
+                chunk_rows = {}
 
-            if collection_name == 'competition_schedules':
-                schedules = document.get(key_collection, [])
-                for sport_event in schedules:
-                    dict_sport_event = sport_event.get('sport_event', {})
-                    list_to_append.append(dict_sport_event)
+                with self._transaction(engine) as connection:
+                    for collection_name, frames_by_table in dfs.items():
+                        for table, df in frames_by_table.items():
+                            if df.empty:
+                                continue
 
-            elif collection_name == 'sport_event_player_props':
-                sport_event_players_props = document.get(key_collection, {})
-                sport_event = sport_event_players_props.get('sport_event', {})
-                event_id = sport_event.get('id')
+                            mode = write_modes[table]
+                            if mode == 'append':
+                                self.add_missing_columns(
+                                    connection,
+                                    df,
+                                    self.shadow_table(table) if shadow else table,
+                                )
 
-                player_props = sport_event_players_props.get('players_props', [])
+                            self.load_to_destination(
+                                connection,
+                                df,
+                                table,
+                                write_mode=mode,
+                                shadow=shadow,
+                                finalize=False,
+                                changes=changes.get(table),
+                            )
+                            chunk_rows[collection_name, table] = len(df)
 
-                for player in player_props:
-                    player['sport_event_id'] = event_id
+                    if on_chunk is not None:
+                        on_chunk(
+                            sum(chunk_rows.values()), last_document, connection
+                        )
 
-                list_to_append.extend(player_props)
+                # Só após o COMMIT: se o bloco falhar, o próximo recomeça do zero
+                for (collection_name, table), loaded_rows in chunk_rows.items():
+                    if write_modes[table] == 'replace':
+                        write_modes[table] = 'append'
+                    table_rows[table] += loaded_rows
+                    total_rows[collection_name] += loaded_rows
+
+        # Só uma leitura da coleção inteira revela as linhas removidas na origem
+        if changes and not query:
+            with self._transaction(engine) as connection:
+                for table in tables:
+                    if table_rows[table]:
+                        self.delete_missing(connection, table, changes[table])
+
+        for table in tables:
+            if table_rows[table]:
+                self.finalize_table(
+                    engine, table, swap=shadow, partitions=partitioned
+                )
+
+        return total_rows
+
+    def stage_chunks(
+        self,
+        database_name: str,
+        targets: Dict[str, Tuple[str, str]],
+        staging: StagingArea,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        query: dict = None,
+    ) -> Dict[str, int]:
+        """
+        Extrai e transforma as coleções em blocos, gravando-os na área de staging.
+
+        Não toca o PostgreSQL: a carga é feita depois por `load_staged`. Coleções
+        com a mesma origem são extraídas numa única leitura. Com `normalize`,
+        cada tabela filha tem as suas próprias partes.
+
+        :param database_name: str - Nome do banco de dados.
+        :param targets: dict - {coleção: (chave da coleção, tabela de destino)}.
+        :param staging: StagingArea - Área de staging em disco.
+        :param chunk_size: int - Quantidade de documentos de origem por parte.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :return: dict - Total de linhas gravadas por coleção.
+        """
+        self._require_document_scan()
+        tables = {
+            output: collection_name
+            for collection_name, (key_collection, table) in targets.items()
+            for output in self.output_tables(
+                collection_name, key_collection, table
+            )
+        }
+        for table, collection_name in tables.items():
+            staging.begin(table, collection_name)
+        total_rows = {collection_name: 0 for collection_name in targets}
 
-            elif collection_name == 'sport_event_markets':
-                sport_event = document.get("sport_event", {})
-                event_id = sport_event.get('id')
+        for rows, _ in self.iter_chunks_fanout(
+            database_name,
+            {name: key for name, (key, _) in targets.items()},
+            chunk_size,
+            query,
+        ):
+            for collection_name, (key_collection, table) in targets.items():
+                frames = self.transform_tables(
+                    rows[collection_name], collection_name, key_collection, table
+                )
+                for output, df in frames.items():
+                    if df.empty:
+                        continue
+                    with self.metrics.stage(output, 'stage') as stage:
+                        staging.write_part(output, df)
+                        stage['rows'] = len(df)
+                    total_rows[collection_name] += len(df)
 
-                markets = document.get(key_collection, [])
+        for table in tables:
+            staging.complete(table)
 
-                for market in markets:
-                    market['sport_event_id'] = event_id
+        return total_rows
 
-                list_to_append.extend(markets)
+    def load_staged(
+        self,
+        engine: Engine,
+        table: str,
+        staging: StagingArea,
+        write_mode: str = None,
+    ) -> int:
+        """
+        Carrega no PostgreSQL as partes de uma tabela gravadas na área de staging.
 
-            elif collection_name == 'outcomes':
-                sport_event = document.get("sport_event", {})
-                event_id = sport_event.get('id')
+        No modo "replace" todas as partes são recarregadas na tabela de sombra
+        a cada execução, já que a tabela viva só é trocada no fim. Nos modos
+        "append", "upsert" e "diff" as partes já carregadas numa execução
+        anterior são puladas, o que permite retomar uma carga interrompida; no
+        "diff" retomado, as linhas removidas na origem não são apagadas e no
+        "partition" retomado as sombras de partição já iniciadas continuam.
+        O registro de uma parte como carregada acontece depois do COMMIT e não
+        na mesma transação: se a execução cair entre os dois, a parte é
+        carregada de novo na retomada, o que não altera o resultado em
+        "upsert" e "diff", mas duplica as linhas da parte em "append".
 
-                markets = document.get(key_collection, [])
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param table: str - Nome da tabela de destino.
+        :param staging: StagingArea - Área de staging em disco.
+        :param write_mode: str - Modo de escrita (padrão: o da instância).
+        :return: int - Total de linhas carregadas nesta execução.
+        """
+        if write_mode is None:
+            write_mode = self.write_mode
+        shadow = write_mode == 'replace'
 
-                for market in markets:
-                    market_id = market.get('id')
+        loaded_parts = []
+        if not shadow:
+            loaded_parts = list(staging.completed_manifest(table)['loaded_parts'])
+        # Retomando, as partes já carregadas não passam pelo índice do "diff"
+        resumed = bool(loaded_parts)
+        changes = None
+        if write_mode == 'diff':
+            changes = self.row_hash_index(engine, table)
+        partitioned = write_mode == 'partition'
+        if partitioned and not resumed:
+            self.drop_partition_shadows(engine, table)
 
-                    books = market.get('books', [])
-                    for book in books:
-                        book_id = book.get('id')
+        mode = write_mode
+        total_rows = 0
+        for name, df in staging.iter_parts(table):
+            if name in loaded_parts:
+                continue
 
-                        outcomes = book.get('outcomes', [])
+            if mode == 'append':
+                self.add_missing_columns(
+                    engine, df, self.shadow_table(table) if shadow else table
+                )
+            self.load_to_destination(
+                engine,
+                df,
+                table,
+                write_mode=mode,
+                shadow=shadow,
+                finalize=False,
+                changes=changes,
+            )
+            if mode == 'replace':
+                mode = 'append'
+            total_rows += len(df)
 
-                        for outcome in outcomes:
-                            outcome['sport_event_id'] = event_id
-                            outcome['market_id'] = market_id
-                            outcome['books_id'] = book_id
+            loaded_parts.append(name)
+            if not shadow:
+                staging.mark_loaded(table, loaded_parts)
 
+        if changes is not None and total_rows and not resumed:
+            self.delete_missing(engine, table, changes)
+        # Retomada sem partes novas: as sombras de partição ainda não foram trocadas
+        if total_rows or (partitioned and resumed):
+            self.finalize_table(
+                engine, table, swap=shadow, partitions=partitioned
+            )
+        if shadow:
+            staging.mark_loaded(table, loaded_parts)
 
-                        list_to_append.extend(outcomes)
+        return total_rows
 
-            elif collection_name == 'player_props_books':
-                sport_event_players_props = document.get("sport_event_players_props", {})
-                sport_event = sport_event_players_props.get('sport_event', {})
-                event_id = sport_event.get('id')
+    def load_incremental(
+        self,
+        engine: Engine,
+        database_name: str,
+        collection_name: str,
+        key_collection: str,
+        table: str,
+        watermark_field: str = '_id',
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        state: SyncStateStore = None,
+    ) -> int:
+        """
+        Carrega apenas os documentos mais novos que a marca d'água salva da coleção.
 
-                player_props = sport_event_players_props.get('players_props', [])
-                for player_prop in player_props:
-                    
-                    player = player_prop.get('player', {})
-                    player_id = player.get('id')
+        A marca d'água é o maior valor de `watermark_field` já carregado (por
+        padrão o `_id`, cujo ObjectId cresce com o horário de inserção). A
+        leitura é ordenada por esse campo e a marca é salva na transação de
+        cada bloco, então uma falha no meio da carga não perde o progresso já
+        feito nem deixa a marca à frente das linhas confirmadas.
+        Sem estado salvo, a coleção é carregada por completo com o `write_mode`
+        da instância; no modo "replace" os blocos só chegam à tabela viva na
+        troca da sombra, então a marca é salva apenas depois dela, e uma falha
+        antes da troca repete a carga completa na próxima execução. O modo
+        "partition" não é aceito: as execuções seguintes mesclariam por
+        "upsert" numa tabela particionada. Nas execuções seguintes os novos dados são mesclados por
+        "upsert" quando a tabela tem chave em `upsert_keys`, ou acrescentados
+        caso contrário.
 
-                    markets = player_prop.get('markets', [])
-                    for market in markets:
-                        
-                        market_id = market.get('id')
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param table: str - Nome da tabela de destino.
+        :param watermark_field: str - Campo usado como marca d'água.
+        :param chunk_size: int - Quantidade de documentos de origem por bloco.
+        :param state: SyncStateStore - Armazenamento do estado (padrão: tabela
+            `etl_sync_state` no banco de destino).
+        :return: int - Total de linhas carregadas.
+        """
+        if self.write_mode == 'partition':
+            raise ValueError(
+                'A carga incremental não suporta o modo de escrita "partition"; '
+                'recarregue as partições recentes com uma carga completa ou em blocos.'
+            )
 
-                        books = market.get('books', [])
-                        for book in books:
-                            book['sport_event_id'] = event_id
-                            book['player_id'] = player_id
-                            book['market_id'] = market_id
+        if state is None:
+            state = SyncStateStore(engine)
 
-                        list_to_append.extend(books)
+        watermark = state.get_watermark(collection_name, watermark_field)
+        if watermark is None:
+            query = {}
+            write_mode = self.write_mode
+        elif table in self.upsert_keys:
+            # Com upsert, relemos os empates no valor da marca d'água (campos
+            # como updated_at não são únicos) sem gerar linhas duplicadas
+            operator = '$gt' if watermark_field == '_id' else '$gte'
+            query = {watermark_field: {operator: watermark}}
+            write_mode = 'upsert'
+        else:
+            query = {watermark_field: {'$gt': watermark}}
+            write_mode = 'append'
 
+        # Blocos em sombra: a marca só vale depois da troca, em `finalize_table`
+        deferred = write_mode == 'replace'
+        pending = {}
 
+        def save_watermark(
+            loaded_rows: int, last_document: dict, connection: Connection
+        ):
+            value = self._get_field(last_document, watermark_field)
+            if value is None:
+                return
+            if deferred:
+                pending['value'] = value
             else:
-                # Evita KeyError caso a chave não exista
-                data = document.get(key_collection, [])
-                list_to_append.extend(data)
+                state.set_watermark(
+                    collection_name, watermark_field, value, connection=connection
+                )
+
+        loaded = self.load_chunked(
+            engine,
+            database_name,
+            collection_name,
+            key_collection,
+            table,
+            chunk_size=chunk_size,
+            query=query,
+            sort=[(watermark_field, 1)],
+            write_mode=write_mode,
+            on_chunk=save_watermark,
+        )
+
+        if 'value' in pending:
+            state.set_watermark(collection_name, watermark_field, pending['value'])
+        return loaded
+
+    def load_resumable(
+        self,
+        engine: Engine,
+        database_name: str,
+        collection_name: str,
+        key_collection: str,
+        table: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        checkpoints: CheckpointStore = None,
+        resume: bool = False,
+    ) -> int:
+        """
+        Carrega a coleção em blocos registrando um checkpoint a cada bloco confirmado.
+
+        A leitura é ordenada por `_id` e o checkpoint (último `_id` lido,
+        blocos e linhas confirmados) é gravado na mesma transação do bloco.
+        Com `resume`, uma carga interrompida continua a partir do documento
+        seguinte ao último bloco confirmado, em vez de reler a coleção. No modo
+        "replace" a carga continua na tabela de sombra já iniciada; se ela não
+        existir mais, a carga recomeça do zero; no modo "partition" continua
+        nas sombras de partição já iniciadas; no modo "diff" uma carga
+        retomada não apaga as linhas removidas na origem. O checkpoint é
+        apagado depois que a tabela é finalizada.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param table: str - Nome da tabela de destino.
+        :param chunk_size: int - Quantidade de documentos de origem por bloco.
+        :param checkpoints: CheckpointStore - Armazenamento dos checkpoints
+            (padrão: tabela `etl_checkpoints` no banco de destino).
+        :param resume: bool - Retoma a partir do checkpoint salvo, se houver.
+        :return: int - Total de linhas carregadas, somando as de execuções
+            anteriores quando a carga é retomada.
+        """
+        if checkpoints is None:
+            checkpoints = CheckpointStore(engine)
+
+        write_mode = self.write_mode
+        shadow = write_mode == 'replace'
+        query = {}
+        progress = {'chunks': 0, 'rows': 0}
+
+        checkpoint = checkpoints.get(collection_name) if resume else None
+        if checkpoint is not None and checkpoint['table'] != table:
+            print(
+                f"[AVISO] Checkpoint de '{collection_name}' aponta para a tabela "
+                f"'{checkpoint['table']}', e não '{table}'. Recomeçando a carga."
+            )
+            checkpoint = None
+        if (
+            checkpoint is not None
+            and shadow
+            and not inspect(engine).has_table(self.shadow_table(table))
+        ):
+            print(
+                f"[AVISO] Tabela de sombra de '{table}' não encontrada. "
+                'Recomeçando a carga.'
+            )
+            checkpoint = None
+
+        if checkpoint is not None:
+            query = {'_id': {'$gt': checkpoint['last_id']}}
+            if write_mode == 'replace':
+                write_mode = 'append'
+            # No modo "partition" a sombra indica que as partições já iniciadas continuam
+            shadow = shadow or write_mode == 'partition'
+            progress = {'chunks': checkpoint['chunks'], 'rows': checkpoint['rows']}
+
+        def save_checkpoint(
+            loaded_rows: int, last_document: dict, connection: Connection
+        ):
+            progress['chunks'] += 1
+            progress['rows'] += loaded_rows
+            checkpoints.save(
+                collection_name,
+                table,
+                last_document['_id'],
+                progress['chunks'],
+                progress['rows'],
+                connection=connection,
+            )
+
+        loaded = self.load_chunked_fanout(
+            engine,
+            database_name,
+            {collection_name: (key_collection, table)},
+            chunk_size=chunk_size,
+            query=query,
+            sort=[('_id', 1)],
+            write_mode=write_mode,
+            on_chunk=save_checkpoint,
+            shadow=shadow,
+        )[collection_name]
+
+        # Retomada sem blocos novos: a finalização da execução anterior não ocorreu
+        if not loaded and progress['rows']:
+            self.finalize_table(
+                engine,
+                table,
+                swap=shadow,
+                partitions=write_mode == 'partition',
+            )
+
+        checkpoints.clear(collection_name)
+        return progress['rows']
+
+    def sync_changes(
+        self,
+        engine: Engine,
+        database_name: str,
+        targets: Dict[str, Tuple[str, str]],
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        state: SyncStateStore = None,
+        stop: Event = None,
+    ) -> Dict[str, int]:
+        """
+        Mantém as tabelas sincronizadas acompanhando o change stream das coleções de origem.
+
+        Os documentos alterados são acumulados (só a versão mais recente de
+        cada `_id`) e descarregados a cada `flush_interval` segundos ou a cada
+        `flush_size` documentos: são achatados com as mesmas especificações da
+        carga completa e mesclados por "upsert". As tabelas e o resume token do
+        change stream são confirmados na mesma transação, então uma nova
+        execução continua exatamente de onde a anterior parou. Linhas que
+        deixam de existir num documento alterado não são apagadas.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param database_name: str - Nome do banco de dados.
+        :param targets: dict - {coleção: (chave da coleção, tabela de destino)};
+            todas as tabelas, inclusive as filhas com `normalize`, precisam de
+            chave em `upsert_keys`.
+        :param flush_interval: float - Segundos máximos entre duas descargas.
+        :param flush_size: int - Documentos acumulados que forçam uma descarga.
+        :param state: SyncStateStore - Armazenamento do resume token (padrão:
+            tabela `etl_sync_state` no banco de destino).
+        :param stop: threading.Event - Encerra a sincronização quando definido,
+            após uma última descarga (padrão: executa até ser interrompida).
+        :return: dict - Total de linhas mescladas por coleção.
+        """
+        tables = [
+            output
+            for collection_name, (key_collection, table) in targets.items()
+            for output in self.output_tables(
+                collection_name, key_collection, table
+            )
+        ]
+        missing_keys = [
+            table for table in tables if table not in self.upsert_keys
+        ]
+        if missing_keys:
+            raise ValueError(
+                f'Tabelas sem chave configurada para upsert: {missing_keys}'
+            )
+
+        if state is None:
+            state = SyncStateStore(engine)
+        state_key = f'{database_name}.change_stream'
+        flushed_token = state.get_watermark(state_key, RESUME_TOKEN_FIELD)
+
+        sources = sorted({self._source_collection(name) for name in targets})
+        pending = {source: {} for source in sources}
+        total_rows = {collection_name: 0 for collection_name in targets}
+        synced_tables = set()
+
+        def flush(token: dict):
+            loaded = self._flush_changes(
+                engine, targets, pending, token, state, state_key
+            )
+            for (collection_name, table), rows in loaded.items():
+                total_rows[collection_name] += rows
+                synced_tables.add(table)
+
+        stream = self.watch_changes(
+            database_name,
+            sources,
+            resume_after=flushed_token,
+            batch_size=self.batch_size,
+            # try_next não pode esperar mais do que o intervalo entre descargas
+            max_await_time_ms=max(1, int(min(flush_interval, 1.0) * 1000)),
+        )
+        with stream:
+            deadline = monotonic() + flush_interval
+            while stop is None or not stop.is_set():
+                change = stream.try_next()
+                if change is not None and change.get('fullDocument') is not None:
+                    document = change['fullDocument']
+                    pending[change['ns']['coll']][document['_id']] = document
+
+                buffered = sum(len(documents) for documents in pending.values())
+                if buffered >= flush_size or monotonic() >= deadline:
+                    token = stream.resume_token
+                    if buffered or token != flushed_token:
+                        flush(token)
+                        flushed_token = token
+                    deadline = monotonic() + flush_interval
+
+            flush(stream.resume_token)
+
+        for table in tables:
+            if table in synced_tables:
+                self.finalize_table(engine, table)
+
+        return total_rows
+
+    def _flush_changes(
+        self,
+        engine: Engine,
+        targets: Dict[str, Tuple[str, str]],
+        pending: Dict[str, Dict[Any, dict]],
+        token: dict,
+        state: SyncStateStore,
+        state_key: str,
+    ) -> Dict[str, int]:
+        """
+        Mescla os documentos acumulados e grava o resume token numa única transação.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param targets: dict - {coleção: (chave da coleção, tabela de destino)}.
+        :param pending: dict - {coleção de origem: {_id: documento}}; é esvaziado
+            depois do COMMIT.
+        :param token: dict - Resume token da última alteração acumulada.
+        :param state: SyncStateStore - Armazenamento do resume token.
+        :param state_key: str - Chave do change stream no armazenamento.
+        :return: dict - Linhas mescladas por (coleção, tabela).
+        """
+        loaded = {}
+
+        with self._transaction(engine) as connection:
+            for collection_name, (key_collection, table) in targets.items():
+                documents = pending[self._source_collection(collection_name)]
+                if not documents:
+                    continue
+
+                with self.metrics.stage(collection_name, 'flatten') as stage:
+                    rows = [
+                        row
+                        for document in documents.values()
+                        for row in self._flatten_document(
+                            document, collection_name, key_collection
+                        )
+                    ]
+                    stage['documents'] = len(documents)
+                    stage['rows'] = len(rows)
+
+                frames = self.transform_tables(
+                    rows, collection_name, key_collection, table
+                )
+                for output, df in frames.items():
+                    if df.empty:
+                        continue
+
+                    self.load_to_destination(
+                        connection, df, output, write_mode='upsert', finalize=False
+                    )
+                    loaded[collection_name, output] = len(df)
+
+            if token is not None:
+                state.set_watermark(
+                    state_key, RESUME_TOKEN_FIELD, token, connection=connection
+                )
+
+        for documents in pending.values():
+            documents.clear()
+
+        return loaded
+
+    @staticmethod
+    def _get_field(document: dict, path: str) -> Any:
+        """
+        Retorna o valor de um campo do documento, aceitando caminhos com ponto.
+
+        :param document: dict - Documento do MongoDB.
+        :param path: str - Caminho do campo, ex.: "sport_event.updated_at".
+        :return: Any - Valor encontrado, ou None.
+        """
+        value = document
+        for part in path.split('.'):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+    def parsing_json(
+        self,
+        database_name: str,
+        collection_name: str,
+        key_collection: str,
+        query: dict = None,
+        batch_size: int = None,
+        partitions: int = 1,
+    ) -> list:
+        """
+        Extrai documentos do MongoDB e transforma em uma lista de dicionários.
+
+        Com `partitions` > 1 a coleção é dividida em faixas de `_id` lidas e
+        achatadas em paralelo, cada uma com o próprio cursor. O resultado é
+        concatenado em ordem de faixa e contém as mesmas linhas da leitura
+        com um único cursor.
+
+        As faixas são lidas em threads: a espera pela rede e pelo servidor se
+        sobrepõe, mas a decodificação do BSON e o achatamento disputam o GIL,
+        então o ganho some quando a leitura é limitada pela CPU do cliente.
+        Para paralelizar também a CPU, o executor de processos de
+        `run_collections` (ETL_EXECUTOR=process) roda coleções diferentes em
+        processos separados.
+
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param batch_size: int - Documentos por lote do cursor (padrão: o da instância).
+        :param partitions: int - Quantidade de faixas de `_id` lidas em threads.
+        :return: list - Lista de documentos processados.
+        """
+        if partitions <= 1:
+            return list(
+                self.iter_parsing_json(
+                    database_name, collection_name, key_collection, query, batch_size
+                )
+            )
+
+        queries = self.id_partitions(
+            database_name,
+            self._source_collection(collection_name),
+            partitions,
+            query,
+        )
+
+        def read_partition(partition_query: dict) -> list:
+            return list(
+                self.iter_parsing_json(
+                    database_name,
+                    collection_name,
+                    key_collection,
+                    partition_query,
+                    batch_size,
+                )
+            )
+
+        list_to_append = []
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            for rows in pool.map(read_partition, queries):
+                list_to_append.extend(rows)
 
         return list_to_append
 
-    def transform_to_df(self, list_to_transform: List[dict], collection: str) -> pd.DataFrame:
+    def parsing_json_fanout(
+        self,
+        database_name: str,
+        targets: Dict[str, str],
+        query: dict = None,
+        batch_size: int = None,
+    ) -> Dict[str, list]:
+        """
+        Extrai as linhas de várias coleções lógicas com uma única leitura da origem.
+
+        :param database_name: str - Nome do banco de dados.
+        :param targets: dict - Coleções lógicas e suas chaves {coleção: chave}.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param batch_size: int - Documentos por lote do cursor (padrão: o da instância).
+        :return: dict - Lista de linhas processadas por coleção.
+        """
+        self._require_document_scan()
+        if batch_size is None:
+            batch_size = self.batch_size
+
+        flatteners = {
+            collection_name: self._flattener(collection_name, key_collection)
+            for collection_name, key_collection in targets.items()
+        }
+        rows = {collection_name: [] for collection_name in targets}
+        source = self._shared_source(targets)
+        flatten_seconds = 0.0
+
+        for document in self.metrics.iter_timed(
+            source,
+            'extract',
+            self.iter_nosql(
+                database_name,
+                source,
+                query,
+                batch_size,
+                projection=self._projection(targets),
+            ),
+            size=_bson_size,
+        ):
+            start = perf_counter()
+            for collection_name, flatten in flatteners.items():
+                rows[collection_name].extend(flatten(document))
+            flatten_seconds += perf_counter() - start
+
+        # Uma leitura alimenta todas as coleções: o tempo é dividido igualmente
+        for collection_name, collection_rows in rows.items():
+            self.metrics.record(
+                collection_name,
+                'flatten',
+                seconds=flatten_seconds / len(rows),
+                rows=len(collection_rows),
+            )
+
+        return rows
+
+    def _source_collection(self, collection_name: str) -> str:
+        """
+        Retorna a coleção do MongoDB de onde os dados de `collection_name` são lidos.
+
+        :param collection_name: str - Nome lógico da coleção.
+        :return: str - Nome da coleção de origem no MongoDB.
+        """
+        spec = get_spec(collection_name, self.flatten_specs)
+        return spec.get('source', collection_name)
+
+    def _projection(
+        self, targets: Dict[str, str], extra_fields: Sequence[str] = ()
+    ) -> dict:
+        """
+        Monta a projeção com os campos que o achatamento das coleções precisa.
+
+        :param targets: dict - Coleções lógicas e suas chaves {coleção: chave}.
+        :param extra_fields: Sequence[str] - Campos adicionais, ex.: da ordenação.
+        :return: dict - Projeção do MongoDB, ou None se `pushdown` for "none".
+        """
+        self._require_document_scan()
+        if self.pushdown == 'none':
+            return None
+
+        fields = list(extra_fields)
+        for collection_name, key_collection in targets.items():
+            fields.extend(
+                spec_fields(
+                    get_spec(collection_name, self.flatten_specs), key_collection
+                )
+            )
+        return build_projection(fields)
+
+    def _require_document_scan(self) -> None:
+        """
+        Recusa o pushdown "aggregate" nos caminhos que leem documentos inteiros.
+
+        As cargas em blocos e as leituras de várias coleções numa única
+        varredura precisam do documento de origem (para o checkpoint e para
+        alimentar todas as coleções), que o $unwind/$replaceRoot substitui
+        pelas linhas já achatadas.
+        """
+        if self.pushdown == 'aggregate':
+            raise ValueError(
+                'O pushdown "aggregate" só é suportado por `parsing_json` e '
+                '`iter_parsing_json`; nas cargas em blocos e com várias coleções '
+                'por leitura use "projection" ou "none".'
+            )
+
+    def _shared_source(self, targets: Dict[str, str]) -> str:
+        """
+        Retorna a coleção de origem comum a todas as coleções lógicas informadas.
+
+        :param targets: dict - Coleções lógicas e suas chaves {coleção: chave}.
+        :return: str - Nome da coleção de origem no MongoDB.
+        """
+        sources = {
+            self._source_collection(collection_name) for collection_name in targets
+        }
+        if len(sources) != 1:
+            raise ValueError(
+                f'As coleções {list(targets)} não compartilham a mesma '
+                f'coleção de origem: {sorted(sources)}'
+            )
+        return sources.pop()
+
+    def _flattener(
+        self, collection_name: str, key_collection: str
+    ) -> Callable[[dict], List[dict]]:
+        """
+        Retorna a função de achatamento da coleção, compilando-a na primeira chamada.
+
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :return: Callable - Função documento -> lista de linhas.
+        """
+        flatten = self._flatteners.get((collection_name, key_collection))
+        if flatten is None:
+            flatten = compile_spec(
+                get_spec(collection_name, self.flatten_specs), key_collection
+            )
+            self._flatteners[(collection_name, key_collection)] = flatten
+        return flatten
+
+    def _flatten_document(
+        self, document: dict, collection_name: str, key_collection: str
+    ) -> List[dict]:
+        """
+        Achata um único documento do MongoDB nas linhas da tabela de destino.
+
+        :param document: dict - Documento lido do MongoDB.
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :return: List[dict] - Linhas extraídas do documento.
+        """
+        return self._flattener(collection_name, key_collection)(document)
+
+    def transform_to_df(
+        self,
+        list_to_transform: List[dict],
+        collection: str,
+        nested_columns: Dict[str, str] = None,
+    ) -> pd.DataFrame:
         """
         Transforma uma lista de dicionários em um DataFrame, normalizando colunas que contêm dicionários aninhados.
 
+        Colunas de dicionários viram colunas `<coluna>_<subcampo>` e colunas de
+        listas são explodidas em uma linha por elemento. As colunas aninhadas são
+        identificadas uma única vez (por `nested_columns` ou por amostragem) e o
+        DataFrame final é montado com um único `concat`, sem copiar o frame a
+        cada coluna aninhada.
+
         :param list_to_transform: list - Lista de dicionários extraídos do MongoDB.
+        :param collection: str - Nome da coleção.
+        :param nested_columns: dict - Esquema declarado {coluna: "dict" ou "list"}
+            (opcional; inferido a partir de uma amostra quando ausente).
         :return: pd.DataFrame - DataFrame tratado e pronto para carga.
         """
+        with self.metrics.stage(collection, 'transform') as stage:
+            df = self._build_dataframe(list_to_transform, collection, nested_columns)
+            stage['rows'] = len(df)
+            stage['bytes'] = df.memory_usage(index=False).sum()
+        return df
+
+    def output_tables(
+        self, collection_name: str, key_collection: str, table: str
+    ) -> List[str]:
+        """
+        Lista as tabelas gravadas a partir da coleção.
+
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param table: str - Nome da tabela de destino principal.
+        :return: List[str] - A tabela principal e, com `normalize`, as filhas.
+        """
+        if not self.normalize:
+            return [table]
+        spec = get_spec(collection_name, self.flatten_specs)
+        return [table, *child_tables(spec, key_collection)]
+
+    def transform_tables(
+        self,
+        list_to_transform: List[dict],
+        collection: str,
+        key_collection: str,
+        table: str,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Transforma as linhas da coleção nos DataFrames de cada tabela de destino.
+
+        Sem `normalize`, ou se a especificação não declara "children", é o
+        mesmo que `transform_to_df`. Com `normalize`, cada lista declarada é
+        retirada da linha e os seus elementos vão para a tabela filha, com as
+        colunas de `parent_key` copiadas do pai, então a linha do pai não é
+        repetida por elemento nem as listas mais internas são descartadas.
+
+        :param list_to_transform: list - Linhas achatadas da coleção.
+        :param collection: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param table: str - Nome da tabela de destino principal.
+        :return: dict - {tabela: DataFrame}, a principal primeiro.
+        """
+        spec = get_spec(collection, self.flatten_specs)
+        if not (self.normalize and spec.get('children')):
+            return {table: self.transform_to_df(list_to_transform, collection)}
+
+        with self.metrics.stage(collection, 'transform') as stage:
+            frames = self._split_children(
+                list_to_transform,
+                table,
+                compile_children(spec, key_collection),
+                collection,
+            )
+            stage['rows'] = sum(len(df) for df in frames.values())
+            stage['bytes'] = sum(
+                df.memory_usage(index=False).sum() for df in frames.values()
+            )
+        return frames
+
+    def _split_children(
+        self,
+        list_to_transform: List[dict],
+        table: str,
+        children: tuple,
+        collection: str,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Separa recursivamente as listas declaradas nas suas tabelas filhas.
+
+        :param list_to_transform: list - Linhas da tabela `table`.
+        :param table: str - Tabela que recebe as linhas.
+        :param children: tuple - Tabelas filhas compiladas por `compile_children`.
+        :param collection: str - Nome da coleção.
+        :return: dict - {tabela: DataFrame} da tabela e das suas descendentes.
+        """
+        frames = {table: None}
+
+        for column, child_table, parent_key, grandchildren in children:
+            elements = []
+            for row in list_to_transform:
+                items = row.get(column)
+                if not isinstance(items, list) or not items:
+                    continue
+                keys = {name: get(row) for name, get in parent_key}
+                elements.extend(
+                    {**item, **keys} if isinstance(item, dict)
+                    else {column: item, **keys}
+                    for item in items
+                )
+            frames.update(
+                self._split_children(
+                    elements, child_table, grandchildren, collection
+                )
+            )
+
+        frames[table] = self._build_dataframe(
+            list_to_transform,
+            collection,
+            drop=[column for column, _, _, _ in children],
+        )
+        return frames
+
+    def _build_dataframe(
+        self,
+        list_to_transform: List[dict],
+        collection: str,
+        nested_columns: Dict[str, str] = None,
+        drop: Sequence[str] = (),
+    ) -> pd.DataFrame:
+        """
+        Implementação de `transform_to_df`, sem as medições.
+
+        :param drop: Sequence[str] - Colunas descartadas antes do achatamento.
+        """
         if not list_to_transform:
             return (pd.DataFrame())
 
         df = pd.DataFrame(list_to_transform)
+        if drop:
+            df = df.drop(columns=list(drop), errors='ignore')
+
+        if nested_columns is None:
+            nested_columns = self._infer_nested_columns(df)
+
+        # Posição, no frame original, de cada linha do resultado
+        rows = np.arange(len(df))
+        pieces = []
+        pointers = []
 
-        # Normaliza dicionários aninhados, exceto "competitors"
         for col in df.columns:
-            if df[col].apply(lambda x: isinstance(x, dict)).any():
-                df_normalized = pd.json_normalize(df[col])
-                df_normalized.columns = [
-                    f'{col}_{subcol}' for subcol in df_normalized.columns
-                ]
-                df = df.drop(columns=[col]).join(df_normalized)
-            
-
-            elif df[col].apply(lambda x: isinstance(x, list)).any():
-                df = df.explode(col).reset_index(drop=True)
-                df_normalized = pd.json_normalize(df[col])
-                df_normalized.columns = [
-                    f'{col}_{subcol}' for subcol in df_normalized.columns
-                ]
-
-                if collection == 'sport_event_markets':
-                    df_normalized = df_normalized.drop(columns = ['books_outcomes']).reset_index(drop = True)
-                if collection == 'sport_event_player_props':
-                    df_normalized = df_normalized.drop(columns = ['markets_books']).reset_index(drop = True)
-   
-
-                # for col_normalized in df_normalized.columns:
-                #     if df_normalized[col_normalized].apply(lambda x: isinstance(x, list)).any():
-                #         df_normalized = df_normalized.explode(col_normalized).reset_index(drop = True)
-
-
-                #         df_sub_normalized = pd.json_normalize(df_normalized[col_normalized])
-                #         df_sub_normalized.columns = [
-                #             f'{col_normalized}_{subcol}' for subcol in df_sub_normalized.columns
-                #         ]
-
-                #         for sub_col_normalized in df_sub_normalized.columns:
-                #             if df_sub_normalized[sub_col_normalized].apply(lambda x: isinstance(x, list)).any():
-                #                 df_sub_normalized = df_sub_normalized.explode(sub_col_normalized).reset_index(drop = True)
-                #                 df_max_normalized = pd.json_normalize(df_sub_normalized[sub_col_normalized])
-                #                 df_max_normalized.columns = [
-                #                     f'{sub_col_normalized}_{subcol}' for subcol in df_max_normalized.columns
-                #                 ]
-
-                #                 df_sub_normalized = df_sub_normalized.drop(columns = [sub_col_normalized]).reset_index(drop = True)
-                #                 df_sub_normalized = pd.concat([df_sub_normalized, df_max_normalized], axis = 1)
-
-                #         df_normalized = df_normalized.drop(columns = [col_normalized]).reset_index(drop = True)
-                #         df_normalized = pd.concat([df_normalized, df_sub_normalized], axis = 1)
-                        
-
-
-                df = df.drop(columns=[col]).reset_index(drop=True)
-
-                df = pd.concat([df, df_normalized], axis=1)
-                
-            
+            kind = nested_columns.get(col)
 
-        return df
+            if kind == 'dict':
+                pieces.append(self._normalize_values(df[col].to_numpy(), col))
+                pointers.append(rows.copy())
+
+            elif kind == 'list':
+                values = df[col].to_numpy()[rows]
+                # Listas vazias ou ausentes viram uma linha nula, como no explode
+                lengths = np.fromiter(
+                    (
+                        len(value) if isinstance(value, list) and value else 1
+                        for value in values
+                    ),
+                    dtype=np.intp,
+                    count=len(values),
+                )
+                children = []
+                for value in values:
+                    if isinstance(value, list) and value:
+                        children.extend(value)
+                    else:
+                        children.append(None)
+
+                repeat = np.repeat(np.arange(len(values)), lengths)
+                rows = rows[repeat]
+                pointers = [pointer[repeat] for pointer in pointers]
+
+                df_normalized = self._normalize_values(children, col)
+                df_normalized = df_normalized.drop(
+                    columns=DROPPED_NESTED_COLUMNS.get(collection, []),
+                    errors='ignore',
+                )
+                pieces.append(df_normalized)
+                pointers.append(np.arange(len(children)))
+
+        if not pieces:
+            return df
+
+        kept = [col for col in df.columns if col not in nested_columns]
+        frames = [df[kept].take(rows).reset_index(drop=True)]
+        frames.extend(
+            piece.take(pointer).reset_index(drop=True)
+            for piece, pointer in zip(pieces, pointers)
+        )
+
+        return pd.concat(frames, axis=1)
+
+    @staticmethod
+    def _infer_nested_columns(
+        df: pd.DataFrame, sample_size: int = 1000
+    ) -> Dict[str, str]:
+        """
+        Identifica as colunas de dicionários e de listas a partir de uma amostra.
+
+        Apenas colunas `object` são inspecionadas, e de cada uma só os primeiros
+        `sample_size` valores não nulos.
+
+        :param df: pd.DataFrame - DataFrame montado a partir dos registros.
+        :param sample_size: int - Quantidade de valores inspecionados por coluna.
+        :return: dict - Esquema {coluna: "dict" ou "list"} das colunas aninhadas.
+        """
+        nested_columns = {}
+
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+
+            sample = df[col].dropna().head(sample_size).tolist()
+            if any(isinstance(value, dict) for value in sample):
+                nested_columns[col] = 'dict'
+            elif any(isinstance(value, list) for value in sample):
+                nested_columns[col] = 'list'
+
+        return nested_columns
+
+    @staticmethod
+    def _normalize_values(values: Sequence, col: str) -> pd.DataFrame:
+        """
+        Normaliza os valores de uma coluna aninhada em colunas `<col>_<subcampo>`.
+
+        :param values: Sequence - Valores da coluna (dicionários, escalares ou nulos).
+        :param col: str - Nome da coluna de origem.
+        :return: pd.DataFrame - Um registro por valor recebido.
+        """
+        if not any(isinstance(value, dict) for value in values):
+            # Listas de escalares mantêm o valor na própria coluna
+            return pd.DataFrame({col: values})
+
+        df_normalized = pd.json_normalize(
+            [value if isinstance(value, dict) else {} for value in values]
+        )
+        df_normalized.columns = [
+            f'{col}_{subcol}' for subcol in df_normalized.columns
+        ]
+        return df_normalized
+
+    def iter_arrow_tables(
+        self,
+        database_name: str,
+        collection_name: str,
+        key_collection: str,
+        query: dict = None,
+        partitions: int = 1,
+    ) -> Iterator:
+        """
+        Extrai a coleção em tabelas Arrow, sem passar por dicionários Python.
+
+        O achatamento é feito no MongoDB (`build_pipeline`) e as linhas chegam
+        decodificadas direto em colunas. A coleção é lida em `partitions` faixas
+        de `_id`, uma tabela por faixa, o que limita a memória de cada leitura.
+
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param partitions: int - Quantidade de faixas de `_id` lidas.
+        :return: Iterator[pyarrow.Table] - Gerador de tabelas, uma por faixa.
+        """
+        source = self._source_collection(collection_name)
+        spec = get_spec(collection_name, self.flatten_specs)
+
+        for partition_query in self.id_partitions(
+            database_name, source, partitions, query
+        ):
+            with self.metrics.stage(collection_name, 'extract') as stage:
+                arrow_table = self.read_arrow(
+                    database_name,
+                    source,
+                    build_pipeline(spec, key_collection, partition_query),
+                )
+                stage['rows'] = arrow_table.num_rows
+                stage['bytes'] = arrow_table.nbytes
+            yield arrow_table
+
+    def transform_arrow(self, table, collection: str):
+        """
+        Equivalente de `transform_to_df` para tabelas Arrow.
+
+        Colunas struct viram colunas `<coluna>_<subcampo>` e colunas de listas
+        são explodidas, com os mesmos nomes e a mesma ordem de `transform_to_df`.
+        Os tipos vêm do esquema Arrow, então não há inferência por amostragem,
+        e todo o trabalho é feito com kernels do Arrow e índices numpy.
+
+        :param table: pyarrow.Table - Tabela extraída do MongoDB.
+        :param collection: str - Nome da coleção.
+        :return: pyarrow.Table - Tabela tratada e pronta para carga.
+        """
+        pa = _require_pyarrow()
+
+        if table.num_rows == 0:
+            return table
+
+        # Posição, na tabela original, de cada linha do resultado
+        rows = np.arange(table.num_rows)
+        kept = []
+        pieces = []
+        pointers = []
+
+        for name in table.column_names:
+            column = table.column(name).combine_chunks()
+
+            if pa.types.is_struct(column.type):
+                pieces.append(self._flatten_struct_arrow(column, name))
+                pointers.append(rows.copy())
+
+            elif pa.types.is_list(column.type) or pa.types.is_large_list(
+                column.type
+            ):
+                column = column.take(pa.array(rows))
+                lengths = (
+                    pa.compute.list_value_length(column)
+                    .fill_null(0)
+                    .to_numpy(zero_copy_only=False)
+                    .astype(np.intp)
+                )
+                # Listas vazias ou nulas viram uma linha nula, como no explode
+                counts = np.maximum(lengths, 1)
+                repeat = np.repeat(np.arange(len(column)), counts)
+                starts = np.cumsum(lengths) - lengths
+                within = np.arange(len(repeat)) - np.repeat(
+                    np.cumsum(counts) - counts, counts
+                )
+                positions = pa.array(
+                    np.repeat(starts, counts) + within,
+                    mask=np.repeat(lengths == 0, counts),
+                )
+                children = pa.compute.list_flatten(column).take(positions)
+
+                rows = rows[repeat]
+                pointers = [pointer[repeat] for pointer in pointers]
+
+                if pa.types.is_struct(children.type):
+                    piece = self._flatten_struct_arrow(children, name)
+                    dropped = DROPPED_NESTED_COLUMNS.get(collection, [])
+                    piece = piece.drop_columns(
+                        [col for col in dropped if col in piece.column_names]
+                    )
+                else:
+                    piece = pa.table({name: children})
+                pieces.append(piece)
+                pointers.append(np.arange(len(repeat)))
+
+            else:
+                kept.append(name)
+
+        if not pieces:
+            return table
+
+        base = table.select(kept).take(pa.array(rows))
+        names = list(base.column_names)
+        arrays = list(base.columns)
+        for piece, pointer in zip(pieces, pointers):
+            piece = piece.take(pa.array(pointer))
+            names.extend(piece.column_names)
+            arrays.extend(piece.columns)
+
+        return pa.Table.from_arrays(arrays, names=names)
+
+    @staticmethod
+    def _flatten_struct_arrow(column, name: str):
+        """
+        Achata uma coluna struct do Arrow em colunas `<name>_<subcampo>`.
+
+        :param column: pyarrow.StructArray - Coluna a ser achatada.
+        :param name: str - Nome da coluna de origem.
+        :return: pyarrow.Table - Uma coluna por subcampo, com os nomes do json_normalize.
+        """
+        pa = _require_pyarrow()
+
+        piece = pa.table({name: column})
+        while any(pa.types.is_struct(field.type) for field in piece.schema):
+            piece = piece.flatten()
+        return piece.rename_columns(
+            [col.replace('.', '_', 1) for col in piece.column_names]
+        )
+
+    def load_arrow(
+        self,
+        engine: Engine,
+        database_name: str,
+        collection_name: str,
+        key_collection: str,
+        table: str,
+        query: dict = None,
+        partitions: int = 1,
+    ) -> int:
+        """
+        Executa a pipeline pelo caminho Arrow: extração, transformação e carga por faixa.
+
+        A primeira faixa carregada usa o `write_mode` da instância e, no modo
+        "replace", as seguintes usam "append". Com `load_method="copy"` as
+        tabelas Arrow são enviadas ao COPY sem conversão para pandas.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param key_collection: str - Chave do documento que contém os dados.
+        :param table: str - Nome da tabela de destino.
+        :param query: dict - Critério de consulta (padrão: consulta vazia).
+        :param partitions: int - Quantidade de faixas de `_id` lidas.
+        :return: int - Total de linhas carregadas.
+        """
+        pa = _require_pyarrow()
+
+        if self.output_tables(collection_name, key_collection, table) != [table]:
+            raise ValueError(
+                f"A coleção '{collection_name}' tem tabelas filhas; o caminho "
+                'Arrow não suporta a saída normalizada.'
+            )
+
+        write_mode = self.write_mode
+        if write_mode == 'partition':
+            raise ValueError(
+                'O caminho Arrow não suporta o modo de escrita "partition".'
+            )
+        # No modo "replace" as faixas vão para a tabela de sombra, trocada no fim
+        shadow = write_mode == 'replace'
+        target = self.shadow_table(table) if shadow else table
+        schema = get_schema(table, self.table_schemas)
+        total_rows = 0
+        changes = None
+        if write_mode == 'diff':
+            changes = self.row_hash_index(engine, table)
+
+        for arrow_table in self.iter_arrow_tables(
+            database_name, collection_name, key_collection, query, partitions
+        ):
+            with self.metrics.stage(collection_name, 'transform') as stage:
+                arrow_table = self.transform_arrow(arrow_table, collection_name)
+                stage['rows'] = arrow_table.num_rows
+                stage['bytes'] = arrow_table.nbytes
+            if arrow_table.num_rows == 0:
+                continue
+
+            nested = any(pa.types.is_nested(field.type) for field in arrow_table.schema)
+
+            if write_mode == 'append':
+                self.add_missing_columns(
+                    engine, arrow_table.schema.empty_table().to_pandas(), target
+                )
+
+            bulk = write_mode not in ('upsert', 'diff')
+            if self.load_method == 'copy' and bulk and not nested:
+                dtype = sql_types(schema, arrow_table.column_names)
+                try:
+                    with self.metrics.stage(table, 'load') as stage:
+                        stage['rows'] = arrow_table.num_rows
+                        stage['bytes'] = arrow_table.nbytes
+                        if write_mode == 'replace':
+                            self.create_shadow_table(
+                                engine,
+                                arrow_table.schema.empty_table().to_pandas(),
+                                table,
+                                dtype=dtype,
+                                unlogged=self.unlogged,
+                            )
+                        self.copy_arrow(
+                            engine, arrow_table, target, 'append', dtype=dtype
+                        )
+                except SQLAlchemyError as e:
+                    raise RuntimeError(
+                        f"Erro ao inserir dados na tabela '{table}': {e}"
+                    )
+            else:
+                self.load_to_destination(
+                    engine,
+                    arrow_table.to_pandas(),
+                    table,
+                    write_mode=write_mode,
+                    shadow=shadow,
+                    finalize=False,
+                    changes=changes,
+                )
+
+            if write_mode == 'replace':
+                write_mode = 'append'
+            total_rows += arrow_table.num_rows
+
+        if changes is not None and total_rows and not query:
+            self.delete_missing(engine, table, changes)
+        if total_rows:
+            self.finalize_table(engine, table, swap=shadow)
+
+        return total_rows
 
     def load_to_destination(
-        self, engine: Engine, df: pd.DataFrame, table: str
+        self,
+        engine: Engine,
+        df: pd.DataFrame,
+        table: str,
+        write_mode: str = None,
+        shadow: bool = False,
+        finalize: bool = True,
+        changes: RowHashIndex = None,
     ):
         """
         Carrega um DataFrame para um banco de dados PostgreSQL.
 
+        No modo "replace" os dados são carregados numa tabela de sombra, que
+        substitui a tabela de destino numa única transação; a tabela viva não
+        fica ausente nem parcial durante a carga. No modo "diff" o hash de cada
+        linha é comparado com o gravado na tabela e só as linhas novas ou
+        alteradas são mescladas; as ausentes do DataFrame são apagadas. No
+        modo "partition" cada partição com linhas no DataFrame é carregada
+        numa sombra própria e trocada por inteiro; as demais não são tocadas.
+
         :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
         :param df: pd.DataFrame - DataFrame a ser carregado.
         :param table: str - Nome da tabela de destino.
+        :param write_mode: str - Sobrescreve o modo de escrita da instância (opcional).
+        :param shadow: bool - Carrega na tabela de sombra em vez da tabela viva.
+        :param finalize: bool - Executa `finalize_table` após a carga. Cargas em
+            blocos passam False e finalizam a tabela uma única vez, no fim.
+        :param changes: RowHashIndex - No modo "diff", índice compartilhado
+            pelos blocos de uma mesma carga; as linhas removidas são apagadas
+            por quem o criou, no fim da carga (padrão: o DataFrame é a tabela
+            inteira).
         :return: None
         """
+        if write_mode is None:
+            write_mode = self.write_mode
+
         if df.empty:
             print(
                 f"[AVISO] DataFrame vazio. Nenhum dado foi carregado para a tabela '{table}'."
             )
             return  # Evita tentativa de inserção com DataFrame vazio
 
-        try:
-            df.to_sql(
-                name=table,
-                con=engine,
-                if_exists=self.write_mode,
-                index=False,
+        if write_mode in ('upsert', 'diff') and table not in self.upsert_keys:
+            raise ValueError(
+                f"Tabela '{table}' sem chave configurada para {write_mode}."
             )
+
+        partitioning = {}
+        if write_mode == 'partition':
+            partitioning = get_partitioning(table, self.table_partitions)
+            if not partitioning:
+                raise ValueError(
+                    f"Tabela '{table}' sem particionamento configurado."
+                )
+
+        method = self.copy_insert if self.load_method == 'copy' else None
+
+        # Tipos declarados: DataFrame mais compacto e DDL com os tipos certos
+        schema = get_schema(table, self.table_schemas)
+        df = apply_schema(df, schema)
+        dtype = sql_types(schema, df.columns)
+
+        try:
+            if write_mode == 'diff':
+                return self._load_changes(engine, df, table, changes, finalize)
+            if write_mode == 'partition':
+                return self._load_partitions(
+                    engine, df, table, partitioning, dtype, method, finalize
+                )
+
+            with self.metrics.stage(table, 'load') as stage:
+                stage['rows'] = len(df)
+                stage['bytes'] = df.memory_usage(index=False).sum()
+                if write_mode == 'upsert':
+                    self.upsert_dataframe(
+                        engine,
+                        df,
+                        table,
+                        self.table_keys(table),
+                        method=method,
+                        dtype=dtype,
+                    )
+                else:
+                    target = table
+                    if shadow or write_mode == 'replace':
+                        target = self.shadow_table(table)
+                    if write_mode == 'replace':
+                        self.create_shadow_table(
+                            engine, df, table, dtype=dtype, unlogged=self.unlogged
+                        )
+
+                    df.to_sql(
+                        name=target,
+                        con=engine,
+                        if_exists='append',
+                        index=False,
+                        method=method,
+                        dtype=dtype,
+                    )
+
+            if finalize:
+                self.finalize_table(
+                    engine, table, swap=shadow or write_mode == 'replace'
+                )
         except SQLAlchemyError as e:
             raise RuntimeError(
                 f"Erro ao inserir dados na tabela '{table}': {e}"
             )
+
+    def _load_changes(
+        self,
+        engine: Engine,
+        df: pd.DataFrame,
+        table: str,
+        changes: RowHashIndex = None,
+        finalize: bool = True,
+    ) -> None:
+        """
+        Implementação do modo "diff" de `load_to_destination`.
+
+        Sem `changes`, o DataFrame é tratado como a tabela inteira: o índice é
+        lido, as alterações são mescladas e as linhas ausentes são apagadas,
+        tudo na mesma transação.
+        """
+        complete = changes is None
+
+        with self._transaction(engine) as connection:
+            if complete:
+                changes = self.row_hash_index(connection, table)
+
+            with self.metrics.stage(table, 'diff') as stage:
+                changed = changes.changed(df)
+                stage['rows'] = len(changed)
+
+            if not changed.empty:
+                self.load_to_destination(
+                    connection, changed, table, write_mode='upsert', finalize=False
+                )
+            if complete:
+                self.delete_missing(connection, table, changes)
+
+        if finalize:
+            self.finalize_table(engine, table)
+
+    def _load_partitions(
+        self,
+        engine: Engine,
+        df: pd.DataFrame,
+        table: str,
+        partitioning: dict,
+        dtype: dict,
+        method: Callable = None,
+        finalize: bool = True,
+    ) -> None:
+        """
+        Implementação do modo "partition" de `load_to_destination`.
+
+        As linhas são agrupadas pela partição e acrescentadas à sombra de cada
+        uma, criada na primeira vez em que a partição aparece na carga. Com
+        `finalize`, o DataFrame é a carga inteira: sombras de uma carga
+        interrompida são descartadas antes e as partições trocadas no fim.
+        """
+        column = partitioning['column']
+        starts = partition_starts(df[column], partitioning['interval'])
+        if starts.isna().any():
+            raise ValueError(
+                f"Linhas sem data válida na coluna de partição '{column}' "
+                f"da tabela '{table}'."
+            )
+
+        if finalize:
+            self.drop_partition_shadows(engine, table)
+
+        with self._transaction(engine) as connection:
+            self.create_partitioned_table(connection, df, table, column, dtype)
+            self._add_missing_columns(connection, df, table)
+            started = self.partition_shadows(connection, table)
+            for partition in started:
+                self._add_missing_columns(
+                    connection, df, self.shadow_table(partition)
+                )
+
+            with self.metrics.stage(table, 'load') as stage:
+                stage['rows'] = len(df)
+                stage['bytes'] = df.memory_usage(index=False).sum()
+                for start, rows in df.groupby(starts, sort=True):
+                    partition = partition_name(
+                        table, start, partitioning['interval']
+                    )
+                    if partition not in started:
+                        self.create_partition_shadow(
+                            connection, table, partition, unlogged=self.unlogged
+                        )
+                    rows.to_sql(
+                        name=self.shadow_table(partition),
+                        con=connection,
+                        if_exists='append',
+                        index=False,
+                        method=method,
+                        dtype=dtype,
+                    )
+
+        if finalize:
+            self.finalize_table(engine, table, partitions=True)
+
+    def row_hash_index(self, engine: Engine, table: str) -> RowHashIndex:
+        """
+        Lê a chave e o hash das linhas já gravadas na tabela, para o modo "diff".
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param table: str - Nome da tabela de destino.
+        :return: RowHashIndex - Índice das linhas gravadas.
+        """
+        keys = self.table_keys(table)
+        hashes = self.read_row_hashes(engine, table, keys, HASH_COLUMN)
+
+        # O banco devolve a chave nos seus próprios tipos (no SQLite, datas
+        # voltam como texto); ela é convertida pelo esquema, como as linhas da
+        # carga, para que as duas se encontrem
+        stored = apply_schema(
+            pd.DataFrame(list(hashes), columns=keys),
+            get_schema(table, self.table_schemas),
+        )
+        typed_keys = list(zip(*(stored[key].tolist() for key in keys)))
+        return RowHashIndex(
+            keys,
+            dict(zip(typed_keys, hashes.values())),
+            stored_keys=dict(zip(typed_keys, hashes)),
+        )
+
+    def table_keys(self, table: str) -> Sequence[str]:
+        """
+        Retorna as colunas que identificam uma linha da tabela nos modos "upsert" e "diff".
+
+        Em tabelas com particionamento declarado, a coluna de partição entra na
+        chave: o PostgreSQL só aceita índice único numa tabela particionada se
+        ele incluir a coluna de partição. Assim a mesma chave vale antes e
+        depois da primeira carga em "partition".
+
+        :param table: str - Nome da tabela de destino.
+        :return: Sequence[str] - Colunas de `upsert_keys`, mais a de partição.
+        """
+        keys = self.upsert_keys[table]
+        column = get_partitioning(table, self.table_partitions).get('column')
+        if column and column not in keys:
+            keys = (*keys, column)
+        return keys
+
+    def delete_missing(
+        self, engine: Engine, table: str, changes: RowHashIndex
+    ) -> int:
+        """
+        Apaga da tabela as linhas que não apareceram numa leitura completa da origem.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param table: str - Nome da tabela de destino.
+        :param changes: RowHashIndex - Índice usado na carga.
+        :return: int - Quantidade de linhas apagadas.
+        """
+        with self.metrics.stage(table, 'delete') as stage:
+            stage['rows'] = self.delete_rows(
+                engine, table, changes.keys, changes.deleted()
+            )
+        return stage['rows']
+
+    def finalize_table(
+        self,
+        engine: Engine,
+        table: str,
+        swap: bool = False,
+        partitions: bool = False,
+    ):
+        """
+        Prepara a tabela para consultas depois de uma carga completa.
+
+        Cria os índices declarados em `table_indexes` depois da carga em massa,
+        para que não sejam mantidos linha a linha, e executa ANALYZE para o
+        planejador do Postgres partir de estatísticas atualizadas.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param table: str - Nome da tabela de destino.
+        :param swap: bool - A carga foi feita na tabela de sombra: os índices são
+            criados nela, que então substitui a tabela viva.
+        :param partitions: bool - A carga foi feita nas sombras de partição
+            (modo "partition"): cada uma substitui a sua partição e só as
+            partições trocadas passam pelo ANALYZE.
+        :return: None
+        """
+        indexes = get_indexes(table, self.table_indexes)
+
+        with self.metrics.stage(table, 'finalize'):
+            if partitions:
+                partitioning = get_partitioning(table, self.table_partitions)
+                swapped = self.partition_shadows(engine, table)
+                for partition in swapped:
+                    start, end = partition_range(
+                        table, partition, partitioning['interval']
+                    )
+                    self.swap_partition(
+                        engine,
+                        table,
+                        partition,
+                        partitioning['column'],
+                        start.to_pydatetime(),
+                        end.to_pydatetime(),
+                        unlogged=self.unlogged,
+                        indexes=indexes,
+                    )
+                # No PostgreSQL os índices da tabela particionada só anexam
+                # os já criados em cada partição
+                self.create_indexes(engine, table, indexes)
+                if engine.dialect.name == 'postgresql':
+                    for partition in swapped:
+                        self.analyze_table(engine, partition)
+                else:
+                    self.analyze_table(engine, table)
+                return
+
+            if swap:
+                self.swap_shadow_table(
+                    engine, table, unlogged=self.unlogged, indexes=indexes
+                )
+            else:
+                self.create_indexes(engine, table, indexes)
+
+            self.analyze_table(engine, table)
@@ -0,0 +1,332 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Contadores acumulados por (alvo, etapa)
+COUNTERS = ('seconds', 'documents', 'rows', 'bytes')
+
+# Descrição de cada métrica exportada no formato do Prometheus
+PROMETHEUS_HELP = {
+    'seconds': 'Tempo de parede gasto na etapa, em segundos.',
+    'documents': 'Documentos lidos do MongoDB na etapa.',
+    'rows': 'Linhas produzidas ou carregadas na etapa.',
+    'bytes': 'Bytes tratados na etapa: BSON lido na extração, em memória nas demais.',
+}
+
+# Medições de memória de cada etapa (gauges: o maior valor observado)
+MEMORY_GAUGES = {
+    'rss_bytes': 'Memória residente do processo ao fim da etapa, em bytes.',
+    'rss_growth_bytes': 'Maior crescimento da memória residente durante a etapa, em bytes.',
+}
+
+
+def peak_rss_bytes() -> int:
+    """
+    Retorna o pico de memória residente (RSS) do processo desde o início.
+
+    :return: int - Pico de RSS em bytes, ou 0 se a plataforma não informar.
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # O Linux informa em KiB; o macOS, em bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes() -> int:
+    """
+    Retorna a memória residente (RSS) atual do processo.
+
+    Ao contrário do pico, o valor atual também cai quando a memória é
+    liberada, o que permite atribuir o consumo a cada etapa.
+
+    :return: int - RSS em bytes, ou 0 se a plataforma não informar (só Linux).
+    """
+    try:
+        with open('/proc/self/statm', encoding='ascii') as file:
+            resident_pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class RunMetrics:
+    """
+    Classe responsável por medir as etapas de uma execução da pipeline.
+
+    Cada medição é acumulada por alvo (coleção ou tabela) e etapa ("extract",
+    "flatten", "transform", "load"), com tempo de parede, documentos, linhas e
+    bytes. A memória de cada etapa é o RSS atual do processo ao fim dela e o
+    quanto ele cresceu durante ela; o pico de RSS, que só cresce ao longo da
+    execução, é informado uma vez, para o processo. Com etapas em paralelo
+    (várias threads), o RSS é o do processo inteiro. É segura para uso por
+    várias threads.
+    """
+
+    def __init__(self):
+        """
+        Inicializa uma execução vazia, marcando o horário de início.
+        """
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: Dict[Tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        target: str,
+        stage: str,
+        seconds: float = 0.0,
+        documents: int = 0,
+        rows: int = 0,
+        bytes: int = 0,
+        rss_growth_bytes: int = 0,
+        rss_bytes: int = None,
+    ) -> None:
+        """
+        Acumula uma medição na etapa do alvo.
+
+        :param target: str - Coleção ou tabela medida.
+        :param stage: str - Nome da etapa.
+        :param seconds: float - Tempo de parede gasto.
+        :param documents: int - Documentos lidos.
+        :param rows: int - Linhas produzidas ou carregadas.
+        :param bytes: int - Bytes tratados.
+        :param rss_growth_bytes: int - Crescimento do RSS durante a etapa.
+        :param rss_bytes: int - RSS ao fim da etapa (padrão: o RSS atual).
+        """
+        if rss_bytes is None:
+            rss_bytes = current_rss_bytes()
+        with self._lock:
+            entry = self.stages.setdefault(
+                (target, stage),
+                {**dict.fromkeys(COUNTERS, 0), **dict.fromkeys(MEMORY_GAUGES, 0)},
+            )
+            entry['seconds'] += seconds
+            entry['documents'] += documents
+            entry['rows'] += rows
+            entry['bytes'] += int(bytes)
+            entry['rss_bytes'] = max(entry['rss_bytes'], rss_bytes)
+            entry['rss_growth_bytes'] = max(
+                entry['rss_growth_bytes'], rss_growth_bytes
+            )
+
+    @contextmanager
+    def stage(self, target: str, stage: str) -> Iterator[dict]:
+        """
+        Mede o tempo de um bloco de código como uma etapa do alvo.
+
+        O dicionário retornado pode receber "documents", "rows" e "bytes", que
+        são registrados junto com o tempo ao fim do bloco, mesmo em caso de erro.
+
+        :param target: str - Coleção ou tabela medida.
+        :param stage: str - Nome da etapa.
+        :return: Iterator[dict] - Contadores da etapa.
+        """
+        counters = {'documents': 0, 'rows': 0, 'bytes': 0}
+        start_rss = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            seconds = time.perf_counter() - start
+            rss = current_rss_bytes()
+            self.record(
+                target,
+                stage,
+                seconds=seconds,
+                rss_growth_bytes=max(rss - start_rss, 0),
+                rss_bytes=rss,
+                **counters,
+            )
+
+    def iter_timed(
+        self,
+        target: str,
+        stage: str,
+        iterable: Iterable,
+        count: str = 'documents',
+        size: Callable[[Any], int] = None,
+    ) -> Iterator:
+        """
+        Repassa os itens de um iterável, medindo apenas o tempo gasto para obtê-los.
+
+        Usado com cursores do MongoDB: o tempo de quem consome os itens não
+        entra na etapa. A medição é registrada quando o iterável termina ou
+        quando o gerador é fechado. O crescimento do RSS é medido entre o
+        primeiro e o último item e inclui a memória retida por quem os consome.
+
+        :param target: str - Coleção ou tabela medida.
+        :param stage: str - Nome da etapa.
+        :param iterable: Iterable - Itens a serem repassados.
+        :param count: str - Contador incrementado a cada item ("documents" ou "rows").
+        :param size: Callable - Calcula os bytes de cada item, fora do tempo
+            medido (opcional).
+        :return: Iterator - Os mesmos itens de `iterable`.
+        """
+        iterator = iter(iterable)
+        seconds = 0.0
+        items = 0
+        item_bytes = 0
+        start_rss = current_rss_bytes()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                items += 1
+                if size is not None:
+                    item_bytes += size(item)
+                yield item
+        finally:
+            rss = current_rss_bytes()
+            self.record(
+                target,
+                stage,
+                seconds=seconds,
+                bytes=item_bytes,
+                rss_growth_bytes=max(rss - start_rss, 0),
+                rss_bytes=rss,
+                **{count: items},
+            )
+
+    def merge(self, stages: List[dict]) -> None:
+        """
+        Acumula medições feitas em outro processo, no formato de `report()["stages"]`.
+
+        :param stages: List[dict] - Etapas medidas.
+        """
+        for entry in stages:
+            self.record(
+                entry['target'],
+                entry['stage'],
+                **{counter: entry[counter] for counter in COUNTERS},
+                **{gauge: entry[gauge] for gauge in MEMORY_GAUGES},
+            )
+
+    def report(self) -> dict:
+        """
+        Monta o relatório da execução.
+
+        :return: dict - Início, fim, pico de RSS do processo na execução e uma
+            entrada por (alvo, etapa), com linhas por segundo calculadas.
+        """
+        with self._lock:
+            stages = [
+                {
+                    'target': target,
+                    'stage': stage,
+                    **entry,
+                    'rows_per_second': (
+                        entry['rows'] / entry['seconds'] if entry['seconds'] else 0.0
+                    ),
+                }
+                for (target, stage), entry in self.stages.items()
+            ]
+
+        return {
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': stages,
+        }
+
+    def write_json(self, path: str) -> None:
+        """
+        Grava o relatório da execução em JSON.
+
+        :param path: str - Caminho do arquivo.
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=2, ensure_ascii=False)
+
+    def to_prometheus(self) -> str:
+        """
+        Exporta as medições no formato de texto do Prometheus.
+
+        :return: str - Métricas `etl_stage_*` por alvo e etapa e o gauge
+            `etl_peak_rss_bytes` do processo.
+        """
+        report = self.report()
+        lines = []
+
+        metrics = [(counter, f'etl_stage_{counter}_total', 'counter') for counter in COUNTERS]
+        metrics.append(('rows_per_second', 'etl_stage_rows_per_second', 'gauge'))
+        metrics.extend((gauge, f'etl_stage_{gauge}', 'gauge') for gauge in MEMORY_GAUGES)
+
+        for field, name, kind in metrics:
+            help_text = {**PROMETHEUS_HELP, **MEMORY_GAUGES}.get(
+                field, 'Linhas por segundo na etapa.'
+            )
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for entry in report['stages']:
+                labels = (
+                    f'target="{_escape_label(entry["target"])}",'
+                    f'stage="{_escape_label(entry["stage"])}"'
+                )
+                lines.append(f'{name}{{{labels}}} {entry[field]}')
+
+        lines.append('# HELP etl_peak_rss_bytes Pico de memória residente do processo.')
+        lines.append('# TYPE etl_peak_rss_bytes gauge')
+        lines.append(f'etl_peak_rss_bytes {report["peak_rss_bytes"]}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Grava as métricas no formato do Prometheus, ex.: para o textfile collector
+        do node_exporter.
+
+        :param path: str - Caminho do arquivo.
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.to_prometheus())
+
+    def serve_prometheus(
+        self, port: int, host: str = '127.0.0.1'
+    ) -> ThreadingHTTPServer:
+        """
+        Expõe as métricas num endpoint HTTP local, numa thread em segundo plano.
+
+        :param port: int - Porta do endpoint.
+        :param host: str - Endereço de escuta (padrão: apenas local).
+        :return: ThreadingHTTPServer - Servidor iniciado; `shutdown()` o encerra.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _escape_label(value: str) -> str:
+    """Escapa um valor de label do Prometheus."""
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
@@ -0,0 +1,317 @@
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    Integer,
+    Numeric,
+    REAL,
+    Text,
+)
+
+# Tipos de coluna aceitos nos esquemas: {tipo: (dtype do pandas, tipo SQL)}
+#   category: textos repetidos (ids, nomes de casas), codificados em dicionário
+#   float32:  odds decimais, que não precisam de dupla precisão
+#   decimal:  valores exatos; float64 em memória e NUMERIC no Postgres
+COLUMN_TYPES = {
+    'text': ('object', Text()),
+    'category': ('category', Text()),
+    'bool': ('boolean', Boolean()),
+    'int32': ('Int32', Integer()),
+    'int64': ('Int64', BigInteger()),
+    'float32': ('float32', REAL()),
+    'float64': ('float64', Float(precision=53)),
+    'decimal': ('float64', Numeric()),
+    'timestamp': ('datetime64[ns, UTC]', DateTime(timezone=True)),
+}
+
+# Colunas comuns às odds de cada casa (outcomes)
+_OUTCOME_COLUMNS = {
+    'type': 'category',
+    'odds_decimal': 'float32',
+    'odds_american': 'category',
+    'odds_fraction': 'category',
+    'open_odds_decimal': 'float32',
+    'open_odds_american': 'category',
+    'open_odds_fraction': 'category',
+    'removed': 'bool',
+}
+
+# Esquema de cada tabela de destino, {tabela: {coluna: tipo}}. Colunas fora do
+# esquema continuam com o tipo inferido pelo pandas.
+TABLE_SCHEMAS = {
+    'schedules': {
+        'start_time': 'timestamp',
+    },
+    'books': {
+        'id': 'category',
+        'name': 'category',
+        'removed': 'bool',
+    },
+    'sport_event_markets': {
+        'sport_event_id': 'category',
+        'id': 'category',
+        'name': 'category',
+    },
+    'sport_event_markets_outcomes': {
+        'sport_event_id': 'category',
+        'market_id': 'category',
+        'books_id': 'category',
+        'id': 'category',
+        'sport_event_start_time': 'timestamp',
+        **_OUTCOME_COLUMNS,
+    },
+    'sport_event_player_props_books_outcomes': {
+        'sport_event_id': 'category',
+        'player_id': 'category',
+        'market_id': 'category',
+        'id': 'category',
+        'name': 'category',
+        'removed': 'bool',
+        'sport_event_start_time': 'timestamp',
+        **{f'outcomes_{column}': type_ for column, type_ in _OUTCOME_COLUMNS.items()},
+    },
+    # Tabelas filhas do modo normalizado (ver "children" em FLATTEN_SPECS)
+    'sport_event_markets_books': {
+        'sport_event_id': 'category',
+        'market_id': 'category',
+        'id': 'category',
+        'name': 'category',
+        'removed': 'bool',
+    },
+    'sport_event_markets_books_outcomes': {
+        'sport_event_id': 'category',
+        'market_id': 'category',
+        'book_id': 'category',
+        **_OUTCOME_COLUMNS,
+    },
+    'sport_event_players_props_markets': {
+        'sport_event_id': 'category',
+        'player_id': 'category',
+        'id': 'category',
+        'name': 'category',
+    },
+    'sport_event_players_props_markets_books': {
+        'sport_event_id': 'category',
+        'player_id': 'category',
+        'market_id': 'category',
+        'id': 'category',
+        'name': 'category',
+        'removed': 'bool',
+    },
+    'sport_event_players_props_markets_books_outcomes': {
+        'sport_event_id': 'category',
+        'player_id': 'category',
+        'market_id': 'category',
+        'book_id': 'category',
+        **_OUTCOME_COLUMNS,
+    },
+}
+
+# Índices de cada tabela de destino, {tabela: {nome do índice: colunas}}.
+# São criados depois da carga em massa; os nomes são curtos porque o Postgres
+# trunca identificadores com mais de 63 caracteres.
+TABLE_INDEXES = {
+    'sport_event_markets': {
+        'markets_sport_event_idx': ('sport_event_id', 'id'),
+    },
+    'sport_event_markets_outcomes': {
+        'markets_outcomes_market_idx': ('sport_event_id', 'market_id'),
+        'markets_outcomes_book_idx': ('books_id',),
+    },
+    'sport_event_player_props_books_outcomes': {
+        'props_outcomes_player_idx': ('sport_event_id', 'player_id'),
+        'props_outcomes_market_idx': ('market_id',),
+    },
+    # Tabelas filhas: índices nas colunas que apontam para a linha do pai
+    'sport_event_markets_books': {
+        'markets_books_market_idx': ('sport_event_id', 'market_id'),
+    },
+    'sport_event_markets_books_outcomes': {
+        'markets_books_outcomes_book_idx': (
+            'sport_event_id',
+            'market_id',
+            'book_id',
+        ),
+    },
+    'sport_event_players_props_markets': {
+        'props_markets_player_idx': ('sport_event_id', 'player_id'),
+    },
+    'sport_event_players_props_markets_books': {
+        'props_markets_books_market_idx': (
+            'sport_event_id',
+            'player_id',
+            'market_id',
+        ),
+    },
+    'sport_event_players_props_markets_books_outcomes': {
+        'props_markets_outcomes_book_idx': (
+            'sport_event_id',
+            'player_id',
+            'market_id',
+            'book_id',
+        ),
+    },
+}
+
+# Intervalos de partição: {intervalo: (período do pandas, formato do sufixo)}
+PARTITION_INTERVALS = {
+    'day': ('D', '%Y%m%d'),
+    'month': ('M', '%Y%m'),
+}
+
+# Particionamento por faixa de datas de cada tabela de destino,
+# {tabela: {"column", "interval"}}. A coluna precisa ser "timestamp" no esquema
+# e ter a data do evento, para que recarregar eventos recentes só reconstrua as
+# partições recentes. No modo "partition" apenas as partições com linhas na
+# carga são reconstruídas.
+TABLE_PARTITIONS = {
+    'schedules': {'column': 'start_time', 'interval': 'month'},
+    'sport_event_markets_outcomes': {
+        'column': 'sport_event_start_time',
+        'interval': 'month',
+    },
+    'sport_event_player_props_books_outcomes': {
+        'column': 'sport_event_start_time',
+        'interval': 'month',
+    },
+}
+
+
+def get_schema(table: str, schemas: Dict[str, dict] = None) -> Dict[str, str]:
+    """
+    Retorna o esquema declarado para uma tabela de destino.
+
+    :param table: str - Nome da tabela.
+    :param schemas: dict - Esquemas disponíveis (padrão: TABLE_SCHEMAS).
+    :return: dict - Esquema {coluna: tipo}, vazio se a tabela não tiver esquema.
+    """
+    if schemas is None:
+        schemas = TABLE_SCHEMAS
+    return schemas.get(table, {})
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """
+    Converte as colunas do DataFrame para os tipos declarados no esquema.
+
+    Colunas numéricas passam por `pd.to_numeric`, então odds que chegam do
+    MongoDB como texto ("1.5") viram números e valores inválidos viram nulos.
+
+    :param df: pd.DataFrame - DataFrame a ser convertido.
+    :param schema: dict - Esquema {coluna: tipo}.
+    :return: pd.DataFrame - DataFrame com as colunas convertidas.
+    """
+    converted = {}
+    for column, type_ in schema.items():
+        if column not in df.columns:
+            continue
+
+        dtype = COLUMN_TYPES[type_][0]
+        values = df[column]
+        if type_ in ('int32', 'int64', 'float32', 'float64', 'decimal'):
+            values = pd.to_numeric(values, errors='coerce')
+        elif type_ == 'timestamp':
+            values = pd.to_datetime(values, errors='coerce', utc=True)
+        elif type_ == 'category':
+            # Categorias com valores de tipos mistos não podem ser ordenadas
+            values = values.where(values.isna(), values.astype(str))
+        converted[column] = values.astype(dtype)
+
+    if not converted:
+        return df
+    return df.assign(**converted)
+
+
+def sql_types(schema: Dict[str, str], columns=None) -> dict:
+    """
+    Monta o parâmetro `dtype` do `to_sql` a partir do esquema.
+
+    :param schema: dict - Esquema {coluna: tipo}.
+    :param columns: Iterable[str] - Restringe às colunas informadas (opcional).
+    :return: dict - Tipos SQLAlchemy de cada coluna, usados no CREATE TABLE.
+    """
+    return {
+        column: COLUMN_TYPES[type_][1]
+        for column, type_ in schema.items()
+        if columns is None or column in columns
+    }
+
+
+def get_indexes(table: str, indexes: Dict[str, dict] = None) -> List[dict]:
+    """
+    Retorna os índices declarados para uma tabela de destino.
+
+    :param table: str - Nome da tabela.
+    :param indexes: dict - Índices disponíveis (padrão: TABLE_INDEXES).
+    :return: List[dict] - Índices no formato do `Inspector.get_indexes` do
+        SQLAlchemy: {"name", "column_names", "unique"}.
+    """
+    if indexes is None:
+        indexes = TABLE_INDEXES
+    return [
+        {'name': name, 'column_names': list(columns), 'unique': False}
+        for name, columns in indexes.get(table, {}).items()
+    ]
+
+
+def get_partitioning(table: str, partitions: Dict[str, dict] = None) -> dict:
+    """
+    Retorna o particionamento declarado para uma tabela de destino.
+
+    :param table: str - Nome da tabela.
+    :param partitions: dict - Particionamentos disponíveis (padrão: TABLE_PARTITIONS).
+    :return: dict - {"column", "interval"}, vazio se a tabela não for particionada.
+    """
+    if partitions is None:
+        partitions = TABLE_PARTITIONS
+    return partitions.get(table, {})
+
+
+def partition_starts(values: pd.Series, interval: str) -> pd.Series:
+    """
+    Calcula o início da partição de cada valor da coluna de partição.
+
+    :param values: pd.Series - Valores da coluna (datas ou textos ISO 8601).
+    :param interval: str - Intervalo das partições ("day" ou "month").
+    :return: pd.Series - Início da partição em UTC, NaT para valores nulos ou inválidos.
+    """
+    period = PARTITION_INTERVALS[interval][0]
+    values = pd.to_datetime(values, errors='coerce', utc=True)
+    return (
+        values.dt.tz_localize(None)
+        .dt.to_period(period)
+        .dt.start_time.dt.tz_localize('UTC')
+    )
+
+
+def partition_name(table: str, start: pd.Timestamp, interval: str) -> str:
+    """
+    Monta o nome da partição que começa em `start`, ex.: "schedules_p202501".
+
+    :param table: str - Nome da tabela particionada.
+    :param start: pd.Timestamp - Início da partição.
+    :param interval: str - Intervalo das partições ("day" ou "month").
+    :return: str - Nome da partição.
+    """
+    return f'{table}_p{start.strftime(PARTITION_INTERVALS[interval][1])}'
+
+
+def partition_range(
+    table: str, partition: str, interval: str
+) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """
+    Retorna os limites da faixa coberta por uma partição, a partir do seu nome.
+
+    :param table: str - Nome da tabela particionada.
+    :param partition: str - Nome da partição, como em `partition_name`.
+    :param interval: str - Intervalo das partições ("day" ou "month").
+    :return: tuple - (início inclusivo, fim exclusivo), em UTC.
+    """
+    period, fmt = PARTITION_INTERVALS[interval]
+    start = pd.to_datetime(partition[len(table) + 2:], format=fmt, utc=True)
+    end = (start.tz_localize(None).to_period(period) + 1).start_time
+    return start, end.tz_localize('UTC')
@@ -1,7 +1,9 @@
-from typing import List
+from typing import Iterator, List
 
 from pymongo import MongoClient
 
+DEFAULT_BATCH_SIZE = 1000
+
 
 class MongoDBProcess:
     """
@@ -17,8 +19,157 @@ class MongoDBProcess:
         """
         self.client = MongoClient(uri)
 
+    def iter_nosql(
+        self,
+        database_name: str,
+        collection_name: str,
+        query: dict = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        sort: List[tuple] = None,
+        projection: dict = None,
+    ) -> Iterator[dict]:
+        """
+        Lê documentos de uma coleção no MongoDB de forma incremental, via cursor.
+
+        Os documentos são buscados do servidor em lotes de `batch_size`, então a
+        memória consumida é limitada pelo tamanho do lote e não pela coleção.
+
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param query: dict - Critério de consulta (opcional, padrão é vazio).
+        :param batch_size: int - Quantidade de documentos por lote do cursor.
+        :param sort: List[tuple] - Ordenação do cursor, ex.: [('_id', 1)] (opcional).
+        :param projection: dict - Campos retornados pelo servidor (opcional, padrão é todos).
+        :return: Iterator[dict] - Gerador de documentos encontrados.
+        """
+
+        if query is None:
+            query = {}
+
+        options = {'batch_size': batch_size}
+        if sort:
+            options['sort'] = sort
+        if projection:
+            options['projection'] = projection
+
+        try:
+            collection = self.client[database_name][collection_name]
+            for document in collection.find(query, **options):
+                yield document
+        except Exception as e:
+            raise RuntimeError(f'Erro ao ler do MongoDB: {e}')
+
+    def iter_aggregate(
+        self,
+        database_name: str,
+        collection_name: str,
+        pipeline: List[dict],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Iterator[dict]:
+        """
+        Executa um pipeline de agregação e gera os documentos resultantes via cursor.
+
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param pipeline: List[dict] - Estágios do pipeline de agregação.
+        :param batch_size: int - Quantidade de documentos por lote do cursor.
+        :return: Iterator[dict] - Gerador de documentos resultantes.
+        """
+        try:
+            collection = self.client[database_name][collection_name]
+            for document in collection.aggregate(
+                pipeline, batchSize=batch_size, allowDiskUse=True
+            ):
+                yield document
+        except Exception as e:
+            raise RuntimeError(f'Erro ao ler do MongoDB: {e}')
+
+    def watch_changes(
+        self,
+        database_name: str,
+        collection_names: List[str],
+        resume_after: dict = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_await_time_ms: int = 1000,
+    ):
+        """
+        Abre um change stream no banco, restrito às coleções informadas.
+
+        Apenas inserções, atualizações e substituições são recebidas, sempre
+        com o documento completo (`fullDocument`) lido após a alteração.
+        Requer um MongoDB em replica set (um nó único basta).
+
+        :param database_name: str - Nome do banco de dados.
+        :param collection_names: List[str] - Coleções acompanhadas.
+        :param resume_after: dict - Resume token de onde continuar (opcional,
+            padrão é a partir de agora).
+        :param batch_size: int - Quantidade de alterações por lote do cursor.
+        :param max_await_time_ms: int - Espera máxima do servidor por novas
+            alterações a cada `try_next`.
+        :return: pymongo.change_stream.DatabaseChangeStream - Change stream aberto.
+        """
+        pipeline = [
+            {
+                '$match': {
+                    'ns.coll': {'$in': list(collection_names)},
+                    'operationType': {'$in': ['insert', 'update', 'replace']},
+                }
+            }
+        ]
+
+        try:
+            return self.client[database_name].watch(
+                pipeline,
+                full_document='updateLookup',
+                resume_after=resume_after,
+                batch_size=batch_size,
+                max_await_time_ms=max_await_time_ms,
+            )
+        except Exception as e:
+            raise RuntimeError(f'Erro ao abrir o change stream do MongoDB: {e}')
+
+    def read_arrow(
+        self,
+        database_name: str,
+        collection_name: str,
+        pipeline: List[dict],
+        schema=None,
+    ):
+        """
+        Executa um pipeline de agregação e decodifica o resultado direto em Arrow.
+
+        Os lotes BSON do cursor são convertidos em colunas pelo `pymongoarrow`,
+        sem criar um dicionário Python por documento.
+
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param pipeline: List[dict] - Estágios do pipeline de agregação.
+        :param schema: pymongoarrow.api.Schema - Esquema das colunas (opcional,
+            inferido a partir dos documentos quando ausente).
+        :return: pyarrow.Table - Tabela com os documentos resultantes.
+        """
+        try:
+            from pymongoarrow.api import aggregate_arrow_all
+        except ImportError as e:
+            raise ImportError(
+                'A extração em Arrow requer os pacotes opcionais "pyarrow" e '
+                '"pymongoarrow" (pip install pyarrow pymongoarrow).'
+            ) from e
+
+        try:
+            collection = self.client[database_name][collection_name]
+            return aggregate_arrow_all(
+                collection, pipeline, schema=schema, allowDiskUse=True
+            )
+        except Exception as e:
+            raise RuntimeError(f'Erro ao ler do MongoDB: {e}')
+
     def read_nosql(
-        self, database_name: str, collection_name: str, query: dict = None
+        self,
+        database_name: str,
+        collection_name: str,
+        query: dict = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
     ) -> List[dict]:
         """
         Lê documentos de uma coleção no MongoDB.
@@ -26,18 +177,78 @@ class MongoDBProcess:
         :param database_name: str - Nome do banco de dados.
         :param collection_name: str - Nome da coleção.
         :param query: dict - Critério de consulta (opcional, padrão é vazio).
+        :param batch_size: int - Quantidade de documentos por lote do cursor.
         :return: List[dict] - Lista de documentos encontrados.
         """
+        return list(
+            self.iter_nosql(database_name, collection_name, query, batch_size)
+        )
+
+    def id_partitions(
+        self,
+        database_name: str,
+        collection_name: str,
+        partitions: int,
+        query: dict = None,
+        oversampling: int = 20,
+    ) -> List[dict]:
+        """
+        Divide a consulta em faixas de `_id` de tamanho aproximadamente igual.
+
+        Os limites das faixas são os quantis de uma amostra de `_id`s obtida com
+        `$sample`, então não dependem de privilégios como o `splitVector`. As
+        faixas são contíguas e disjuntas: juntas, retornam exatamente os mesmos
+        documentos da consulta original.
 
+        :param database_name: str - Nome do banco de dados.
+        :param collection_name: str - Nome da coleção.
+        :param partitions: int - Quantidade de faixas desejada.
+        :param query: dict - Critério de consulta (opcional, padrão é vazio).
+        :param oversampling: int - `_id`s amostrados por faixa, para estimar os limites.
+        :return: List[dict] - Uma consulta por faixa, em ordem crescente de `_id`.
+        """
         if query is None:
             query = {}
 
+        if partitions <= 1:
+            return [query]
+
         try:
             collection = self.client[database_name][collection_name]
-            return list(collection.find(query))
+            sample = collection.aggregate(
+                [
+                    {'$match': query},
+                    {'$sample': {'size': partitions * oversampling}},
+                    {'$project': {'_id': 1}},
+                ]
+            )
+            ids = sorted(document['_id'] for document in sample)
         except Exception as e:
             raise RuntimeError(f'Erro ao ler do MongoDB: {e}')
 
+        bounds = set()
+        if ids:
+            step = len(ids) / partitions
+            bounds = {ids[int(i * step)] for i in range(1, partitions)}
+        edges = [None, *sorted(bounds), None]
+
+        queries = []
+        for lower, upper in zip(edges, edges[1:]):
+            id_range = {}
+            if lower is not None:
+                id_range['$gte'] = lower
+            if upper is not None:
+                id_range['$lt'] = upper
+
+            if not id_range:
+                queries.append(query)
+            elif query:
+                queries.append({'$and': [query, {'_id': id_range}]})
+            else:
+                queries.append({'_id': id_range})
+
+        return queries
+
     def close_client(self) -> None:
         """Fecha a conexão com o MongoDB."""
         self.client.close()
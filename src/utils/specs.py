@@ -0,0 +1,376 @@
+from typing import Any, Callable, Dict, Iterable, List
+
+# Especificação de achatamento de cada coleção lógica:
+#   source: coleção do MongoDB de onde os documentos são lidos (padrão: a própria)
+#   table:  nome da tabela de destino (padrão: "{key}")
+#   carry:  campos do documento copiados para todas as linhas, {nome: caminho}
+#   unnest: arrays percorridos, do documento até as linhas. Em cada nível:
+#       path:   caminho do array dentro do elemento do nível anterior
+#       carry:  campos do elemento copiados para as linhas dos níveis internos
+#       select: (último nível) caminho da linha dentro de cada elemento
+#   fields: (opcional) campos lidos do MongoDB; por padrão, derivados dos caminhos
+#   children: (modo normalizado) listas de cada linha gravadas em tabelas filhas,
+#       {coluna: {"table", "parent_key": {coluna na filha: caminho no pai},
+#       "children"}}, em vez de explodidas na tabela principal
+# Caminhos usam ponto para campos aninhados e "{key}" para a chave da coleção.
+FLATTEN_SPECS = {
+    'competition_schedules': {
+        'unnest': [{'path': '{key}', 'select': 'sport_event'}],
+    },
+    'sport_event_player_props': {
+        'carry': {'sport_event_id': '{key}.sport_event.id'},
+        'unnest': [{'path': '{key}.players_props'}],
+        'children': {
+            'markets': {
+                'table': '{key}_markets',
+                'parent_key': {
+                    'sport_event_id': 'sport_event_id',
+                    'player_id': 'player.id',
+                },
+                'children': {
+                    'books': {
+                        'table': '{key}_markets_books',
+                        'parent_key': {
+                            'sport_event_id': 'sport_event_id',
+                            'player_id': 'player_id',
+                            'market_id': 'id',
+                        },
+                        'children': {
+                            'outcomes': {
+                                'table': '{key}_markets_books_outcomes',
+                                'parent_key': {
+                                    'sport_event_id': 'sport_event_id',
+                                    'player_id': 'player_id',
+                                    'market_id': 'market_id',
+                                    'book_id': 'id',
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+    'sport_event_markets': {
+        'table': 'sport_event_{key}',
+        'carry': {'sport_event_id': 'sport_event.id'},
+        'unnest': [{'path': '{key}'}],
+        'children': {
+            'books': {
+                'table': 'sport_event_{key}_books',
+                'parent_key': {
+                    'sport_event_id': 'sport_event_id',
+                    'market_id': 'id',
+                },
+                'children': {
+                    'outcomes': {
+                        'table': 'sport_event_{key}_books_outcomes',
+                        'parent_key': {
+                            'sport_event_id': 'sport_event_id',
+                            'market_id': 'market_id',
+                            'book_id': 'id',
+                        },
+                    },
+                },
+            },
+        },
+    },
+    'outcomes': {
+        'source': 'sport_event_markets',
+        'table': 'sport_event_{key}_outcomes',
+        'carry': {
+            'sport_event_id': 'sport_event.id',
+            'sport_event_start_time': 'sport_event.start_time',
+        },
+        'unnest': [
+            {'path': '{key}', 'carry': {'market_id': 'id'}},
+            {'path': 'books', 'carry': {'books_id': 'id'}},
+            {'path': 'outcomes'},
+        ],
+    },
+    'player_props_books': {
+        'source': 'sport_event_player_props',
+        'table': 'sport_event_player_props_{key}_outcomes',
+        'carry': {
+            'sport_event_id': 'sport_event_players_props.sport_event.id',
+            'sport_event_start_time': (
+                'sport_event_players_props.sport_event.start_time'
+            ),
+        },
+        'unnest': [
+            {
+                'path': 'sport_event_players_props.players_props',
+                'carry': {'player_id': 'player.id'},
+            },
+            {'path': 'markets', 'carry': {'market_id': 'id'}},
+            {'path': 'books'},
+        ],
+    },
+}
+
+# Coleções sem especificação própria: a lista na chave da coleção vira as linhas
+DEFAULT_SPEC = {'unnest': [{'path': '{key}'}]}
+
+
+def get_spec(collection_name: str, specs: Dict[str, dict] = None) -> dict:
+    """
+    Retorna a especificação de achatamento de uma coleção.
+
+    :param collection_name: str - Nome da coleção.
+    :param specs: dict - Especificações disponíveis (padrão: FLATTEN_SPECS).
+    :return: dict - Especificação da coleção, ou DEFAULT_SPEC.
+    """
+    if specs is None:
+        specs = FLATTEN_SPECS
+    return specs.get(collection_name, DEFAULT_SPEC)
+
+
+def destination_table(
+    collection_name: str, key_collection: str, specs: Dict[str, dict] = None
+) -> str:
+    """
+    Retorna o nome da tabela do Postgres que recebe os dados de uma coleção.
+
+    :param collection_name: str - Nome da coleção.
+    :param key_collection: str - Chave do documento que contém os dados.
+    :param specs: dict - Especificações disponíveis (padrão: FLATTEN_SPECS).
+    :return: str - Nome da tabela de destino.
+    """
+    spec = get_spec(collection_name, specs)
+    return spec.get('table', '{key}').format(key=key_collection)
+
+
+def child_tables(spec: dict, key_collection: str) -> List[str]:
+    """
+    Lista as tabelas filhas declaradas em "children", em profundidade.
+
+    :param spec: dict - Especificação de achatamento.
+    :param key_collection: str - Chave do documento que contém os dados.
+    :return: List[str] - Nomes das tabelas filhas, pais antes dos filhos.
+    """
+    tables = []
+    for child in spec.get('children', {}).values():
+        tables.append(child['table'].format(key=key_collection))
+        tables.extend(child_tables(child, key_collection))
+    return tables
+
+
+def compile_children(spec: dict, key_collection: str) -> tuple:
+    """
+    Compila as tabelas filhas declaradas em "children".
+
+    :param spec: dict - Especificação de achatamento (ou de uma tabela filha).
+    :param key_collection: str - Chave do documento que contém os dados.
+    :return: tuple - Uma entrada (coluna, tabela, chaves do pai, filhas) por
+        lista, em que as chaves do pai são pares (coluna na filha, função que
+        lê o valor da linha do pai).
+    """
+    return tuple(
+        (
+            column,
+            child['table'].format(key=key_collection),
+            tuple(
+                (name, _getter(path.format(key=key_collection)))
+                for name, path in child['parent_key'].items()
+            ),
+            compile_children(child, key_collection),
+        )
+        for column, child in spec.get('children', {}).items()
+    )
+
+
+def _getter(path: str) -> Callable[[Any], Any]:
+    """
+    Pré-compila a leitura de um caminho com ponto em uma função.
+
+    :param path: str - Caminho do campo, ex.: "sport_event.id".
+    :return: Callable - Função que recebe um valor e retorna o campo, ou None.
+    """
+    parts = tuple(path.split('.'))
+
+    if len(parts) == 1:
+        key = parts[0]
+
+        def get(value: Any) -> Any:
+            return value.get(key) if isinstance(value, dict) else None
+
+        return get
+
+    def get(value: Any) -> Any:
+        for part in parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+    return get
+
+
+def compile_spec(
+    spec: dict, key_collection: str
+) -> Callable[[dict], List[dict]]:
+    """
+    Compila uma especificação em uma função que achata um documento em linhas.
+
+    Os caminhos são resolvidos uma única vez aqui; a função retornada apenas
+    percorre os arrays e monta as linhas. As linhas com campos herdados são
+    cópias rasas dos elementos, então o documento de origem não é alterado e
+    pode alimentar outras especificações.
+
+    :param spec: dict - Especificação de achatamento.
+    :param key_collection: str - Chave do documento que contém os dados.
+    :return: Callable - Função documento -> lista de linhas.
+    """
+
+    def compile_carry(carry: Dict[str, str]) -> tuple:
+        return tuple(
+            (name, _getter(path.format(key=key_collection)))
+            for name, path in carry.items()
+        )
+
+    root_carry = compile_carry(spec.get('carry', {}))
+    levels = tuple(
+        (
+            _getter(level['path'].format(key=key_collection)),
+            compile_carry(level.get('carry', {})),
+        )
+        for level in spec['unnest']
+    )
+    select = spec['unnest'][-1].get('select')
+    get_selected = _getter(select) if select else None
+    last = len(levels) - 1
+
+    def walk(parent: Any, depth: int, carried: dict, rows: List[dict]):
+        get_items, level_carry = levels[depth]
+        items = get_items(parent) or []
+
+        if depth == last:
+            for item in items:
+                if get_selected is not None:
+                    item = get_selected(item) or {}
+                if carried and isinstance(item, dict):
+                    item = {**item, **carried}
+                rows.append(item)
+            return
+
+        for item in items:
+            item_carried = carried
+            if level_carry:
+                item_carried = {**carried}
+                for name, get in level_carry:
+                    item_carried[name] = get(item)
+            walk(item, depth + 1, item_carried, rows)
+
+    def flatten(document: dict) -> List[dict]:
+        rows = []
+        carried = {name: get(document) for name, get in root_carry}
+        walk(document, 0, carried, rows)
+        return rows
+
+    return flatten
+
+
+def spec_fields(spec: dict, key_collection: str) -> List[str]:
+    """
+    Lista os campos do documento que a especificação precisa ler.
+
+    São os campos herdados e o caminho completo até as linhas do último nível;
+    o restante do documento pode ficar no servidor.
+
+    :param spec: dict - Especificação de achatamento.
+    :param key_collection: str - Chave do documento que contém os dados.
+    :return: List[str] - Caminhos completos, com ponto, a partir da raiz.
+    """
+    if 'fields' in spec:
+        return [field.format(key=key_collection) for field in spec['fields']]
+
+    fields = [
+        path.format(key=key_collection)
+        for path in spec.get('carry', {}).values()
+    ]
+    prefix = ''
+    for level in spec['unnest']:
+        prefix = _join(prefix, level['path'].format(key=key_collection))
+        fields.extend(
+            _join(prefix, path.format(key=key_collection))
+            for path in level.get('carry', {}).values()
+        )
+
+    select = spec['unnest'][-1].get('select')
+    fields.append(_join(prefix, select) if select else prefix)
+    return fields
+
+
+def build_projection(fields: Iterable[str]) -> dict:
+    """
+    Monta uma projeção do MongoDB a partir de uma lista de campos.
+
+    Campos contidos em outro campo da lista são descartados, já que o MongoDB
+    rejeita projeções com colisão de caminhos (ex.: "markets" e "markets.id").
+
+    :param fields: Iterable[str] - Caminhos com ponto.
+    :return: dict - Projeção {campo: 1}.
+    """
+    kept = []
+    for field in sorted(set(fields)):
+        if not any(field.startswith(f'{parent}.') for parent in kept):
+            kept.append(field)
+    return {field: 1 for field in kept}
+
+
+def build_pipeline(
+    spec: dict, key_collection: str, query: dict = None
+) -> List[dict]:
+    """
+    Traduz a especificação em um pipeline de agregação que achata no servidor.
+
+    Cada nível vira um `$unwind` e cada linha é montada com `$replaceRoot`,
+    juntando o elemento do último nível aos campos herdados. As linhas
+    retornadas são equivalentes às da função gerada por `compile_spec`.
+
+    :param spec: dict - Especificação de achatamento.
+    :param key_collection: str - Chave do documento que contém os dados.
+    :param query: dict - Critério de consulta aplicado antes do achatamento (opcional).
+    :return: List[dict] - Estágios do pipeline de agregação.
+    """
+    stages = []
+    if query:
+        stages.append({'$match': query})
+    stages.append({'$project': build_projection(spec_fields(spec, key_collection))})
+
+    # Depois dos $unwind cada array percorrido vira um único objeto, então os
+    # campos herdados podem ser lidos pelo caminho completo no estágio final
+    carried = {
+        name: _join('', path.format(key=key_collection))
+        for name, path in spec.get('carry', {}).items()
+    }
+    prefix = ''
+    for level in spec['unnest']:
+        prefix = _join(prefix, level['path'].format(key=key_collection))
+        stages.append({'$unwind': f'${prefix}'})
+        for name, path in level.get('carry', {}).items():
+            carried[name] = _join(prefix, path.format(key=key_collection))
+
+    select = spec['unnest'][-1].get('select')
+    row = _join(prefix, select) if select else prefix
+    stages.append(
+        {
+            '$replaceRoot': {
+                'newRoot': {
+                    '$mergeObjects': [
+                        f'${row}',
+                        {
+                            name: {'$ifNull': [f'${path}', None]}
+                            for name, path in carried.items()
+                        },
+                    ]
+                }
+            }
+        }
+    )
+    return stages
+
+
+def _join(prefix: str, path: str) -> str:
+    """Concatena dois caminhos com ponto."""
+    return f'{prefix}.{path}' if prefix else path
@@ -0,0 +1,185 @@
+import json
+import os
+import shutil
+from typing import Iterator, List
+
+import pandas as pd
+
+# Extensão dos arquivos de cada formato aceito
+STAGING_FORMATS = {'parquet': 'parquet', 'arrow': 'arrow'}
+
+MANIFEST = '_manifest.json'
+
+
+def _require_pyarrow():
+    """
+    Importa o pyarrow, necessário para ler e gravar os arquivos de staging.
+
+    :return: module - Módulo `pyarrow`, com `pyarrow.ipc` e `pyarrow.parquet` carregados.
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            'O staging em disco requer o pacote opcional "pyarrow" '
+            '(pip install pyarrow).'
+        ) from e
+    return pyarrow
+
+
+class StagingArea:
+    """
+    Classe responsável por guardar em disco as linhas tratadas de cada tabela de destino.
+
+    Cada tabela tem um diretório com partes numeradas (Parquet ou Arrow IPC) e
+    um manifesto em JSON, que registra as partes gravadas, se a extração foi
+    concluída e quais partes já foram carregadas. Assim a carga pode ser
+    refeita ou retomada sem reler o MongoDB, em outro horário ou máquina.
+    """
+
+    def __init__(self, root: str, file_format: str = 'parquet'):
+        """
+        Inicializa a área de staging.
+
+        :param root: str - Diretório raiz da área de staging.
+        :param file_format: str - Formato das partes ("parquet" ou "arrow").
+        """
+        if file_format not in STAGING_FORMATS:
+            raise ValueError(f'Formato de staging inválido: {file_format}')
+        self.root = root
+        self.file_format = file_format
+
+    def _table_dir(self, table: str) -> str:
+        return os.path.join(self.root, table)
+
+    def read_manifest(self, table: str) -> dict:
+        """
+        Retorna o manifesto da tabela.
+
+        :param table: str - Nome da tabela de destino.
+        :return: dict - Manifesto, ou None se a tabela não tiver sido extraída.
+        """
+        path = os.path.join(self._table_dir(table), MANIFEST)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def _write_manifest(self, table: str, manifest: dict) -> None:
+        """
+        Grava o manifesto de forma atômica (arquivo temporário + rename).
+        """
+        path = os.path.join(self._table_dir(table), MANIFEST)
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(temporary, path)
+
+    def begin(self, table: str, collection_name: str) -> None:
+        """
+        Inicia uma nova extração da tabela, descartando as partes anteriores.
+
+        :param table: str - Nome da tabela de destino.
+        :param collection_name: str - Coleção de onde as linhas vêm.
+        """
+        directory = self._table_dir(table)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        self._write_manifest(
+            table,
+            {
+                'table': table,
+                'collection': collection_name,
+                'format': self.file_format,
+                'parts': [],
+                'rows': 0,
+                'complete': False,
+                'loaded_parts': [],
+            },
+        )
+
+    def write_part(self, table: str, df: pd.DataFrame) -> str:
+        """
+        Grava um bloco de linhas como a próxima parte da tabela.
+
+        :param table: str - Nome da tabela de destino.
+        :param df: pd.DataFrame - Linhas tratadas do bloco.
+        :return: str - Nome do arquivo gravado.
+        """
+        pa = _require_pyarrow()
+        manifest = self.read_manifest(table)
+
+        name = f'part-{len(manifest["parts"]):05d}.{STAGING_FORMATS[self.file_format]}'
+        path = os.path.join(self._table_dir(table), name)
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+
+        if self.file_format == 'parquet':
+            pa.parquet.write_table(arrow_table, path)
+        else:
+            with pa.OSFile(path, 'wb') as sink:
+                with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                    writer.write_table(arrow_table)
+
+        manifest['parts'].append(name)
+        manifest['rows'] += len(df)
+        self._write_manifest(table, manifest)
+        return name
+
+    def complete(self, table: str) -> None:
+        """
+        Marca a extração da tabela como concluída, liberando-a para a carga.
+
+        :param table: str - Nome da tabela de destino.
+        """
+        manifest = self.read_manifest(table)
+        manifest['complete'] = True
+        self._write_manifest(table, manifest)
+
+    def completed_manifest(self, table: str) -> dict:
+        """
+        Retorna o manifesto da tabela, exigindo que a extração tenha terminado.
+
+        :param table: str - Nome da tabela de destino.
+        :return: dict - Manifesto da tabela.
+        """
+        manifest = self.read_manifest(table)
+        if manifest is None or not manifest['complete']:
+            raise RuntimeError(
+                f"Staging da tabela '{table}' ausente ou incompleto em '{self.root}'."
+            )
+        return manifest
+
+    def iter_parts(self, table: str) -> Iterator[tuple]:
+        """
+        Lê as partes da tabela, na ordem em que foram gravadas.
+
+        Partes em Arrow IPC são lidas por memory-map, sem cópia para a memória
+        antes da conversão para pandas.
+
+        :param table: str - Nome da tabela de destino.
+        :return: Iterator[tuple] - Pares (nome da parte, DataFrame).
+        """
+        pa = _require_pyarrow()
+        manifest = self.completed_manifest(table)
+
+        for name in manifest['parts']:
+            path = os.path.join(self._table_dir(table), name)
+            if manifest['format'] == 'parquet':
+                df = pa.parquet.read_table(path).to_pandas()
+            else:
+                with pa.memory_map(path) as source:
+                    df = pa.ipc.open_file(source).read_all().to_pandas()
+            yield name, df
+
+    def mark_loaded(self, table: str, parts: List[str]) -> None:
+        """
+        Registra as partes já carregadas no destino.
+
+        :param table: str - Nome da tabela de destino.
+        :param parts: List[str] - Partes carregadas (substitui o registro anterior).
+        """
+        manifest = self.read_manifest(table)
+        manifest['loaded_parts'] = list(parts)
+        self._write_manifest(table, manifest)
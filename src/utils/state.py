@@ -0,0 +1,227 @@
+from contextlib import nullcontext
+from typing import Any
+
+from bson import json_util
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Connection,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    func,
+    select,
+)
+
+
+class SyncStateStore:
+    """
+    Classe responsável por persistir no PostgreSQL o estado das sincronizações incrementais.
+
+    Guarda, por coleção, o campo usado como marca d'água (high-water mark) e o
+    maior valor já carregado. Os valores são serializados em Extended JSON, o
+    que preserva tipos do MongoDB como `ObjectId` e `datetime`.
+    """
+
+    def __init__(self, engine: Engine, table: str = 'etl_sync_state'):
+        """
+        Inicializa o armazenamento de estado, criando a tabela caso não exista.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param table: str - Nome da tabela de estado.
+        """
+        self.engine = engine
+        metadata = MetaData()
+        self.table = Table(
+            table,
+            metadata,
+            Column('collection_name', String, primary_key=True),
+            Column('watermark_field', String, nullable=False),
+            Column('watermark_value', Text, nullable=False),
+            Column(
+                'updated_at',
+                DateTime(timezone=True),
+                server_default=func.now(),
+                onupdate=func.now(),
+            ),
+        )
+        metadata.create_all(engine, checkfirst=True)
+
+    def get_watermark(self, collection_name: str, watermark_field: str) -> Any:
+        """
+        Retorna a marca d'água salva para a coleção.
+
+        :param collection_name: str - Nome da coleção.
+        :param watermark_field: str - Campo usado como marca d'água.
+        :return: Any - Último valor carregado, ou None se não houver estado salvo
+            para esse campo (o que força uma carga completa).
+        """
+        query = select(
+            self.table.c.watermark_field, self.table.c.watermark_value
+        ).where(self.table.c.collection_name == collection_name)
+
+        with self.engine.connect() as connection:
+            row = connection.execute(query).first()
+
+        if row is None or row.watermark_field != watermark_field:
+            return None
+        return json_util.loads(row.watermark_value)
+
+    def set_watermark(
+        self,
+        collection_name: str,
+        watermark_field: str,
+        value: Any,
+        connection: Connection = None,
+    ) -> None:
+        """
+        Salva a marca d'água da coleção.
+
+        :param collection_name: str - Nome da coleção.
+        :param watermark_field: str - Campo usado como marca d'água.
+        :param value: Any - Maior valor carregado até o momento.
+        :param connection: sqlalchemy.engine.Connection - Transação em andamento
+            onde a marca é gravada, confirmada junto com o bloco carregado
+            (padrão: uma transação própria).
+        """
+        values = {
+            'watermark_field': watermark_field,
+            'watermark_value': json_util.dumps(value),
+        }
+
+        with _transaction(self.engine, connection) as connection:
+            _save_row(connection, self.table, collection_name, values)
+
+
+class CheckpointStore:
+    """
+    Classe responsável por persistir no PostgreSQL o progresso das cargas em blocos.
+
+    Guarda, por coleção, o `_id` do último documento lido e a quantidade de
+    blocos e linhas já confirmados no destino. O checkpoint é gravado na mesma
+    transação do bloco que ele registra, então nunca aponta para um bloco que
+    não foi confirmado. É apagado quando a carga termina.
+    """
+
+    def __init__(self, engine: Engine, table: str = 'etl_checkpoints'):
+        """
+        Inicializa o armazenamento de checkpoints, criando a tabela caso não exista.
+
+        :param engine: sqlalchemy.engine.Engine - Conexão com o banco de dados.
+        :param table: str - Nome da tabela de checkpoints.
+        """
+        self.engine = engine
+        metadata = MetaData()
+        self.table = Table(
+            table,
+            metadata,
+            Column('collection_name', String, primary_key=True),
+            Column('table_name', String, nullable=False),
+            Column('last_id', Text, nullable=False),
+            Column('chunks', Integer, nullable=False),
+            Column('rows', BigInteger, nullable=False),
+            Column(
+                'updated_at',
+                DateTime(timezone=True),
+                server_default=func.now(),
+                onupdate=func.now(),
+            ),
+        )
+        metadata.create_all(engine, checkfirst=True)
+
+    def get(self, collection_name: str) -> dict:
+        """
+        Retorna o checkpoint salvo para a coleção.
+
+        :param collection_name: str - Nome da coleção.
+        :return: dict - {"table", "last_id", "chunks", "rows"}, ou None se não
+            houver carga interrompida da coleção.
+        """
+        query = select(self.table).where(
+            self.table.c.collection_name == collection_name
+        )
+
+        with self.engine.connect() as connection:
+            row = connection.execute(query).first()
+
+        if row is None:
+            return None
+        return {
+            'table': row.table_name,
+            'last_id': json_util.loads(row.last_id),
+            'chunks': row.chunks,
+            'rows': row.rows,
+        }
+
+    def save(
+        self,
+        collection_name: str,
+        table: str,
+        last_id: Any,
+        chunks: int,
+        rows: int,
+        connection: Connection = None,
+    ) -> None:
+        """
+        Salva o progresso da carga da coleção.
+
+        :param collection_name: str - Nome da coleção.
+        :param table: str - Tabela de destino da carga.
+        :param last_id: Any - `_id` do último documento do bloco confirmado.
+        :param chunks: int - Blocos confirmados até o momento.
+        :param rows: int - Linhas confirmadas até o momento.
+        :param connection: sqlalchemy.engine.Connection - Transação do bloco
+            (padrão: uma transação própria).
+        """
+        values = {
+            'table_name': table,
+            'last_id': json_util.dumps(last_id),
+            'chunks': chunks,
+            'rows': rows,
+        }
+
+        with _transaction(self.engine, connection) as connection:
+            _save_row(connection, self.table, collection_name, values)
+
+    def clear(self, collection_name: str) -> None:
+        """
+        Apaga o checkpoint da coleção, ao fim de uma carga completa.
+
+        :param collection_name: str - Nome da coleção.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                self.table.delete().where(
+                    self.table.c.collection_name == collection_name
+                )
+            )
+
+
+def _transaction(engine: Engine, connection: Connection = None):
+    """
+    Reaproveita a transação informada ou abre uma nova na engine.
+    """
+    if connection is not None:
+        return nullcontext(connection)
+    return engine.begin()
+
+
+def _save_row(
+    connection: Connection, table: Table, collection_name: str, values: dict
+) -> None:
+    """
+    Atualiza a linha da coleção, inserindo-a caso ainda não exista.
+    """
+    updated = connection.execute(
+        table.update()
+        .where(table.c.collection_name == collection_name)
+        .values(**values)
+    )
+    if not updated.rowcount:
+        connection.execute(
+            table.insert().values(collection_name=collection_name, **values)
+        )
@@ -0,0 +1,49 @@
+import pytest
+
+from benchmarks.generator import (
+    generate_markets_documents,
+    generate_player_props_documents,
+)
+from src.utils.etl import ETLProcess
+
+
+@pytest.fixture
+def etl_instance():
+    return ETLProcess(uri='mongodb://fake_uri')
+
+
+def test_markets_documents_fan_out(etl_instance):
+    """Testa se cada evento gera markets x books x outcomes linhas de outcomes."""
+    (document,) = generate_markets_documents(1, markets=3, books=2, outcomes=4)
+
+    rows = etl_instance._flatten_document(document, 'outcomes', 'markets')
+
+    assert len(rows) == 3 * 2 * 4
+    assert rows[0]['sport_event_id'] == 'sr:sport_event:0'
+    assert float(rows[0]['odds_decimal']) > 1
+
+
+def test_player_props_documents_fan_out(etl_instance):
+    """Testa se cada evento gera players x markets x books linhas de casas."""
+    (document,) = generate_player_props_documents(1, players=2, markets=3, books=4)
+
+    rows = etl_instance._flatten_document(document, 'player_props_books', 'books')
+
+    assert len(rows) == 2 * 3 * 4
+    assert rows[0]['player_id'] == 'sr:player:0'
+
+
+def test_run_benchmark_smoke():
+    """Testa uma execução curta do benchmark contra mongomock e SQLite."""
+    pytest.importorskip('mongomock')
+    from benchmarks.run import run_benchmark
+
+    report = run_benchmark(
+        events=2,
+        scenarios=['markets'],
+        fanout={'markets': {'markets': 2, 'books': 2, 'outcomes': 2}},
+    )
+
+    stages = {(entry['collection'], entry['stage']): entry for entry in report['stages']}
+    assert stages[('outcomes', 'load_to_destination')]['rows'] == 2 * 2 * 2 * 2
+    assert all(entry['peak_bytes'] > 0 for entry in report['stages'])
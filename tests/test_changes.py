@@ -0,0 +1,38 @@
+import pandas as pd
+
+from src.utils.changes import HASH_COLUMN, RowHashIndex, row_hashes
+
+
+def test_row_hashes_ignore_column_order():
+    """Testa se o hash não depende da ordem das colunas nem da coluna de hash."""
+    df = pd.DataFrame({'id': ['a', 'b'], 'odds': [1.5, 2.0]})
+    reordered = df[['odds', 'id']].assign(**{HASH_COLUMN: 0})
+
+    assert row_hashes(df).tolist() == row_hashes(reordered).tolist()
+    assert row_hashes(df).dtype == 'int64'
+    assert row_hashes(df)[0] != row_hashes(df)[1]
+
+
+def test_row_hashes_ignore_chunk_makeup():
+    """Testa se a mesma linha tem o mesmo hash em blocos com colunas e dtypes diferentes."""
+    first = pd.DataFrame({'id': ['a'], 'v': [1]})
+    second = pd.DataFrame({'id': ['a', 'b'], 'v': [1.0, None], 'extra': [None, 'x']})
+
+    assert first['v'].dtype == 'int64' and second['v'].dtype == 'float64'
+    assert row_hashes(first)[0] == row_hashes(second)[0]
+    assert row_hashes(second)[0] != row_hashes(second)[1]
+
+
+def test_row_hash_index_changed_and_deleted():
+    """Testa se só as linhas novas ou alteradas são devolvidas."""
+    stored = pd.DataFrame({'id': ['a', 'b', 'c'], 'odds': [1.5, 2.0, 3.0]})
+    hashes = dict(zip([('a',), ('b',), ('c',)], row_hashes(stored).tolist()))
+    index = RowHashIndex(['id'], hashes)
+
+    changed = index.changed(
+        pd.DataFrame({'id': ['a', 'b', 'd'], 'odds': [1.5, 2.5, 4.0]})
+    )
+
+    assert changed['id'].tolist() == ['b', 'd']
+    assert HASH_COLUMN in changed.columns
+    assert index.deleted() == [('c',)]
@@ -1,6 +1,9 @@
 from unittest.mock import MagicMock, patch
 
+import pandas as pd
 import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
 
 from src.utils.destination import (  # Ajuste conforme sua estrutura de diretórios
@@ -38,3 +41,201 @@ def test_close_engine(db_engine):
     engine_mock = MagicMock()
     db_engine.close_engine(engine_mock)
     engine_mock.dispose.assert_called_once()
+
+
+def test_add_missing_columns(db_engine):
+    engine = create_engine('sqlite://')
+    pd.DataFrame({'id': [1]}).to_sql('books', engine, index=False)
+
+    df = pd.DataFrame({'id': [2], 'odds': [1.5], 'name': ['x']})
+    added = db_engine.add_missing_columns(engine, df, 'books')
+
+    assert added == ['odds', 'name']
+    columns = [c['name'] for c in inspect(engine).get_columns('books')]
+    assert columns == ['id', 'odds', 'name']
+
+
+def test_add_missing_columns_without_table(db_engine):
+    engine = create_engine('sqlite://')
+    df = pd.DataFrame({'id': [1]})
+    assert db_engine.add_missing_columns(engine, df, 'books') == []
+
+
+def test_copy_insert(db_engine):
+    pd_table = MagicMock()
+    pd_table.name = 'books'
+    pd_table.schema = None
+    conn = MagicMock()
+    conn.dialect = create_engine('sqlite://').dialect
+    cursor = conn.connection.cursor.return_value.__enter__.return_value
+    cursor.rowcount = 2
+    buffers = []
+    cursor.copy_expert.side_effect = lambda sql, buffer: buffers.append(
+        buffer.getvalue()
+    )
+
+    copied = db_engine.copy_insert(
+        pd_table, conn, ['id', 'name'], iter([(1, 'a'), (2, None), (3, '')])
+    )
+
+    assert copied == 2
+    sql = cursor.copy_expert.call_args.args[0]
+    assert sql == 'COPY books (id, name) FROM STDIN WITH (FORMAT csv)'
+    assert buffers == ['"1","a"\r\n"2",\r\n"3",""\r\n']
+
+
+def test_upsert_dataframe_creates_and_merges(db_engine):
+    engine = create_engine('sqlite://')
+    first = pd.DataFrame({'id': [1, 2], 'odds': [1.5, 2.0]})
+    db_engine.upsert_dataframe(engine, first, 'books', ['id'])
+
+    second = pd.DataFrame({'id': [2, 3], 'odds': [2.5, 3.5], 'name': ['b', 'c']})
+    merged = db_engine.upsert_dataframe(engine, second, 'books', ['id'])
+
+    assert merged == 2
+    result = pd.read_sql('SELECT * FROM books ORDER BY id', engine)
+    assert result['odds'].tolist() == [1.5, 2.5, 3.5]
+    assert result['name'].tolist() == [None, 'b', 'c']
+    assert not inspect(engine).has_table('books_staging')
+
+
+def test_upsert_dataframe_repeated_key(db_engine):
+    """Testa se chaves repetidas rejeitam a carga em vez de descartar linhas."""
+    engine = create_engine('sqlite://')
+    df = pd.DataFrame({'id': [1, 1], 'odds': [1.5, 2.0]})
+    with pytest.raises(ValueError, match='chave repetida'):
+        db_engine.upsert_dataframe(engine, df, 'books', ['id'])
+    assert not inspect(engine).has_table('books')
+
+
+def test_upsert_dataframe_null_key_part(db_engine):
+    """Testa se uma linha com parte da chave nula é atualizada, e não duplicada."""
+    engine = create_engine('sqlite://')
+    keys = ['sport_event_id', 'id', 'books_id']
+    first = pd.DataFrame({
+        'sport_event_id': ['e1', 'e1'],
+        'id': ['m1', 'm2'],
+        'books_id': ['b1', None],
+        'name': ['a', 'b'],
+    })
+    db_engine.upsert_dataframe(engine, first, 'markets', keys)
+    db_engine.upsert_dataframe(engine, first.assign(name='c'), 'markets', keys)
+
+    result = pd.read_sql('SELECT id, name FROM markets ORDER BY id', engine)
+    assert result.values.tolist() == [['m1', 'c'], ['m2', 'c']]
+
+
+def test_upsert_dataframe_missing_key(db_engine):
+    engine = create_engine('sqlite://')
+    df = pd.DataFrame({'id': [1]})
+    with pytest.raises(ValueError, match='Colunas de chave ausentes'):
+        db_engine.upsert_dataframe(engine, df, 'books', ['id', 'market_id'])
+
+
+def test_create_indexes_skips_missing_columns(db_engine):
+    """Testa se índices com colunas ausentes na tabela são ignorados."""
+    engine = create_engine('sqlite://')
+    pd.DataFrame({'a': [1]}).to_sql('t', engine, index=False)
+
+    db_engine.create_indexes(
+        engine,
+        't',
+        [
+            {'name': 't_a_idx', 'column_names': ['a'], 'unique': True},
+            {'name': 't_b_idx', 'column_names': ['b'], 'unique': False},
+        ],
+    )
+
+    indexes = inspect(engine).get_indexes('t')
+    assert [(index['name'], bool(index['unique'])) for index in indexes] == [
+        ('t_a_idx', True)
+    ]
+
+
+def test_read_row_hashes_and_delete_rows(db_engine):
+    """Testa a leitura das chaves com hash e a exclusão por chave."""
+    engine = create_engine('sqlite://')
+    assert db_engine.read_row_hashes(engine, 'odds', ['id'], '_row_hash') == {}
+
+    pd.DataFrame({'id': ['a', 'b'], 'book': ['x', 'y']}).to_sql(
+        'odds', engine, index=False
+    )
+    # Tabela gravada antes da coluna de hash
+    assert db_engine.read_row_hashes(engine, 'odds', ['id'], '_row_hash') == {
+        ('a',): None,
+        ('b',): None,
+    }
+
+    assert db_engine.delete_rows(engine, 'odds', ['id', 'book'], [('a', 'x')]) == 1
+    assert pd.read_sql('SELECT id FROM odds', engine)['id'].tolist() == ['b']
+
+
+def test_swap_partition_replaces_range(db_engine):
+    """Testa a troca de uma partição sem particionamento declarativo (SQLite)."""
+    engine = create_engine('sqlite://')
+    df = pd.DataFrame({
+        'id': [1, 2],
+        'day': pd.to_datetime(['2025-01-01', '2025-01-02'], utc=True),
+    })
+    db_engine.create_partitioned_table(engine, df, 'odds', 'day')
+    df.to_sql('odds', engine, index=False, if_exists='append')
+
+    db_engine.create_partition_shadow(engine, 'odds', 'odds_p20250102')
+    df.tail(1).assign(id=3).to_sql(
+        'odds_p20250102__shadow', engine, index=False, if_exists='append'
+    )
+    assert db_engine.partition_shadows(engine, 'odds') == ['odds_p20250102']
+
+    db_engine.swap_partition(
+        engine,
+        'odds',
+        'odds_p20250102',
+        'day',
+        pd.Timestamp('2025-01-02', tz='UTC').to_pydatetime(),
+        pd.Timestamp('2025-01-03', tz='UTC').to_pydatetime(),
+    )
+
+    assert pd.read_sql('SELECT id FROM odds ORDER BY id', engine)['id'].tolist() == [
+        1,
+        3,
+    ]
+    assert db_engine.partition_shadows(engine, 'odds') == []
+
+
+def test_swap_partition_postgresql_attaches(db_engine):
+    """Testa se, no PostgreSQL, a partição antiga é desanexada e a sombra anexada."""
+    engine = MagicMock()
+    engine.dialect = postgresql.dialect()
+    connection = engine.begin.return_value.__enter__.return_value
+    connection.dialect = engine.dialect
+    inspector = MagicMock()
+    inspector.has_table.return_value = True
+    inspector.get_columns.return_value = [{'name': 'day'}, {'name': 'id'}]
+
+    with patch('src.utils.destination.inspect', return_value=inspector):
+        db_engine.swap_partition(
+            engine,
+            'odds',
+            'odds_p202501',
+            'day',
+            pd.Timestamp('2025-01-01', tz='UTC').to_pydatetime(),
+            pd.Timestamp('2025-02-01', tz='UTC').to_pydatetime(),
+            indexes=[{'name': 'odds_idx', 'column_names': ['id']}],
+        )
+
+    statements = [
+        str(call.args[0]) for call in connection.execute.call_args_list
+    ]
+    assert statements[0].startswith('ALTER TABLE odds_p202501__shadow ADD CONSTRAINT')
+    assert statements[1] == (
+        'CREATE INDEX IF NOT EXISTS odds_idx_p202501__shadow '
+        'ON odds_p202501__shadow (id)'
+    )
+    assert statements[2:] == [
+        'ALTER TABLE odds DETACH PARTITION odds_p202501',
+        'DROP TABLE odds_p202501',
+        'ALTER TABLE odds_p202501__shadow RENAME TO odds_p202501',
+        'ALTER INDEX odds_idx_p202501__shadow RENAME TO odds_idx_p202501',
+        "ALTER TABLE odds ATTACH PARTITION odds_p202501 FOR VALUES "
+        "FROM ('2025-01-01T00:00:00+00:00') TO ('2025-02-01T00:00:00+00:00')",
+    ]
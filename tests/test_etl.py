@@ -1,10 +1,13 @@
+import time
+from itertools import count
 from unittest.mock import MagicMock, patch
 
 import pandas as pd
 import pytest
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.utils.etl import ETLProcess
+from src.utils.etl import ETLProcess, _pipelined
 
 
 @pytest.fixture
@@ -15,7 +18,7 @@ def etl_instance():
 
 def test_parsing_json_competition_schedules(etl_instance):
     """Testa parsing_json para a coleção 'competition_schedules'."""
-    etl_instance.read_nosql = MagicMock(return_value=[
+    etl_instance.iter_nosql = MagicMock(return_value=[
         {'schedules': [{'sport_event': {'id': '123', 'status': 'ended'}}]}
     ])
 
@@ -25,13 +28,339 @@ def test_parsing_json_competition_schedules(etl_instance):
 
 def test_parsing_json_default_collection(etl_instance):
     """Testa parsing_json para uma coleção genérica sem tratamento específico."""
-    etl_instance.read_nosql = MagicMock(return_value=[
+    etl_instance.iter_nosql = MagicMock(return_value=[
         {'default_key': [{'id': 'abc', 'value': 42}]}
     ])
     result = etl_instance.parsing_json('db', 'other_collection', 'default_key')
     assert result == [{'id': 'abc', 'value': 42}]
 
 
+def test_iter_parsing_json_streams_documents(etl_instance):
+    """Testa se iter_parsing_json gera as linhas sem materializar a coleção."""
+    etl_instance.iter_nosql = MagicMock(return_value=iter([
+        {'sport_event': {'id': 'e1'}, 'markets': [{'id': 'm1'}, {'id': 'm2'}]},
+        {'sport_event': {'id': 'e2'}, 'markets': [{'id': 'm3'}]},
+    ]))
+
+    rows = etl_instance.iter_parsing_json(
+        'db', 'sport_event_markets', 'markets', batch_size=50
+    )
+
+    assert next(rows) == {'id': 'm1', 'sport_event_id': 'e1'}
+    assert list(rows) == [
+        {'id': 'm2', 'sport_event_id': 'e1'},
+        {'id': 'm3', 'sport_event_id': 'e2'},
+    ]
+    etl_instance.iter_nosql.assert_called_once_with(
+        'db', 'sport_event_markets', None, 50, projection=None
+    )
+
+
+def test_parsing_json_outcomes_reads_markets_collection(etl_instance):
+    """Testa se 'outcomes' é lido de 'sport_event_markets' com os ids herdados."""
+    etl_instance.iter_nosql = MagicMock(return_value=[
+        {
+            'sport_event': {'id': 'e1', 'start_time': '2025-01-05T18:00:00Z'},
+            'markets': [
+                {'id': 'm1', 'books': [{'id': 'b1', 'outcomes': [{'odds': '1.5'}]}]}
+            ],
+        }
+    ])
+
+    result = etl_instance.parsing_json('db', 'outcomes', 'markets')
+
+    assert result == [
+        {
+            'odds': '1.5',
+            'sport_event_id': 'e1',
+            'sport_event_start_time': '2025-01-05T18:00:00Z',
+            'market_id': 'm1',
+            'books_id': 'b1',
+        }
+    ]
+    assert etl_instance.iter_nosql.call_args.args[1] == 'sport_event_markets'
+
+
+def test_parsing_json_partitions(etl_instance):
+    """Testa se a leitura por faixas concatena as linhas na ordem das faixas."""
+    documents = {
+        'low': [{'sports': [{'id': 1}, {'id': 2}]}],
+        'high': [{'sports': [{'id': 3}]}],
+    }
+    etl_instance.id_partitions = MagicMock(return_value=['low', 'high'])
+    etl_instance.iter_nosql = MagicMock(
+        side_effect=lambda db, collection, query, *args, **kwargs: iter(
+            documents[query]
+        )
+    )
+
+    result = etl_instance.parsing_json('db', 'sports', 'sports', partitions=2)
+
+    assert result == [{'id': 1}, {'id': 2}, {'id': 3}]
+    etl_instance.id_partitions.assert_called_once_with('db', 'sports', 2, None)
+
+
+MARKETS_DOCUMENT = {
+    'sport_event': {'id': 'e1', 'start_time': '2025-01-05T18:00:00Z'},
+    'markets': [{'id': 'm1', 'books': [{'id': 'b1', 'outcomes': [{'odds': '1.5'}]}]}],
+}
+
+
+def test_parsing_json_fanout_single_read(etl_instance):
+    """Testa se markets e outcomes saem de uma única leitura da origem."""
+    etl_instance.iter_nosql = MagicMock(return_value=iter([MARKETS_DOCUMENT]))
+
+    rows = etl_instance.parsing_json_fanout(
+        'db', {'sport_event_markets': 'markets', 'outcomes': 'markets'}
+    )
+
+    etl_instance.iter_nosql.assert_called_once()
+    assert etl_instance.iter_nosql.call_args.args[1] == 'sport_event_markets'
+    assert [row['id'] for row in rows['sport_event_markets']] == ['m1']
+    assert rows['outcomes'] == [
+        {
+            'odds': '1.5',
+            'sport_event_id': 'e1',
+            'sport_event_start_time': '2025-01-05T18:00:00Z',
+            'market_id': 'm1',
+            'books_id': 'b1',
+        }
+    ]
+
+
+def test_parsing_json_fanout_different_sources(etl_instance):
+    """Testa se coleções com origens diferentes são rejeitadas."""
+    with pytest.raises(ValueError, match='não compartilham a mesma'):
+        etl_instance.parsing_json_fanout(
+            'db', {'outcomes': 'markets', 'player_props_books': 'books'}
+        )
+
+
+def test_load_chunked_fanout_loads_each_table(etl_instance):
+    """Testa se cada tabela derivada é carregada de forma independente."""
+    etl_instance.iter_nosql = MagicMock(return_value=iter([MARKETS_DOCUMENT]))
+    etl_instance.load_to_destination = MagicMock()
+    etl_instance.swap_shadow_table = MagicMock()
+
+    loaded = etl_instance.load_chunked_fanout(
+        MagicMock(),
+        'db',
+        {
+            'sport_event_markets': ('markets', 'sport_event_markets'),
+            'outcomes': ('markets', 'sport_event_markets_outcomes'),
+        },
+    )
+
+    assert loaded == {'sport_event_markets': 1, 'outcomes': 1}
+    tables = [
+        call.args[2] for call in etl_instance.load_to_destination.call_args_list
+    ]
+    assert tables == ['sport_event_markets', 'sport_event_markets_outcomes']
+
+
+def test_transform_tables_normalizes_children():
+    """Testa se as listas declaradas viram tabelas filhas, sem repetir o pai."""
+    etl = ETLProcess(uri='mongodb://fake_uri', normalize=True)
+    document = {
+        'sport_event': {'id': 'e1'},
+        'markets': [{'id': 'm1', 'books': [
+            {'id': 'b1', 'outcomes': [{'odds': '1.5'}]},
+            {'id': 'b2', 'outcomes': []},
+        ]}],
+    }
+    rows = etl._flatten_document(document, 'sport_event_markets', 'markets')
+
+    frames = etl.transform_tables(
+        rows, 'sport_event_markets', 'markets', 'sport_event_markets'
+    )
+
+    assert list(frames) == [
+        'sport_event_markets',
+        'sport_event_markets_books',
+        'sport_event_markets_books_outcomes',
+    ]
+    assert frames['sport_event_markets'].to_dict('records') == [
+        {'id': 'm1', 'sport_event_id': 'e1'}
+    ]
+    assert frames['sport_event_markets_books'].to_dict('records') == [
+        {'id': 'b1', 'sport_event_id': 'e1', 'market_id': 'm1'},
+        {'id': 'b2', 'sport_event_id': 'e1', 'market_id': 'm1'},
+    ]
+    assert frames['sport_event_markets_books_outcomes'].to_dict('records') == [
+        {'odds': '1.5', 'sport_event_id': 'e1', 'market_id': 'm1', 'book_id': 'b1'}
+    ]
+
+
+def test_transform_tables_without_normalize(etl_instance):
+    """Testa se, sem normalize, a saída é a mesma do transform_to_df."""
+    rows = etl_instance._flatten_document(
+        MARKETS_DOCUMENT, 'sport_event_markets', 'markets'
+    )
+
+    frames = etl_instance.transform_tables(
+        rows, 'sport_event_markets', 'markets', 'sport_event_markets'
+    )
+
+    assert list(frames) == ['sport_event_markets']
+    assert list(frames['sport_event_markets'].columns) == [
+        'id', 'sport_event_id', 'books_id'
+    ]
+
+
+def test_load_chunked_normalized_writes_child_tables():
+    """Testa se a carga em blocos grava e finaliza cada tabela filha."""
+    etl = ETLProcess(uri='mongodb://fake_uri', normalize=True)
+    etl.iter_nosql = MagicMock(return_value=iter([
+        {'_id': 1, **MARKETS_DOCUMENT},
+        {
+            '_id': 2,
+            'sport_event': {'id': 'e2'},
+            'markets': [{'id': 'm2', 'books': [{'id': 'b3'}]}],
+        },
+    ]))
+    engine = create_engine('sqlite://')
+
+    total = etl.load_chunked(
+        engine,
+        'db',
+        'sport_event_markets',
+        'markets',
+        'sport_event_markets',
+        chunk_size=1,
+    )
+
+    assert total == 5
+    books = pd.read_sql(
+        'SELECT sport_event_id, market_id, id FROM sport_event_markets_books',
+        engine,
+    )
+    assert books.values.tolist() == [['e1', 'm1', 'b1'], ['e2', 'm2', 'b3']]
+    outcomes = pd.read_sql(
+        'SELECT book_id, odds FROM sport_event_markets_books_outcomes', engine
+    )
+    assert outcomes.values.tolist() == [['b1', '1.5']]
+    assert [
+        index['name']
+        for index in inspect(engine).get_indexes('sport_event_markets_books')
+    ] == ['markets_books_market_idx']
+
+
+def test_load_chunked_pipelined_matches_sequential():
+    """Testa se a carga com etapas em threads grava o mesmo que a sequencial."""
+    documents = [{'_id': i, 'sports': [{'id': i}]} for i in range(7)]
+    results = []
+    for depth in (0, 2):
+        etl = ETLProcess(uri='mongodb://fake_uri', pipeline_depth=depth)
+        etl.iter_nosql = MagicMock(return_value=iter(documents))
+        engine = create_engine('sqlite://')
+
+        total = etl.load_chunked(
+            engine, 'db', 'sports', 'sports', 'sports', chunk_size=3
+        )
+
+        results.append(
+            (total, pd.read_sql('SELECT id FROM sports', engine)['id'].tolist())
+        )
+
+    assert results[0] == results[1] == (7, list(range(7)))
+
+
+def test_pipelined_propagates_errors_and_backpressure():
+    """Testa se a fila limita o avanço da etapa anterior e repassa as exceções."""
+    produced = []
+
+    def source():
+        for item in range(10):
+            produced.append(item)
+            yield item
+        raise RuntimeError('falha na leitura')
+
+    items = _pipelined(source(), depth=2)
+    assert next(items) == 0
+    # Um item entregue, dois na fila e um aguardando espaço
+    time.sleep(0.2)
+    assert len(produced) <= 4
+
+    with pytest.raises(RuntimeError, match='falha na leitura'):
+        list(items)
+
+
+def test_pipelined_stops_when_consumer_gives_up():
+    """Testa se a thread da etapa é encerrada quando o consumidor para antes do fim."""
+    items = _pipelined(count(), depth=1)
+    assert next(items) == 0
+    items.close()
+
+
+def test_iter_parsing_json_projection(etl_instance):
+    """Testa se apenas os campos usados no achatamento são pedidos ao MongoDB."""
+    etl_instance.pushdown = 'projection'
+    etl_instance.iter_nosql = MagicMock(return_value=iter([MARKETS_DOCUMENT]))
+
+    rows = list(etl_instance.iter_parsing_json('db', 'outcomes', 'markets'))
+
+    assert len(rows) == 1
+    assert etl_instance.iter_nosql.call_args.kwargs['projection'] == {
+        'markets.books.id': 1,
+        'markets.books.outcomes': 1,
+        'markets.id': 1,
+        'sport_event.id': 1,
+        'sport_event.start_time': 1,
+    }
+
+
+def test_iter_parsing_json_aggregate(etl_instance):
+    """Testa se o achatamento é delegado ao MongoDB no modo aggregate."""
+    etl_instance.pushdown = 'aggregate'
+    etl_instance.iter_aggregate = MagicMock(return_value=iter([{'odds': '1.5'}]))
+    etl_instance.iter_nosql = MagicMock()
+
+    rows = list(
+        etl_instance.iter_parsing_json('db', 'outcomes', 'markets', {'x': 1})
+    )
+
+    assert rows == [{'odds': '1.5'}]
+    etl_instance.iter_nosql.assert_not_called()
+    db, source, pipeline, _ = etl_instance.iter_aggregate.call_args.args
+    assert source == 'sport_event_markets'
+    assert pipeline[0] == {'$match': {'x': 1}}
+    assert [stage['$unwind'] for stage in pipeline if '$unwind' in stage] == [
+        '$markets',
+        '$markets.books',
+        '$markets.books.outcomes',
+    ]
+
+
+def test_fanout_and_chunked_reject_aggregate_pushdown(etl_instance):
+    """Testa se leituras de documentos inteiros recusam o pushdown aggregate."""
+    etl_instance.pushdown = 'aggregate'
+    etl_instance.iter_nosql = MagicMock()
+    engine = MagicMock()
+
+    with pytest.raises(ValueError, match='pushdown "aggregate"'):
+        etl_instance.parsing_json_fanout('db', {'outcomes': 'markets'})
+    with pytest.raises(ValueError, match='pushdown "aggregate"'):
+        etl_instance.load_chunked(engine, 'db', 'sports', 'sports', 'sports')
+
+    etl_instance.iter_nosql.assert_not_called()
+    engine.assert_not_called()
+
+
+def test_load_chunked_projection_includes_sort_field(etl_instance):
+    """Testa se o campo da ordenação entra na projeção da carga em blocos."""
+    etl_instance.pushdown = 'projection'
+    etl_instance.iter_nosql = MagicMock(return_value=iter([]))
+
+    etl_instance.load_chunked(
+        MagicMock(), 'db', 'sports', 'sports', 'sports', sort=[('updated_at', 1)]
+    )
+
+    assert etl_instance.iter_nosql.call_args.kwargs['projection'] == {
+        'sports': 1,
+        'updated_at': 1,
+    }
+
+
 def test_transform_to_df_simple(etl_instance):
     """Testa transformação simples em DataFrame."""
     data = [{'id': 1, 'name': 'Sport A'}, {'id': 2, 'name': 'Sport B'}]
@@ -40,6 +369,20 @@ def test_transform_to_df_simple(etl_instance):
     assert df.shape == (2, 2)
 
 
+def test_iter_parsing_json_records_metrics(etl_instance):
+    """Testa se leitura, achatamento e transformação são medidos por coleção."""
+    etl_instance.iter_nosql = MagicMock(return_value=iter([MARKETS_DOCUMENT]))
+
+    rows = list(etl_instance.iter_parsing_json('db', 'outcomes', 'markets'))
+    etl_instance.transform_to_df(rows, 'outcomes')
+
+    stages = etl_instance.metrics.stages
+    assert stages[('outcomes', 'extract')]['documents'] == 1
+    assert stages[('outcomes', 'extract')]['bytes'] > 0
+    assert stages[('outcomes', 'flatten')]['rows'] == 1
+    assert stages[('outcomes', 'transform')]['rows'] == 1
+
+
 def test_transform_to_df_with_nested_dict(etl_instance):
     """Testa normalização de dicionário aninhado."""
     data = [{'id': 1, 'info': {'a': 10}}, {'id': 2, 'info': {'a': 20}}]
@@ -56,12 +399,60 @@ def test_transform_to_df_with_nested_list(etl_instance):
     assert df.shape == (2, 2)
 
 
+def test_transform_to_df_multiple_lists(etl_instance):
+    """Testa se várias listas são explodidas em sequência, como no explode."""
+    data = [
+        {'id': 1, 'a': [{'x': 1}, {'x': 2}], 'b': [{'y': 1}], 'c': {'z': 1}},
+        {'id': 2, 'a': [], 'b': [{'y': 2}, {'y': 3}], 'c': {'z': 2}},
+    ]
+    df = etl_instance.transform_to_df(data, 'default')
+    assert list(df.columns) == ['id', 'a_x', 'b_y', 'c_z']
+    assert df['id'].tolist() == [1, 1, 2, 2]
+    assert df['b_y'].tolist() == [1, 1, 2, 3]
+    assert df['c_z'].tolist() == [1, 1, 2, 2]
+
+
+def test_transform_to_df_declared_schema(etl_instance):
+    """Testa se o esquema declarado dispensa a inferência das colunas."""
+    etl_instance._infer_nested_columns = MagicMock()
+    data = [{'id': 1, 'info': {'a': 10}, 'tags': ['x', 'y']}]
+    df = etl_instance.transform_to_df(
+        data, 'default', nested_columns={'info': 'dict', 'tags': 'list'}
+    )
+    etl_instance._infer_nested_columns.assert_not_called()
+    assert list(df.columns) == ['id', 'info_a', 'tags']
+    assert df['tags'].tolist() == ['x', 'y']
+
+
+def test_transform_to_df_drops_nested_books(etl_instance):
+    """Testa se 'books_outcomes' é descartado em sport_event_markets."""
+    data = [{'id': 'm1', 'books': [{'id': 'b1', 'outcomes': [{'odds': 1}]}]}]
+    df = etl_instance.transform_to_df(data, 'sport_event_markets')
+    assert list(df.columns) == ['id', 'books_id']
+
+
 @patch('pandas.DataFrame.to_sql')
 def test_load_to_destination_success(mock_to_sql, etl_instance):
     df = pd.DataFrame({'id': [1, 2]})
     engine = MagicMock()
+    etl_instance.create_shadow_table = MagicMock()
+    etl_instance.swap_shadow_table = MagicMock()
     etl_instance.load_to_destination(engine, df, 'sports')
     mock_to_sql.assert_called_once()
+    assert mock_to_sql.call_args.kwargs['name'] == 'sports__shadow'
+    etl_instance.swap_shadow_table.assert_called_once_with(
+        engine, 'sports', unlogged=False, indexes=[]
+    )
+
+
+@patch('pandas.DataFrame.to_sql')
+def test_load_to_destination_copy_method(mock_to_sql):
+    etl = ETLProcess(uri='mongodb://fake_uri', load_method='copy')
+    etl.create_shadow_table = MagicMock()
+    etl.swap_shadow_table = MagicMock()
+    df = pd.DataFrame({'id': [1, 2]})
+    etl.load_to_destination(MagicMock(), df, 'sports')
+    assert mock_to_sql.call_args.kwargs['method'] == etl.copy_insert
 
 
 @patch('pandas.DataFrame.to_sql')
@@ -76,5 +467,574 @@ def test_load_to_destination_empty_df(mock_to_sql, etl_instance):
 def test_load_to_destination_error(mock_to_sql, etl_instance):
     df = pd.DataFrame({'id': [1]})
     engine = MagicMock()
+    etl_instance.create_shadow_table = MagicMock()
     with pytest.raises(RuntimeError, match="Erro ao inserir dados na tabela 'sports'"):
         etl_instance.load_to_destination(engine, df, 'sports')
+
+
+def test_load_chunked_replaces_then_appends(etl_instance):
+    """Testa se o primeiro bloco usa replace e os seguintes append."""
+    etl_instance.iter_nosql = MagicMock(return_value=iter([
+        {'sports': [{'id': 1}]},
+        {'sports': [{'id': 2, 'name': 'B'}]},
+        {'sports': [{'id': 3}]},
+    ]))
+    etl_instance.load_to_destination = MagicMock()
+    etl_instance.add_missing_columns = MagicMock()
+    etl_instance.swap_shadow_table = MagicMock()
+    engine = MagicMock()
+
+    total = etl_instance.load_chunked(
+        engine, 'db', 'sports', 'sports', 'sports', chunk_size=2
+    )
+
+    assert total == 3
+    modes = [
+        call.kwargs['write_mode']
+        for call in etl_instance.load_to_destination.call_args_list
+    ]
+    assert modes == ['replace', 'append']
+    assert all(
+        call.kwargs['shadow']
+        for call in etl_instance.load_to_destination.call_args_list
+    )
+    first_df = etl_instance.load_to_destination.call_args_list[0].args[1]
+    assert list(first_df.columns) == ['id', 'name']
+    assert etl_instance.add_missing_columns.call_args.args[2] == 'sports__shadow'
+    etl_instance.swap_shadow_table.assert_called_once_with(
+        engine, 'sports', unlogged=False, indexes=[]
+    )
+
+
+def test_load_to_destination_replace_swaps_shadow(etl_instance):
+    """Testa se o replace troca a tabela pela sombra mantendo os índices."""
+    engine = create_engine('sqlite://')
+    etl_instance.load_to_destination(engine, pd.DataFrame({'id': [1, 2]}), 'sports')
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE UNIQUE INDEX sports_id ON sports (id)')
+
+    etl_instance.load_to_destination(engine, pd.DataFrame({'id': [3]}), 'sports')
+
+    assert pd.read_sql('SELECT id FROM sports', engine)['id'].tolist() == [3]
+    assert inspect(engine).get_table_names() == ['sports']
+    assert [index['name'] for index in inspect(engine).get_indexes('sports')] == [
+        'sports_id'
+    ]
+
+
+def test_load_to_destination_creates_declared_indexes():
+    """Testa se os índices declarados são criados após a carga, e só uma vez."""
+    etl = ETLProcess(
+        uri='mongodb://fake_uri',
+        write_mode='append',
+        table_indexes={'markets': {'markets_event_idx': ('sport_event_id',)}},
+    )
+    engine = create_engine('sqlite://')
+    df = pd.DataFrame({'sport_event_id': ['e1'], 'id': ['m1']})
+
+    etl.load_to_destination(engine, df, 'markets')
+    etl.load_to_destination(engine, df, 'markets')
+
+    indexes = inspect(engine).get_indexes('markets')
+    assert [index['name'] for index in indexes] == ['markets_event_idx']
+    assert indexes[0]['column_names'] == ['sport_event_id']
+
+
+def test_load_to_destination_diff_writes_only_changes():
+    """Testa se o modo diff grava só as linhas novas, alteradas ou removidas."""
+    etl = ETLProcess(
+        uri='mongodb://fake_uri', write_mode='diff', upsert_keys={'odds': ('id',)}
+    )
+    engine = create_engine('sqlite://')
+    etl.load_to_destination(
+        engine, pd.DataFrame({'id': ['a', 'b', 'c'], 'odds': [1.5, 2.0, 3.0]}), 'odds'
+    )
+
+    etl.load_to_destination(
+        engine, pd.DataFrame({'id': ['a', 'b', 'd'], 'odds': [1.5, 2.5, 4.0]}), 'odds'
+    )
+
+    result = pd.read_sql('SELECT id, odds FROM odds ORDER BY id', engine)
+    assert result.values.tolist() == [['a', 1.5], ['b', 2.5], ['d', 4.0]]
+    stages = {
+        (entry['target'], entry['stage']): entry['rows']
+        for entry in etl.metrics.report()['stages']
+    }
+    # 3 linhas na primeira carga e 2 (b alterada, d nova) na segunda
+    assert stages[('odds', 'diff')] == 5
+    assert stages[('odds', 'delete')] == 1
+
+
+def test_load_chunked_diff_deletes_only_on_full_read():
+    """Testa se, em blocos, as linhas removidas só são apagadas na leitura completa."""
+    etl = ETLProcess(
+        uri='mongodb://fake_uri', write_mode='diff', upsert_keys={'sports': ('id',)}
+    )
+    engine = create_engine('sqlite://')
+    pd.DataFrame({'id': [1, 2, 3]}).to_sql('sports', engine, index=False)
+
+    etl.iter_nosql = MagicMock(return_value=iter([{'_id': 1, 'sports': [{'id': 1}]}]))
+    etl.load_chunked(
+        engine, 'db', 'sports', 'sports', 'sports', query={'_id': {'$gt': 0}}
+    )
+    assert pd.read_sql('SELECT id FROM sports', engine)['id'].tolist() == [1, 2, 3]
+
+    etl.iter_nosql = MagicMock(return_value=iter([
+        {'_id': 1, 'sports': [{'id': 1}]},
+        {'_id': 2, 'sports': [{'id': 2}]},
+    ]))
+    total = etl.load_chunked(engine, 'db', 'sports', 'sports', 'sports', chunk_size=1)
+
+    assert total == 2
+    assert pd.read_sql('SELECT id FROM sports', engine)['id'].tolist() == [1, 2]
+
+
+def test_load_to_destination_partition_replaces_only_loaded_partitions():
+    """Testa se o modo "partition" reconstrói só as partições com linhas na carga."""
+    etl = ETLProcess(uri='mongodb://fake_uri', write_mode='partition')
+    engine = create_engine('sqlite://')
+    etl.load_to_destination(
+        engine,
+        pd.DataFrame({
+            'id': ['e1', 'e2'],
+            'start_time': ['2025-01-05T18:00:00Z', '2025-02-10T18:00:00Z'],
+        }),
+        'schedules',
+    )
+
+    etl.load_to_destination(
+        engine,
+        pd.DataFrame({'id': ['e3'], 'start_time': ['2025-02-11T18:00:00Z']}),
+        'schedules',
+    )
+
+    ids = pd.read_sql('SELECT id FROM schedules ORDER BY id', engine)['id']
+    assert ids.tolist() == ['e1', 'e3']
+    assert inspect(engine).get_table_names() == ['schedules']
+
+
+def test_load_to_destination_partition_requires_declaration(etl_instance):
+    """Testa se o modo "partition" exige o particionamento da tabela."""
+    with pytest.raises(ValueError, match='sem particionamento'):
+        etl_instance.load_to_destination(
+            MagicMock(), pd.DataFrame({'id': [1]}), 'sports', write_mode='partition'
+        )
+
+
+def test_load_chunked_partition_by_event_date():
+    """Testa se os blocos se somam na partição e só as partições carregadas mudam."""
+    etl = ETLProcess(
+        uri='mongodb://fake_uri',
+        write_mode='partition',
+        table_partitions={'sports': {'column': 'day', 'interval': 'day'}},
+    )
+    engine = create_engine('sqlite://')
+    documents = [
+        {'_id': i, 'sports': [{'id': i, 'day': f'2025-01-0{i // 2 + 1}T18:00:00Z'}]}
+        for i in range(4)
+    ]
+
+    etl.iter_nosql = MagicMock(return_value=iter(documents))
+    etl.load_chunked(engine, 'db', 'sports', 'sports', 'sports', chunk_size=1)
+    # Recarrega só o dia 2, que agora tem um único evento
+    etl.iter_nosql = MagicMock(return_value=iter(documents[3:]))
+    etl.load_chunked(engine, 'db', 'sports', 'sports', 'sports', chunk_size=1)
+
+    ids = pd.read_sql('SELECT id FROM sports ORDER BY id', engine)['id']
+    assert ids.tolist() == [0, 1, 3]
+    assert inspect(engine).get_table_names() == ['sports']
+
+
+def test_load_incremental_rejects_partition_mode():
+    """Testa se a carga incremental recusa o modo "partition"."""
+    etl = ETLProcess(uri='mongodb://fake_uri', write_mode='partition')
+    with pytest.raises(ValueError, match='não suporta o modo de escrita "partition"'):
+        etl.load_incremental(
+            MagicMock(), 'db', 'outcomes', 'markets', 'sport_event_markets_outcomes'
+        )
+
+
+def test_upsert_and_diff_on_partitioned_table_key_on_partition_column():
+    """Testa se "upsert" e "diff" incluem a coluna de partição na chave da tabela."""
+    engine = create_engine('sqlite://')
+    schedules = pd.DataFrame({
+        'id': ['e1', 'e2'],
+        'start_time': ['2025-01-05T18:00:00Z', '2025-02-10T18:00:00Z'],
+        'status': ['scheduled', 'scheduled'],
+    })
+    ETLProcess(uri='mongodb://fake_uri', write_mode='partition').load_to_destination(
+        engine, schedules, 'schedules'
+    )
+
+    for write_mode in ('upsert', 'diff'):
+        etl = ETLProcess(
+            uri='mongodb://fake_uri',
+            write_mode=write_mode,
+            upsert_keys={'schedules': ('id',)},
+        )
+        assert etl.table_keys('schedules') == ('id', 'start_time')
+        etl.load_to_destination(engine, schedules.assign(status=write_mode), 'schedules')
+
+    [index] = inspect(engine).get_indexes('schedules')
+    assert index['column_names'] == ['id', 'start_time']
+    statuses = pd.read_sql('SELECT status FROM schedules', engine)['status']
+    assert statuses.tolist() == ['diff', 'diff']
+
+
+def test_load_incremental_uses_watermark(etl_instance):
+    """Testa se a carga incremental filtra pela marca d'água e a atualiza."""
+    etl_instance.iter_nosql = MagicMock(return_value=iter([
+        {'_id': 11, 'sports': [{'id': 'a'}]},
+        {'_id': 12, 'sports': [{'id': 'b'}]},
+    ]))
+    etl_instance.load_to_destination = MagicMock()
+    etl_instance.add_missing_columns = MagicMock()
+    state = MagicMock()
+    state.get_watermark.return_value = 10
+    engine = MagicMock()
+
+    total = etl_instance.load_incremental(
+        engine, 'db', 'sports', 'sports', 'sports', state=state
+    )
+
+    assert total == 2
+    args = etl_instance.iter_nosql.call_args.args
+    assert args[2] == {'_id': {'$gt': 10}}
+    assert args[4] == [('_id', 1)]
+    assert etl_instance.load_to_destination.call_args.kwargs['write_mode'] == 'append'
+    # A marca d'água é gravada na mesma transação do bloco
+    state.set_watermark.assert_called_once_with(
+        'sports', '_id', 12, connection=engine.begin.return_value.__enter__.return_value
+    )
+
+
+def test_load_incremental_first_run(etl_instance):
+    """Testa se, sem marca d'água salva, a coleção é lida por completo."""
+    etl_instance.iter_nosql = MagicMock(return_value=iter([]))
+    state = MagicMock()
+    state.get_watermark.return_value = None
+
+    total = etl_instance.load_incremental(
+        MagicMock(), 'db', 'sports', 'sports', 'sports', state=state
+    )
+
+    assert total == 0
+    assert etl_instance.iter_nosql.call_args.args[2] == {}
+    state.set_watermark.assert_not_called()
+
+
+def test_load_incremental_first_run_saves_watermark_after_swap(etl_instance):
+    """Testa se uma primeira carga em "replace" interrompida não avança a marca d'água."""
+    from src.utils.state import SyncStateStore
+
+    documents = [{'_id': i, 'sports': [{'id': i}]} for i in range(4)]
+    engine = create_engine('sqlite://')
+    state = SyncStateStore(engine)
+    load_to_destination = etl_instance.load_to_destination
+    calls = count(1)
+
+    def failing_load(*args, **kwargs):
+        if next(calls) == 3:
+            raise RuntimeError('falha na carga')
+        return load_to_destination(*args, **kwargs)
+
+    etl_instance.iter_nosql = MagicMock(return_value=iter(documents))
+    etl_instance.load_to_destination = failing_load
+    with pytest.raises(RuntimeError, match='falha na carga'):
+        etl_instance.load_incremental(
+            engine, 'db', 'sports', 'sports', 'sports', chunk_size=1, state=state
+        )
+    assert state.get_watermark('sports', '_id') is None
+
+    etl_instance.iter_nosql = MagicMock(return_value=iter(documents))
+    etl_instance.load_to_destination = load_to_destination
+    total = etl_instance.load_incremental(
+        engine, 'db', 'sports', 'sports', 'sports', chunk_size=1, state=state
+    )
+
+    assert total == 4
+    assert etl_instance.iter_nosql.call_args.args[2] == {}
+    assert pd.read_sql('SELECT id FROM sports', engine)['id'].tolist() == [0, 1, 2, 3]
+    assert inspect(engine).get_table_names() == ['etl_sync_state', 'sports']
+    assert state.get_watermark('sports', '_id') == 3
+
+
+def test_load_resumable_resumes_after_failure(etl_instance):
+    """Testa se a carga retomada continua do último bloco confirmado."""
+    from src.utils.state import CheckpointStore
+
+    documents = [{'_id': i, 'sports': [{'id': i}]} for i in range(1, 6)]
+    engine = create_engine('sqlite://')
+    checkpoints = CheckpointStore(engine)
+
+    def failing_cursor():
+        yield from documents[:3]
+        raise RuntimeError('cursor perdido')
+
+    etl_instance.iter_nosql = MagicMock(return_value=failing_cursor())
+    with pytest.raises(RuntimeError, match='cursor perdido'):
+        etl_instance.load_resumable(
+            engine, 'db', 'sports', 'sports', 'sports',
+            chunk_size=2, checkpoints=checkpoints,
+        )
+
+    assert checkpoints.get('sports') == {
+        'table': 'sports', 'last_id': 2, 'chunks': 1, 'rows': 2
+    }
+    assert not inspect(engine).has_table('sports')
+
+    etl_instance.iter_nosql = MagicMock(return_value=iter(documents[2:]))
+    total = etl_instance.load_resumable(
+        engine, 'db', 'sports', 'sports', 'sports',
+        chunk_size=2, checkpoints=checkpoints, resume=True,
+    )
+
+    assert total == 5
+    args = etl_instance.iter_nosql.call_args.args
+    assert args[2] == {'_id': {'$gt': 2}}
+    assert args[4] == [('_id', 1)]
+    assert pd.read_sql('SELECT id FROM sports', engine)['id'].tolist() == [1, 2, 3, 4, 5]
+    assert inspect(engine).get_table_names() == ['etl_checkpoints', 'sports']
+    assert checkpoints.get('sports') is None
+
+
+def test_load_resumable_restarts_without_shadow(etl_instance):
+    """Testa se, sem a tabela de sombra, a carga recomeça do zero."""
+    checkpoints = MagicMock()
+    checkpoints.get.return_value = {
+        'table': 'sports', 'last_id': 2, 'chunks': 1, 'rows': 2
+    }
+    etl_instance.iter_nosql = MagicMock(return_value=iter([]))
+
+    total = etl_instance.load_resumable(
+        create_engine('sqlite://'), 'db', 'sports', 'sports', 'sports',
+        checkpoints=checkpoints, resume=True,
+    )
+
+    assert total == 0
+    assert etl_instance.iter_nosql.call_args.args[2] == {}
+    checkpoints.clear.assert_called_once_with('sports')
+
+
+class FakeChangeStream:
+    """Change stream em memória, no lugar de um replica set do MongoDB."""
+
+    def __init__(self, changes, stop):
+        self.changes = list(changes)
+        self.stop = stop
+        self.resume_token = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def try_next(self):
+        if not self.changes:
+            self.stop.set()
+            return None
+        change = self.changes.pop(0)
+        self.resume_token = change['_id']
+        return change
+
+
+def _change(token, document, collection='sports'):
+    return {
+        '_id': {'_data': token},
+        'operationType': 'update',
+        'ns': {'db': 'db', 'coll': collection},
+        'fullDocument': document,
+    }
+
+
+def test_sync_changes_upserts_latest_documents():
+    """Testa se as alterações são mescladas e o resume token é salvo com elas."""
+    from threading import Event
+
+    from src.utils.state import SyncStateStore
+
+    etl = ETLProcess(uri='mongodb://fake_uri', upsert_keys={'sports': ('id',)})
+    engine = create_engine('sqlite://')
+    state = SyncStateStore(engine)
+    stop = Event()
+    etl.watch_changes = MagicMock(
+        return_value=FakeChangeStream(
+            [
+                _change('1', {'_id': 1, 'sports': [{'id': 1, 'name': 'A'}]}),
+                _change('2', {'_id': 2, 'sports': [{'id': 2, 'name': 'B'}]}),
+                _change('3', {'_id': 1, 'sports': [{'id': 1, 'name': 'A2'}]}),
+            ],
+            stop,
+        )
+    )
+
+    loaded = etl.sync_changes(
+        engine, 'db', {'sports': ('sports', 'sports')}, flush_size=2,
+        state=state, stop=stop,
+    )
+
+    assert loaded == {'sports': 3}
+    result = pd.read_sql('SELECT id, name FROM sports ORDER BY id', engine)
+    assert result['name'].tolist() == ['A2', 'B']
+    assert state.get_watermark('db.change_stream', 'resume_token') == {'_data': '3'}
+    assert etl.watch_changes.call_args.kwargs['resume_after'] is None
+
+    # Uma nova execução continua do token salvo
+    stop.clear()
+    etl.watch_changes = MagicMock(return_value=FakeChangeStream([], stop))
+    etl.sync_changes(
+        engine, 'db', {'sports': ('sports', 'sports')}, state=state, stop=stop
+    )
+    assert etl.watch_changes.call_args.kwargs['resume_after'] == {'_data': '3'}
+
+
+def test_sync_changes_requires_upsert_keys(etl_instance):
+    """Testa se tabelas sem chave de upsert são rejeitadas antes de abrir o stream."""
+    etl_instance.watch_changes = MagicMock()
+    with pytest.raises(ValueError, match='sem chave configurada'):
+        etl_instance.sync_changes(
+            MagicMock(), 'db', {'sports': ('sports', 'sports')}, state=MagicMock()
+        )
+    etl_instance.watch_changes.assert_not_called()
+
+
+@patch('src.utils.etl.ETLProcess.upsert_dataframe')
+def test_load_to_destination_upsert(mock_upsert):
+    etl = ETLProcess(
+        uri='mongodb://fake_uri', write_mode='upsert', upsert_keys={'sports': ('id',)}
+    )
+    df = pd.DataFrame({'id': [1]})
+    engine = MagicMock()
+    etl.load_to_destination(engine, df, 'sports')
+    mock_upsert.assert_called_once_with(
+        engine, df, 'sports', ('id',), method=None, dtype={}
+    )
+
+
+def test_load_to_destination_applies_schema():
+    """Testa se a tabela é criada com os tipos declarados no esquema."""
+    etl_instance = ETLProcess(
+        uri='mongodb://fake_uri',
+        table_schemas={'odds': {'id': 'category', 'odds_decimal': 'float32'}},
+    )
+    engine = create_engine('sqlite://')
+    df = pd.DataFrame(
+        {'id': ['b1', 'b1'], 'odds_decimal': ['1.5', 'x'], 'other': [1, 2]}
+    )
+
+    etl_instance.load_to_destination(engine, df, 'odds')
+
+    columns = {
+        column['name']: str(column['type'])
+        for column in inspect(engine).get_columns('odds')
+    }
+    assert columns['odds_decimal'] == 'REAL'
+    assert pd.read_sql('SELECT odds_decimal FROM odds', engine)[
+        'odds_decimal'
+    ].tolist()[0] == 1.5
+
+
+def test_load_to_destination_upsert_without_key(etl_instance):
+    df = pd.DataFrame({'id': [1]})
+    with pytest.raises(ValueError, match="Tabela 'books' sem chave"):
+        etl_instance.load_to_destination(MagicMock(), df, 'books', write_mode='upsert')
+
+
+def test_transform_arrow_matches_transform_to_df(etl_instance):
+    """Testa se o caminho Arrow gera as mesmas colunas e valores do pandas."""
+    pa = pytest.importorskip('pyarrow')
+    rows = [
+        {'id': 1, 'sport': {'id': 'sr:1', 'name': 'Soccer'}, 'books': [{'id': 'b1'}, {'id': 'b2'}]},
+        {'id': 2, 'sport': {'id': 'sr:2', 'name': 'Tennis'}, 'books': []},
+    ]
+
+    result = etl_instance.transform_arrow(pa.Table.from_pylist(rows), 'sports')
+    expected = etl_instance.transform_to_df(rows, 'sports')
+
+    assert result.column_names == list(expected.columns)
+    assert result.to_pydict()['books_id'] == ['b1', 'b2', None]
+    assert result.to_pydict()['sport_name'] == ['Soccer', 'Soccer', 'Tennis']
+
+
+def test_load_arrow_uses_copy(etl_instance):
+    """Testa se, com COPY, as faixas vão direto para o copy_arrow."""
+    pa = pytest.importorskip('pyarrow')
+    etl_instance.load_method = 'copy'
+    etl_instance.iter_arrow_tables = MagicMock(
+        return_value=iter(
+            [pa.table({'id': [1, 2]}), pa.table({'id': []}), pa.table({'id': [3]})]
+        )
+    )
+    etl_instance.copy_arrow = MagicMock()
+    etl_instance.create_shadow_table = MagicMock()
+    etl_instance.swap_shadow_table = MagicMock()
+    etl_instance.add_missing_columns = MagicMock()
+
+    total = etl_instance.load_arrow(MagicMock(), 'db', 'sports', 'sports', 'sports')
+
+    assert total == 3
+    tables = [call.args[2] for call in etl_instance.copy_arrow.call_args_list]
+    assert tables == ['sports__shadow', 'sports__shadow']
+    etl_instance.create_shadow_table.assert_called_once()
+    etl_instance.swap_shadow_table.assert_called_once()
+    etl_instance.add_missing_columns.assert_called_once()
+
+
+def test_stage_and_load_staged(etl_instance, tmp_path):
+    """Testa se a carga a partir do staging dispensa uma nova leitura do MongoDB."""
+    pytest.importorskip('pyarrow')
+    from src.utils.staging import StagingArea
+
+    staging = StagingArea(str(tmp_path), 'arrow')
+    etl_instance.iter_nosql = MagicMock(return_value=iter([
+        {'sports': [{'id': 1}]},
+        {'sports': [{'id': 2, 'name': 'B'}]},
+    ]))
+    staged = etl_instance.stage_chunks(
+        'db', {'sports': ('sports', 'sports')}, staging, chunk_size=1
+    )
+    assert staged == {'sports': 2}
+
+    etl_instance.iter_nosql = MagicMock(side_effect=AssertionError('leu o MongoDB'))
+    engine = create_engine('sqlite://')
+    assert etl_instance.load_staged(engine, 'sports', staging) == 2
+    assert etl_instance.load_staged(engine, 'sports', staging) == 2
+
+    result = pd.read_sql('SELECT * FROM sports ORDER BY id', engine)
+    assert result['id'].tolist() == [1, 2]
+    assert result['name'].tolist() == [None, 'B']
+
+
+def test_load_staged_without_extract(etl_instance, tmp_path):
+    """Testa se carregar uma tabela sem staging gera um erro claro."""
+    from src.utils.staging import StagingArea
+
+    staging = StagingArea(str(tmp_path))
+    with pytest.raises(RuntimeError, match='ausente ou incompleto'):
+        etl_instance.load_staged(
+            MagicMock(), 'sports', staging, write_mode='append'
+        )
+
+
+def test_load_staged_append_resumes(etl_instance, tmp_path):
+    """Testa se, em append, as partes já carregadas não são carregadas de novo."""
+    pytest.importorskip('pyarrow')
+    from src.utils.staging import StagingArea
+
+    staging = StagingArea(str(tmp_path))
+    staging.begin('sports', 'sports')
+    first = staging.write_part('sports', pd.DataFrame({'id': [1]}))
+    staging.write_part('sports', pd.DataFrame({'id': [2]}))
+    staging.complete('sports')
+    staging.mark_loaded('sports', [first])
+
+    engine = create_engine('sqlite://')
+    loaded = etl_instance.load_staged(engine, 'sports', staging, write_mode='append')
+
+    assert loaded == 1
+    assert pd.read_sql('SELECT id FROM sports', engine)['id'].tolist() == [2]
+    assert staging.read_manifest('sports')['loaded_parts'] == [
+        'part-00000.parquet',
+        'part-00001.parquet',
+    ]
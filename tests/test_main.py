@@ -0,0 +1,213 @@
+from threading import Event
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from benchmarks.generator import (
+    generate_markets_documents,
+    generate_player_props_documents,
+)
+from src.main import (
+    UPSERT_KEYS,
+    create_pipeline,
+    group_by_source,
+    parse_args,
+    run_collection,
+    run_collections,
+    run_sync,
+)
+from src.utils.etl import ETLProcess
+from src.utils.specs import destination_table
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_run_collections_collects_failures(max_workers):
+    """Testa se a falha de uma coleção não interrompe as demais."""
+
+    def fake_run_collection(collection_name, **kwargs):
+        if collection_name == 'sports':
+            raise RuntimeError('falhou')
+        return 3
+
+    with patch('src.main.run_collection', side_effect=fake_run_collection):
+        results = run_collections(
+            MagicMock(),
+            MagicMock(),
+            {'sports': 'sports', 'competition_schedules': 'schedules'},
+            max_workers=max_workers,
+        )
+
+    assert list(results) == ['sports', 'competition_schedules']
+    assert isinstance(results['sports'], RuntimeError)
+    assert results['competition_schedules'] == 3
+
+
+def test_run_collections_invalid_executor():
+    """Testa se um executor desconhecido é rejeitado."""
+    with pytest.raises(ValueError, match='Executor inválido'):
+        run_collections(
+            MagicMock(), MagicMock(), {'sports': 'sports'}, max_workers=2,
+            executor='fiber',
+        )
+
+
+def test_group_by_source():
+    """Testa se coleções com a mesma origem ficam no mesmo grupo."""
+    pipeline = ETLProcess(uri='mongodb://fake_uri')
+    groups = group_by_source(
+        pipeline,
+        {
+            'sport_event_markets': 'markets',
+            'player_props_books': 'books',
+            'outcomes': 'markets',
+        },
+    )
+    assert groups == [
+        {'sport_event_markets': 'markets', 'outcomes': 'markets'},
+        {'player_props_books': 'books'},
+    ]
+
+
+def test_run_collections_fanout():
+    """Testa se o grupo com a mesma origem é executado numa única unidade."""
+    pipeline = ETLProcess(uri='mongodb://fake_uri')
+    with patch(
+        'src.main.run_source_group',
+        return_value={'sport_event_markets': 2, 'outcomes': 5},
+    ) as mock_group:
+        results = run_collections(
+            pipeline,
+            MagicMock(),
+            {'sport_event_markets': 'markets', 'outcomes': 'markets'},
+            fanout=True,
+        )
+
+    mock_group.assert_called_once()
+    assert results == {'sport_event_markets': 2, 'outcomes': 5}
+
+
+def test_run_collection_chunked_resume():
+    """Testa se a carga em blocos repassa o --resume para a carga com checkpoints."""
+    pipeline = MagicMock()
+    pipeline.load_resumable.return_value = 7
+
+    rows = run_collection(
+        pipeline, MagicMock(), 'sports', 'sports', chunk_size=100, resume=True
+    )
+
+    assert rows == 7
+    assert pipeline.load_resumable.call_args.kwargs['resume'] is True
+    assert parse_args(['--resume']).resume
+
+
+def test_run_sync_maps_collections_to_tables():
+    """Testa se a sincronização contínua recebe as tabelas de destino de cada coleção."""
+    pipeline = MagicMock()
+    stop = Event()
+
+    run_sync(pipeline, MagicMock(), {'outcomes': 'markets'}, flush_size=50, stop=stop)
+
+    kwargs = pipeline.sync_changes.call_args.kwargs
+    assert kwargs['targets'] == {
+        'outcomes': ('markets', 'sport_event_markets_outcomes')
+    }
+    assert kwargs['flush_size'] == 50
+    assert kwargs['stop'] is stop
+
+
+@pytest.mark.parametrize(
+    'collection_name, key_collection, documents',
+    [
+        ('sport_event_markets', 'markets', generate_markets_documents),
+        ('outcomes', 'markets', generate_markets_documents),
+        ('player_props_books', 'books', generate_player_props_documents),
+    ],
+)
+def test_upsert_keys_unique_after_explode(
+    collection_name, key_collection, documents
+):
+    """Testa se o upsert das linhas explodidas grava todas elas, sem descartes."""
+    etl = ETLProcess(
+        uri='mongodb://fake_uri', write_mode='upsert', upsert_keys=UPSERT_KEYS
+    )
+    engine = create_engine('sqlite://')
+    table = destination_table(collection_name, key_collection)
+    rows = [
+        row
+        for document in documents(2, seed=1)
+        for row in etl._flatten_document(document, collection_name, key_collection)
+    ]
+    df = etl.transform_to_df(rows, collection_name)
+
+    # A segunda carga mescla as mesmas linhas sem duplicá-las
+    for _ in range(2):
+        etl.load_to_destination(engine, df, table)
+
+    loaded = pd.read_sql(f'SELECT COUNT(*) AS n FROM {table}', engine)['n'][0]
+    assert loaded == len(df)
+
+
+@pytest.mark.parametrize(
+    'collection_name, key_collection, documents',
+    [
+        ('sport_event_markets', 'markets', generate_markets_documents),
+        (
+            'sport_event_player_props',
+            'sport_event_players_props',
+            generate_player_props_documents,
+        ),
+    ],
+)
+def test_normalized_upsert_keys_cover_every_table(
+    collection_name, key_collection, documents
+):
+    """Testa o upsert em blocos da tabela principal e das filhas do modo normalizado."""
+    environment = {
+        'ETL_NORMALIZE': '1',
+        'ETL_WRITE_MODE': 'upsert',
+    }
+    with patch.dict('os.environ', environment):
+        etl = create_pipeline()
+    engine = create_engine('sqlite://')
+    table = destination_table(collection_name, key_collection)
+    rows = [
+        row
+        for document in documents(2, seed=1)
+        for row in etl._flatten_document(document, collection_name, key_collection)
+    ]
+    expected = {
+        output: len(df)
+        for output, df in etl.transform_tables(
+            rows, collection_name, key_collection, table
+        ).items()
+    }
+    assert list(expected) == etl.output_tables(
+        collection_name, key_collection, table
+    )
+
+    # A segunda carga mescla as mesmas linhas sem duplicá-las
+    for _ in range(2):
+        etl.iter_nosql = MagicMock(return_value=documents(2, seed=1))
+        etl.load_chunked(
+            engine, 'db', collection_name, key_collection, table, chunk_size=1
+        )
+
+    loaded = {
+        output: pd.read_sql(f'SELECT COUNT(*) AS n FROM {output}', engine)['n'][0]
+        for output in expected
+    }
+    assert loaded == expected
+
+
+def test_create_pipeline_keeps_baseline_defaults():
+    """Testa se COPY e pushdown só são usados quando as variáveis os pedem."""
+    with patch.dict('os.environ', clear=True):
+        etl = create_pipeline()
+    assert (etl.load_method, etl.pushdown) == ('insert', 'none')
+
+    environment = {'POSTGRES_LOAD_METHOD': 'copy', 'MONGO_PUSHDOWN': 'projection'}
+    with patch.dict('os.environ', environment, clear=True):
+        etl = create_pipeline()
+    assert (etl.load_method, etl.pushdown) == ('copy', 'projection')
@@ -0,0 +1,95 @@
+import json
+import urllib.request
+
+import pytest
+
+from src.utils.metrics import RunMetrics, current_rss_bytes
+
+
+def test_stage_records_time_and_counters():
+    """Testa se a etapa acumula tempo, contadores e o RSS ao fim da etapa."""
+    metrics = RunMetrics()
+
+    with metrics.stage('sports', 'load') as stage:
+        stage['rows'] = 10
+    with metrics.stage('sports', 'load') as stage:
+        stage['rows'] = 5
+
+    entry = metrics.stages[('sports', 'load')]
+    assert entry['rows'] == 15
+    assert entry['seconds'] > 0
+    assert entry['rss_bytes'] == 0 or entry['rss_bytes'] > 2**20
+
+
+@pytest.mark.skipif(not current_rss_bytes(), reason='RSS atual indisponível')
+def test_stage_memory_is_attributed_to_the_stage():
+    """Testa se o crescimento de memória fica na etapa que alocou, não nas seguintes."""
+    metrics = RunMetrics()
+
+    with metrics.stage('markets', 'transform'):
+        retained = b'x' * 64 * 2**20
+    with metrics.stage('markets', 'load'):
+        pass
+
+    assert metrics.stages[('markets', 'transform')]['rss_growth_bytes'] >= 32 * 2**20
+    assert metrics.stages[('markets', 'load')]['rss_growth_bytes'] < 32 * 2**20
+    del retained
+
+
+def test_stage_records_on_error():
+    """Testa se a etapa é registrada mesmo quando o bloco falha."""
+    metrics = RunMetrics()
+
+    with pytest.raises(ValueError):
+        with metrics.stage('sports', 'load') as stage:
+            stage['rows'] = 3
+            raise ValueError('erro')
+
+    assert metrics.stages[('sports', 'load')]['rows'] == 3
+
+
+def test_iter_timed_counts_items():
+    """Testa se os itens são repassados e contados ao fim da iteração."""
+    metrics = RunMetrics()
+
+    items = list(
+        metrics.iter_timed('sports', 'extract', iter([1, 2, 3]), size=lambda item: 10)
+    )
+
+    assert items == [1, 2, 3]
+    assert metrics.stages[('sports', 'extract')]['documents'] == 3
+    assert metrics.stages[('sports', 'extract')]['bytes'] == 30
+
+
+def test_report_and_merge(tmp_path):
+    """Testa o relatório em JSON e a soma de medições de outro processo."""
+    child = RunMetrics()
+    child.record('sports', 'load', seconds=2.0, rows=100)
+    metrics = RunMetrics()
+    metrics.record('sports', 'load', seconds=2.0, rows=100)
+
+    metrics.merge(child.report()['stages'])
+    path = tmp_path / 'report.json'
+    metrics.write_json(str(path))
+
+    (entry,) = json.loads(path.read_text())['stages']
+    assert entry['rows'] == 200
+    assert entry['rows_per_second'] == 50.0
+
+
+def test_prometheus_export_and_endpoint():
+    """Testa o formato de texto do Prometheus e o endpoint HTTP local."""
+    metrics = RunMetrics()
+    metrics.record('odds"x', 'load', rows=7)
+
+    text = metrics.to_prometheus()
+    assert '# TYPE etl_stage_rows_total counter' in text
+    assert 'etl_stage_rows_total{target="odds\\"x",stage="load"} 7' in text
+
+    server = metrics.serve_prometheus(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            assert 'etl_stage_rows_total{' in response.read().decode()
+    finally:
+        server.shutdown()
@@ -0,0 +1,64 @@
+import pandas as pd
+
+from src.utils.schemas import (
+    apply_schema,
+    get_schema,
+    partition_name,
+    partition_range,
+    partition_starts,
+    sql_types,
+)
+
+
+def test_apply_schema_converts_declared_columns():
+    """Testa se ids viram categorias e odds em texto viram float32."""
+    df = pd.DataFrame(
+        {
+            'books_id': ['b1', 'b1', None],
+            'odds_decimal': ['1.5', 'x', None],
+            'other': ['a', 'b', 'c'],
+        }
+    )
+
+    result = apply_schema(
+        df, {'books_id': 'category', 'odds_decimal': 'float32', 'absent': 'text'}
+    )
+
+    assert result['books_id'].dtype == 'category'
+    assert result['books_id'].isna().tolist() == [False, False, True]
+    assert result['odds_decimal'].dtype == 'float32'
+    assert result['odds_decimal'].isna().tolist() == [False, True, True]
+    assert result['other'].dtype == object
+    assert df['books_id'].dtype == object
+
+
+def test_sql_types_restricted_to_columns():
+    """Testa se apenas as colunas presentes entram no dtype do to_sql."""
+    schema = get_schema('sport_event_markets_outcomes')
+
+    dtype = sql_types(schema, ['books_id', 'odds_decimal'])
+
+    assert set(dtype) == {'books_id', 'odds_decimal'}
+    assert get_schema('unknown') == {}
+
+
+def test_partition_starts_name_and_range():
+    """Testa o cálculo da partição de cada linha e a faixa pelo nome."""
+    starts = partition_starts(
+        pd.Series(['2025-01-31T23:30:00-03:00', '2025-01-05T18:00:00Z', None]),
+        'month',
+    )
+
+    assert starts[0] == pd.Timestamp('2025-02-01', tz='UTC')
+    assert starts[1] == pd.Timestamp('2025-01-01', tz='UTC')
+    assert pd.isna(starts[2])
+
+    name = partition_name('schedules', starts[0], 'month')
+    assert name == 'schedules_p202502'
+    assert partition_range('schedules', name, 'month') == (
+        pd.Timestamp('2025-02-01', tz='UTC'),
+        pd.Timestamp('2025-03-01', tz='UTC'),
+    )
+    assert partition_range('odds', 'odds_p20251231', 'day')[1] == pd.Timestamp(
+        '2026-01-01', tz='UTC'
+    )
@@ -23,6 +23,19 @@ def test_read_success(mock_mongo):
     assert result == [{'name': 'Alice'}, {'name': 'Bob'}]
 
 
+def test_iter_nosql_uses_batch_size(mock_mongo):
+    """Testa se a leitura via cursor é preguiçosa e respeita o batch_size"""
+    collection = mock_mongo.client['test_db']['test_collection']
+    collection.find.return_value = iter([{'name': 'Alice'}, {'name': 'Bob'}])
+
+    documents = mock_mongo.iter_nosql('test_db', 'test_collection', batch_size=10)
+    collection.find.assert_not_called()
+
+    assert next(documents) == {'name': 'Alice'}
+    collection.find.assert_called_once_with({}, batch_size=10)
+    assert list(documents) == [{'name': 'Bob'}]
+
+
 def test_read_failure(mock_mongo):
     """Testa erro ao tentar fazer uma consulta"""
     mock_mongo.client['test_db'][
@@ -34,8 +47,46 @@ def test_read_failure(mock_mongo):
         mock_mongo.read_nosql('test_db', 'test_collection')
 
 
+def test_id_partitions(mock_mongo):
+    """Testa se as faixas de _id cobrem toda a coleção sem sobreposição"""
+    collection = mock_mongo.client['test_db']['test_collection']
+    collection.aggregate.return_value = [{'_id': i} for i in [7, 1, 5, 3, 9, 2]]
+
+    queries = mock_mongo.id_partitions(
+        'test_db', 'test_collection', 3, {'status': 'open'}
+    )
+
+    assert queries == [
+        {'$and': [{'status': 'open'}, {'_id': {'$lt': 3}}]},
+        {'$and': [{'status': 'open'}, {'_id': {'$gte': 3, '$lt': 7}}]},
+        {'$and': [{'status': 'open'}, {'_id': {'$gte': 7}}]},
+    ]
+    pipeline = collection.aggregate.call_args.args[0]
+    assert pipeline[1] == {'$sample': {'size': 60}}
+
+
+def test_id_partitions_empty_collection(mock_mongo):
+    """Testa se uma coleção vazia resulta numa única consulta"""
+    collection = mock_mongo.client['test_db']['test_collection']
+    collection.aggregate.return_value = []
+    assert mock_mongo.id_partitions('test_db', 'test_collection', 4) == [{}]
+
+
 def test_close_client(mock_mongo):
     """Testa se o fechamento da conexão chama .close() corretamente"""
     mock_mongo.client.close = MagicMock()
     mock_mongo.close_client()
     mock_mongo.client.close.assert_called_once()
+
+
+def test_watch_changes_filters_collections(mock_mongo):
+    """Testa se o change stream é restrito às coleções e traz o documento completo"""
+    database = mock_mongo.client['test_db']
+    token = {'_data': 'abc'}
+
+    mock_mongo.watch_changes('test_db', ['markets'], resume_after=token)
+
+    pipeline = database.watch.call_args.args[0]
+    assert pipeline[0]['$match']['ns.coll'] == {'$in': ['markets']}
+    assert database.watch.call_args.kwargs['full_document'] == 'updateLookup'
+    assert database.watch.call_args.kwargs['resume_after'] == token
@@ -0,0 +1,156 @@
+from src.utils.specs import (
+    build_pipeline,
+    build_projection,
+    child_tables,
+    compile_children,
+    compile_spec,
+    destination_table,
+    get_spec,
+    spec_fields,
+)
+
+
+def test_compile_spec_carries_parent_ids():
+    """Testa se os ids dos níveis externos chegam às linhas, de fora para dentro."""
+    flatten = compile_spec(get_spec('outcomes'), 'markets')
+    document = {
+        'sport_event': {'id': 'e1', 'start_time': '2025-01-05T18:00:00Z'},
+        'markets': [
+            {'id': 'm1', 'books': [{'id': 'b1', 'outcomes': [{'odds': '1.5'}]}]},
+            {'id': 'm2', 'books': [{'id': 'b2'}]},
+        ],
+    }
+
+    rows = flatten(document)
+
+    assert rows == [
+        {
+            'odds': '1.5',
+            'sport_event_id': 'e1',
+            'sport_event_start_time': '2025-01-05T18:00:00Z',
+            'market_id': 'm1',
+            'books_id': 'b1',
+        }
+    ]
+    assert list(rows[0]) == [
+        'odds',
+        'sport_event_id',
+        'sport_event_start_time',
+        'market_id',
+        'books_id',
+    ]
+
+
+def test_compile_spec_carries_event_start_time():
+    """Testa se os outcomes levam a data do evento, usada no particionamento."""
+    flatten = compile_spec(get_spec('outcomes'), 'markets')
+    rows = flatten({
+        'sport_event': {'id': 'e1', 'start_time': '2025-01-05T18:00:00+00:00'},
+        'markets': [{'id': 'm1', 'books': [{'id': 'b1', 'outcomes': [{}]}]}],
+    })
+    assert rows[0]['sport_event_start_time'] == '2025-01-05T18:00:00+00:00'
+
+
+def test_compile_spec_does_not_mutate_document():
+    """Testa se o documento de origem fica intacto para outras especificações."""
+    flatten = compile_spec(get_spec('sport_event_markets'), 'markets')
+    document = {'sport_event': {'id': 'e1'}, 'markets': [{'id': 'm1'}]}
+
+    assert flatten(document) == [{'id': 'm1', 'sport_event_id': 'e1'}]
+    assert document['markets'] == [{'id': 'm1'}]
+
+
+def test_compile_spec_select():
+    """Testa se 'select' extrai a linha de dentro de cada elemento."""
+    flatten = compile_spec(get_spec('competition_schedules'), 'schedules')
+    document = {'schedules': [{'sport_event': {'id': 'e1'}}, {}]}
+    assert flatten(document) == [{'id': 'e1'}, {}]
+
+
+def test_compile_spec_custom_collection():
+    """Testa uma especificação nova, sem código específico para a coleção."""
+    spec = {
+        'source': 'sport_event_markets',
+        'carry': {'sport_event_id': 'sport_event.id'},
+        'unnest': [{'path': '{key}', 'carry': {'market_id': 'id'}}, {'path': 'books'}],
+    }
+    flatten = compile_spec(spec, 'markets')
+    document = {'sport_event': {'id': 'e1'}, 'markets': [{'id': 'm1', 'books': [{'id': 'b1'}]}]}
+    assert flatten(document) == [{'id': 'b1', 'sport_event_id': 'e1', 'market_id': 'm1'}]
+
+
+def test_compile_spec_missing_arrays():
+    """Testa se arrays ausentes ou nulos não geram linhas."""
+    flatten = compile_spec(get_spec('player_props_books'), 'books')
+    assert flatten({}) == []
+    assert flatten({'sport_event_players_props': {'players_props': None}}) == []
+
+
+def test_destination_table():
+    """Testa o nome da tabela de destino definido em cada especificação."""
+    assert destination_table('player_props_books', 'books') == (
+        'sport_event_player_props_books_outcomes'
+    )
+    assert destination_table('sport_event_markets', 'markets') == 'sport_event_markets'
+    assert destination_table('sports', 'sports') == 'sports'
+
+
+def test_child_tables():
+    """Testa se as tabelas filhas são listadas com os pais antes dos filhos."""
+    assert child_tables(get_spec('sport_event_markets'), 'markets') == [
+        'sport_event_markets_books',
+        'sport_event_markets_books_outcomes',
+    ]
+    assert child_tables(get_spec('sports'), 'sports') == []
+
+
+def test_compile_children_reads_parent_keys():
+    """Testa se as chaves do pai são lidas por caminho, inclusive aninhado."""
+    spec = get_spec('sport_event_player_props')
+    [(column, table, parent_key, children)] = compile_children(
+        spec, 'sport_event_players_props'
+    )
+    row = {'sport_event_id': 'e1', 'player': {'id': 'p1'}}
+
+    assert (column, table) == ('markets', 'sport_event_players_props_markets')
+    assert {name: get(row) for name, get in parent_key} == {
+        'sport_event_id': 'e1',
+        'player_id': 'p1',
+    }
+    assert [child[1] for child in children] == [
+        'sport_event_players_props_markets_books'
+    ]
+
+
+def test_build_projection_drops_path_collisions():
+    """Testa se campos contidos em outro campo projetado são descartados."""
+    assert build_projection(['markets.id', 'markets', 'sport_event.id']) == {
+        'markets': 1,
+        'sport_event.id': 1,
+    }
+
+
+def test_spec_fields():
+    """Testa os campos lidos por uma especificação com vários níveis."""
+    fields = spec_fields(get_spec('player_props_books'), 'books')
+    assert build_projection(fields) == {
+        'sport_event_players_props.players_props.markets.books': 1,
+        'sport_event_players_props.players_props.markets.id': 1,
+        'sport_event_players_props.players_props.player.id': 1,
+        'sport_event_players_props.sport_event.id': 1,
+        'sport_event_players_props.sport_event.start_time': 1,
+    }
+
+
+def test_build_pipeline_select():
+    """Testa o pipeline de uma especificação com 'select' e sem campos herdados."""
+    pipeline = build_pipeline(get_spec('competition_schedules'), 'schedules')
+    assert pipeline == [
+        {'$project': {'schedules.sport_event': 1}},
+        {'$unwind': '$schedules'},
+        {
+            '$replaceRoot': {
+                'newRoot': {'$mergeObjects': ['$schedules.sport_event', {}]}
+            }
+        },
+    ]
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from sqlalchemy import create_engine
+
+from src.utils.state import CheckpointStore, SyncStateStore
+
+
+@pytest.fixture
+def state():
+    """Cria um SyncStateStore sobre um banco SQLite em memória."""
+    return SyncStateStore(create_engine('sqlite://'))
+
+
+def test_get_watermark_without_state(state):
+    """Testa se uma coleção sem estado retorna None"""
+    assert state.get_watermark('sports', '_id') is None
+
+
+def test_set_and_get_object_id(state):
+    """Testa se o ObjectId é salvo e lido com o mesmo tipo"""
+    object_id = ObjectId()
+    state.set_watermark('sports', '_id', object_id)
+    assert state.get_watermark('sports', '_id') == object_id
+
+
+def test_set_watermark_overwrites(state):
+    """Testa se um novo valor substitui o anterior"""
+    state.set_watermark('sports', 'updated_at', datetime(2025, 1, 1))
+    state.set_watermark('sports', 'updated_at', datetime(2025, 1, 2))
+    assert state.get_watermark('sports', 'updated_at') == datetime(2025, 1, 2)
+
+
+def test_get_watermark_other_field(state):
+    """Testa se trocar o campo da marca d'água força uma carga completa"""
+    state.set_watermark('sports', '_id', ObjectId())
+    assert state.get_watermark('sports', 'updated_at') is None
+
+
+def test_checkpoint_save_get_and_clear():
+    """Testa se o checkpoint é salvo, sobrescrito e apagado por coleção"""
+    checkpoints = CheckpointStore(create_engine('sqlite://'))
+    object_id = ObjectId()
+
+    assert checkpoints.get('sports') is None
+    checkpoints.save('sports', 'sports', ObjectId(), 1, 10)
+    checkpoints.save('sports', 'sports', object_id, 2, 25)
+    assert checkpoints.get('sports') == {
+        'table': 'sports',
+        'last_id': object_id,
+        'chunks': 2,
+        'rows': 25,
+    }
+
+    checkpoints.clear('sports')
+    assert checkpoints.get('sports') is None
+
+
+def test_checkpoint_rolled_back_with_transaction():
+    """Testa se o checkpoint gravado numa transação desfeita não é salvo"""
+    engine = create_engine('sqlite://')
+    checkpoints = CheckpointStore(engine)
+
+    with pytest.raises(RuntimeError):
+        with engine.begin() as connection:
+            checkpoints.save('sports', 'sports', 1, 1, 1, connection=connection)
+            raise RuntimeError('falha no bloco')
+
+    assert checkpoints.get('sports') is None